@@ -0,0 +1,96 @@
+"""
+Tiempo de arranque hasta la pantalla de login: lanza `python main.py` varias
+veces y mide cuánto tarda en pedir el nombre de usuario, con la caché de
+verificación del esquema vacía (arranque en frío) y ya escrita (en caliente).
+
+Uso:
+    python -m benchmarks.arranque --repeticiones 10 --presupuesto-ms 1500
+
+Termina con código 1 si la mediana en caliente supera --presupuesto-ms o,
+si se indica, la mediana en frío supera --presupuesto-frio-ms. Usa un archivo
+de caché temporal, así que no toca la caché del proyecto.
+"""
+
+import argparse
+import os
+import selectors
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+from database.esquema import RAIZ_PROYECTO, invalidar_cache
+
+PROMPT_LOGIN = "Nombre de usuario:"
+
+
+def medir_arranque(entorno: dict, limite_s: float) -> float:
+    """Segundos desde el lanzamiento de main.py hasta que muestra PROMPT_LOGIN."""
+    inicio = time.perf_counter()
+    proceso = subprocess.Popen(
+        [sys.executable, "-u", "main.py"],
+        cwd=RAIZ_PROYECTO,
+        env=entorno,
+        stdin=subprocess.PIPE,
+        stdout=subprocess.PIPE,
+        stderr=subprocess.STDOUT,
+    )
+    salida = b""
+    try:
+        with selectors.DefaultSelector() as selector:
+            selector.register(proceso.stdout, selectors.EVENT_READ)
+            while PROMPT_LOGIN.encode("utf-8") not in salida:
+                restante = limite_s - (time.perf_counter() - inicio)
+                if restante <= 0 or not selector.select(restante):
+                    raise RuntimeError(f"main.py no mostró el login en {limite_s:.0f} s:\n{salida.decode(errors='replace')}")
+                bloque = os.read(proceso.stdout.fileno(), 4096)
+                if not bloque:
+                    raise RuntimeError(f"main.py terminó antes del login:\n{salida.decode(errors='replace')}")
+                salida += bloque
+        return time.perf_counter() - inicio
+    finally:
+        proceso.kill()
+        proceso.wait()
+        proceso.stdout.close()
+        proceso.stdin.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--repeticiones", type=int, default=10)
+    parser.add_argument("--presupuesto-ms", type=float, default=1500.0, help="mediana máxima en caliente")
+    parser.add_argument("--presupuesto-frio-ms", type=float, help="mediana máxima en frío (opcional)")
+    parser.add_argument("--limite-s", type=float, default=60.0, help="tiempo máximo de espera por arranque")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as directorio:
+        cache = Path(directorio) / "esquema_cache.json"
+        entorno = dict(os.environ, ESQUEMA_CACHE_ARCHIVO=str(cache))
+        tiempos = {"frío": [], "caliente": []}
+        for _ in range(args.repeticiones):
+            invalidar_cache(cache)
+            tiempos["frío"].append(medir_arranque(entorno, args.limite_s))
+            tiempos["caliente"].append(medir_arranque(entorno, args.limite_s))
+
+    print(f"Arranque hasta el login ({args.repeticiones} repeticiones):")
+    medianas = {}
+    for modo, valores in tiempos.items():
+        medianas[modo] = statistics.median(valores) * 1000
+        print(f"  {modo:<9} mediana {medianas[modo]:>8.1f} ms   mín {min(valores) * 1000:>8.1f} ms   "
+              f"máx {max(valores) * 1000:>8.1f} ms")
+
+    excedidos = []
+    if medianas["caliente"] > args.presupuesto_ms:
+        excedidos.append(f"en caliente {medianas['caliente']:.1f} ms > {args.presupuesto_ms:.0f} ms")
+    if args.presupuesto_frio_ms is not None and medianas["frío"] > args.presupuesto_frio_ms:
+        excedidos.append(f"en frío {medianas['frío']:.1f} ms > {args.presupuesto_frio_ms:.0f} ms")
+    for excedido in excedidos:
+        print(f"Presupuesto superado: {excedido}")
+    if excedidos:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,498 @@
+"""
+Asesor de índices: siembra una base de datos de prueba, ejecuta las consultas
+que emiten los CRUD y `main.py`, captura su `EXPLAIN (ANALYZE, BUFFERS)` y
+detecta escaneos secuenciales sobre tablas grandes. Con los hallazgos escribe
+una revisión de Alembic con los índices recomendados.
+
+Uso:
+    python -m benchmarks.asesor_indices --reservas 300000 --clientes 20000
+    python -m benchmarks.asesor_indices --planes planes.json --sin-migracion
+
+Requiere PostgreSQL. Todo se ejecuta dentro de una transacción que se revierte
+al terminar; la verificación crea los índices dentro de esa misma transacción y
+repite los EXPLAIN para comparar.
+"""
+
+import argparse
+import json
+import re
+import sys
+import uuid
+from dataclasses import dataclass
+from datetime import date, datetime, timedelta
+from itertools import islice
+from pathlib import Path
+
+from sqlalchemy import String, cast, event, func, insert, select, text, update
+
+from crud.cache_referencia import cache_referencia
+from crud.disponibilidad_crud import DisponibilidadCRUD
+from crud.habitacion_crud import HabitacionCRUD
+from crud.reporte_crud import ReporteCRUD
+from crud.reserva_crud import ReservaCRUD
+from crud.servicios_adicioneles_crud import ServiciosAdicionalesCRUD
+from crud.tipo_habitacion_crud import TipoHabitacionCRUD
+from crud.usuario_crud import UsuarioCRUD
+from database.config import Base
+from database.esquema import DIRECTORIO_MIGRACIONES, revision_head
+from database.instrumentacion import huella_sentencia
+from entities.cliente import Cliente
+from entities.reserva import Reserva
+from entities.reserva_servicios import Reserva_Servicios
+from entities.servicios_adicionales import Servicios_Adicionales
+from entities.usuario import Usuario
+from benchmarks.comun import insertar_por_lotes, sembrar_hotel, sesion_desechable
+
+
+# Columnas de auditoría: sus claves foráneas solo se recorren al borrar usuarios
+COLUMNAS_AUDITORIA = {"id_usuario_crea", "id_usuario_edita"}
+
+ORIGEN_CLAVE_FORANEA = "clave foránea"
+
+
+@dataclass(frozen=True)
+class Indice:
+    nombre: str
+    tabla: str
+    columnas: tuple
+    donde: str = None
+    # Columnas cuyo filtrado por escaneo secuencial resuelve este índice
+    detecta: tuple = ()
+
+    def ddl(self) -> str:
+        sentencia = f"CREATE INDEX {self.nombre} ON {self.tabla} ({', '.join(self.columnas)})"
+        return f"{sentencia} WHERE {self.donde}" if self.donde else sentencia
+
+
+# Índices pensados para las formas de consulta conocidas. Si un hallazgo no
+# corresponde a ninguno se propone un índice simple sobre las columnas filtradas.
+INDICES_CONOCIDOS = (
+    # obtener_reservas_detalladas(id_cliente=...) filtra por cliente y ordena por fecha de entrada
+    Indice("ix_reserva_cliente_fecha_entrada", "reserva", ("id_cliente", "fecha_entrada", "id_reserva"),
+           detecta=("id_cliente",)),
+    # obtener/iterar_reservas_activas: parcial, solo las activas y en el orden de CLAVE_RESERVA
+    Indice("ix_reserva_activa_fecha_creacion", "reserva", ("fecha_creacion", "id_reserva"),
+           donde="estado_reserva = 'Activa'", detecta=("estado_reserva",)),
+    # obtener_habitaciones_disponibles: habitaciones a la venta de un tipo, por número
+    Indice("ix_habitacion_tipo_disponible", "habitacion", ("id_tipo", "numero"),
+           donde="disponible", detecta=("id_tipo", "tipo", "disponible")),
+    # Reportes de servicios y cancelaciones: reservas por rango de fecha de entrada
+    Indice("ix_reserva_fecha_entrada", "reserva", ("fecha_entrada",), detecta=("fecha_entrada",)),
+    # La clave primaria empieza por id_reserva; borrar un servicio recorre reserva_servicios
+    Indice("ix_reserva_servicios_id_servicio", "reserva_servicios", ("id_servicio",),
+           detecta=("id_servicio",)),
+)
+
+
+@dataclass
+class Hallazgo:
+    tabla: str
+    columnas: tuple
+    origen: str
+    detalle: str
+
+
+def primeros(iterador, cantidad: int) -> list:
+    """Consume los primeros elementos de un generador de streaming y lo cierra."""
+    try:
+        return list(islice(iterador, cantidad))
+    finally:
+        iterador.close()
+
+
+def escenarios(datos: dict) -> dict:
+    """
+    Consultas de lectura de los CRUD, con los mismos argumentos que usa SistemaGestion.
+    """
+    hoy = date.today()
+    mes_anterior = hoy - timedelta(days=30)
+    entrada = hoy + timedelta(days=30)
+    salida = entrada + timedelta(days=3)
+    return {
+        "listar_habitaciones": lambda db: HabitacionCRUD.obtener_habitaciones(db),
+        "habitaciones_disponibles": lambda db: DisponibilidadCRUD.obtener_habitaciones_disponibles(
+            db, datos["id_tipo"], entrada, salida, limite=1
+        ),
+        "habitacion_disponible": lambda db: DisponibilidadCRUD.habitacion_disponible(
+            db, datos["id_habitacion"], entrada, salida
+        ),
+        "reserva_por_id": lambda db: ReservaCRUD.obtener_reserva(db, datos["id_reserva"]),
+        "reservas_del_cliente": lambda db: ReservaCRUD.obtener_reservas_detalladas(db, id_cliente=datos["id_cliente"]),
+        "reservas_activas_del_cliente": lambda db: ReservaCRUD.obtener_reservas_detalladas(
+            db, id_cliente=datos["id_cliente"], estado="Activa"
+        ),
+        "pagina_reservas_activas": lambda db: ReservaCRUD.obtener_reservas_activas(db, limite=50),
+        "iterar_reservas_activas": lambda db: primeros(ReservaCRUD.iterar_reservas_activas(db), 100),
+        "iterar_reservas": lambda db: primeros(ReservaCRUD.iterar_reservas(db), 100),
+        "usuario_por_nombre": lambda db: UsuarioCRUD.obtener_usuario_por_nombre(db, datos["nombre_usuario"]),
+        "autenticar_usuario": lambda db: UsuarioCRUD(db).autenticar_usuario(datos["nombre_usuario"], "clave"),
+        "listar_usuarios": lambda db: UsuarioCRUD.obtener_usuarios(db),
+        "listar_servicios": lambda db: ServiciosAdicionalesCRUD.obtener_servicios(db),
+        "servicios_referencia": lambda db: ServiciosAdicionalesCRUD.obtener_servicios_referencia(db),
+        "tipos_habitacion": lambda db: TipoHabitacionCRUD.obtener_tipos_habitacion(db),
+        "reporte_indicadores": lambda db: ReporteCRUD.indicadores(db, mes_anterior, hoy, usar_cache=False),
+        "reporte_servicios": lambda db: ReporteCRUD.servicios_mas_vendidos(db, mes_anterior, hoy, usar_cache=False),
+        "reporte_cancelaciones": lambda db: ReporteCRUD.cancelaciones(db, mes_anterior, hoy, usar_cache=False),
+    }
+
+
+def sembrar(db, habitaciones: int, reservas: int, clientes: int, servicios: int) -> dict:
+    """
+    Siembra el hotel de los benchmarks y reparte sus reservas entre `clientes`
+    clientes, con algunos servicios contratados, para que los filtros por
+    cliente y por servicio sean selectivos como en producción.
+    """
+    datos = sembrar_hotel(db, habitaciones=habitaciones, reservas=reservas)
+    prefijo = f"asesor_{uuid.uuid4().hex[:6]}"
+    filas_usuario = [
+        {
+            "id_usuario": uuid.uuid4(),
+            "nombre": "Asesor",
+            "apellidos": "Índices",
+            "tipo_usuario": "Cliente",
+            "nombre_usuario": f"{prefijo}_{i}",
+            "clave": "clave",
+        }
+        for i in range(clientes)
+    ]
+    insertar_por_lotes(db, Usuario, filas_usuario)
+    insertar_por_lotes(db, Cliente, [{"id_cliente": f["id_usuario"]} for f in filas_usuario])
+    insertar_por_lotes(db, Servicios_Adicionales, [
+        {
+            "id_servicio": uuid.uuid4(),
+            "nombre_servicio": f"{prefijo} servicio {i}",
+            "precio": 10_000.0 * (i + 1),
+            "descripcion": "Servicio del asesor de índices",
+            "id_usuario_crea": datos["id_usuario"],
+        }
+        for i in range(servicios)
+    ])
+    if clientes:
+        asignacion = (
+            select(Cliente.id_cliente, (func.row_number().over(order_by=Cliente.id_cliente) - 1).label("n"))
+            .join(Usuario, Usuario.id_usuario == Cliente.id_cliente)
+            .where(Usuario.nombre_usuario.like(f"{prefijo}\\_%"))
+            .subquery()
+        )
+        db.execute(
+            update(Reserva)
+            .where(
+                Reserva.id_cliente == datos["id_usuario"],
+                asignacion.c.n == func.abs(func.hashtext(cast(Reserva.id_reserva, String))) % clientes,
+            )
+            .values(id_cliente=asignacion.c.id_cliente)
+            .execution_options(synchronize_session=False)
+        )
+    # Cada reserva contrata en promedio uno de cada cuatro servicios
+    db.execute(insert(Reserva_Servicios).from_select(
+        ["id_reserva", "id_servicio", "precio"],
+        select(Reserva.id_reserva, Servicios_Adicionales.id_servicio, Servicios_Adicionales.precio).where(
+            Reserva.id_habitacion.in_(datos["habitaciones"]),
+            Servicios_Adicionales.nombre_servicio.like(f"{prefijo} %"),
+            func.abs(func.hashtext(
+                cast(Reserva.id_reserva, String) + cast(Servicios_Adicionales.id_servicio, String)
+            )) % 4 == 0,
+        ),
+    ))
+    db.execute(text("ANALYZE"))
+
+    id_reserva, id_cliente = db.execute(
+        select(Reserva.id_reserva, Reserva.id_cliente)
+        .where(Reserva.id_habitacion.in_(datos["habitaciones"][:1]))
+        .limit(1)
+    ).one()
+    return {
+        "id_tipo": next(iter(datos["tipos"].values())),
+        "id_habitacion": datos["habitaciones"][0],
+        "id_reserva": id_reserva,
+        "id_cliente": id_cliente,
+        "nombre_usuario": filas_usuario[-1]["nombre_usuario"] if filas_usuario else "inexistente",
+    }
+
+
+def capturar_formas(db, consultas: dict) -> dict:
+    """
+    Ejecuta cada escenario y devuelve, por huella, la primera sentencia SELECT
+    emitida con sus parámetros y el escenario que la generó.
+    """
+    formas = {}
+    escenario_actual = [None]
+
+    def registrar(conn, cursor, statement, parameters, context, executemany):
+        if executemany or not statement.lstrip().upper().startswith(("SELECT", "WITH")):
+            return
+        huella = huella_sentencia(statement)
+        if huella not in formas:
+            formas[huella] = {"escenario": escenario_actual[0], "sentencia": statement, "parametros": parameters}
+
+    motor = db.get_bind().engine
+    event.listen(motor, "before_cursor_execute", registrar)
+    try:
+        for nombre, consulta in consultas.items():
+            escenario_actual[0] = nombre
+            cache_referencia.invalidar()
+            consulta(db)
+    finally:
+        event.remove(motor, "before_cursor_execute", registrar)
+        cache_referencia.invalidar()
+    return formas
+
+
+def explicar(db, forma: dict) -> dict:
+    """Plan de `EXPLAIN (ANALYZE, BUFFERS, FORMAT JSON)` de una forma capturada."""
+    resultado = db.connection().exec_driver_sql(
+        "EXPLAIN (ANALYZE, BUFFERS, FORMAT JSON) " + forma["sentencia"], forma["parametros"]
+    ).scalar()
+    if isinstance(resultado, str):
+        resultado = json.loads(resultado)
+    return resultado[0]
+
+
+def nodos_plan(nodo: dict):
+    yield nodo
+    for hijo in nodo.get("Plans", ()):
+        yield from nodos_plan(hijo)
+
+
+def columnas_en(expresion: str, tabla: str) -> tuple:
+    """Columnas de `tabla` mencionadas en una expresión de filtro del plan, en orden."""
+    columnas = {columna.name for columna in Base.metadata.tables[tabla].columns}
+    encontradas = [palabra for palabra in re.findall(r"[a-z_]+", expresion) if palabra in columnas]
+    return tuple(dict.fromkeys(encontradas))
+
+
+def escaneos_secuenciales(plan: dict, tablas_grandes: set, escenario: str) -> list:
+    """
+    Escaneos secuenciales sobre tablas grandes cuyo filtro descarta al menos tantas
+    filas como devuelve: un índice sobre las columnas filtradas evitaría leerlas.
+    Los escaneos sin filtro (listados completos) no se consideran problema.
+    """
+    hallazgos = []
+    for nodo in nodos_plan(plan["Plan"]):
+        tabla = nodo.get("Relation Name")
+        if nodo["Node Type"] != "Seq Scan" or tabla not in tablas_grandes or not nodo.get("Filter"):
+            continue
+        vueltas = nodo.get("Actual Loops", 1)
+        filas = nodo.get("Actual Rows", 0) * vueltas
+        descartadas = nodo.get("Rows Removed by Filter", 0) * vueltas
+        if descartadas < filas:
+            continue
+        hallazgos.append(Hallazgo(
+            tabla=tabla,
+            columnas=columnas_en(nodo["Filter"], tabla),
+            origen=escenario,
+            detalle=f"Seq Scan con filtro {nodo['Filter']}: {filas} filas, {descartadas} descartadas",
+        ))
+    return hallazgos
+
+
+def indices_existentes(db) -> dict:
+    """Tabla -> {nombre del índice: primera columna} del esquema actual."""
+    filas = db.execute(text(
+        "SELECT t.relname, i.relname, a.attname"
+        " FROM pg_index x"
+        " JOIN pg_class t ON t.oid = x.indrelid"
+        " JOIN pg_class i ON i.oid = x.indexrelid"
+        " JOIN pg_attribute a ON a.attrelid = x.indrelid AND a.attnum = x.indkey[0]"
+        " WHERE t.relnamespace = current_schema()::regnamespace"
+    )).all()
+    existentes = {}
+    for tabla, indice, columna in filas:
+        existentes.setdefault(tabla, {})[indice] = columna
+    return existentes
+
+
+def tablas_grandes(db, umbral_filas: int) -> set:
+    filas = db.execute(text(
+        "SELECT relname FROM pg_class"
+        " WHERE relkind = 'r' AND relnamespace = current_schema()::regnamespace AND reltuples >= :umbral"
+    ), {"umbral": umbral_filas}).scalars()
+    return set(filas)
+
+
+def claves_foraneas_sin_indice(existentes: dict, grandes: set) -> list:
+    """
+    Claves foráneas de tablas grandes sin un índice que empiece por su columna:
+    al borrar o cambiar la fila referenciada PostgreSQL recorre la tabla entera.
+    """
+    hallazgos = []
+    for tabla in sorted(grandes & set(Base.metadata.tables)):
+        primeras = set(existentes.get(tabla, {}).values())
+        for clave in Base.metadata.tables[tabla].foreign_keys:
+            columna = clave.parent.name
+            if columna in COLUMNAS_AUDITORIA or columna in primeras:
+                continue
+            hallazgos.append(Hallazgo(
+                tabla=tabla,
+                columnas=(columna,),
+                origen=ORIGEN_CLAVE_FORANEA,
+                detalle=f"{tabla}.{columna} -> {clave.target_fullname} sin índice",
+            ))
+    return hallazgos
+
+
+def recomendar(hallazgos: list, existentes: dict) -> dict:
+    """
+    Índice recomendado -> hallazgos que resuelve, sin repetir los que ya existen.
+    Un índice parcial no sirve para comprobar una clave foránea, que busca sin
+    el predicado del índice.
+    """
+    recomendados = {}
+    for hallazgo in hallazgos:
+        candidatos = [
+            indice for indice in INDICES_CONOCIDOS
+            if indice.tabla == hallazgo.tabla and set(indice.detecta) & set(hallazgo.columnas)
+            and not (indice.donde and hallazgo.origen == ORIGEN_CLAVE_FORANEA)
+        ]
+        if not candidatos and hallazgo.columnas:
+            candidatos = [Indice(
+                f"ix_{hallazgo.tabla}_{'_'.join(hallazgo.columnas)}", hallazgo.tabla, hallazgo.columnas
+            )]
+        for indice in candidatos:
+            if indice.nombre not in existentes.get(indice.tabla, {}):
+                recomendados.setdefault(indice, []).append(hallazgo)
+    return recomendados
+
+
+PLANTILLA_MIGRACION = '''"""Índices recomendados por el asesor de índices
+
+Revision ID: {revision}
+Revises: {anterior}
+Create Date: {fecha}
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '{revision}'
+down_revision = '{anterior}'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+{upgrade}
+
+
+def downgrade() -> None:
+{downgrade}
+'''
+
+
+def escribir_migracion(recomendados: dict, directorio: Path = DIRECTORIO_MIGRACIONES) -> Path:
+    """Escribe una revisión de Alembic que crea (y en downgrade elimina) los índices."""
+    revision = uuid.uuid4().hex[:12]
+    upgrade, downgrade = [], []
+    for indice, hallazgos in recomendados.items():
+        origenes = ", ".join(sorted({h.origen for h in hallazgos}))
+        upgrade.append(f"    # {origenes}")
+        opciones = f", postgresql_where=sa.text({indice.donde!r})" if indice.donde else ""
+        upgrade.append(
+            f"    op.create_index({indice.nombre!r}, {indice.tabla!r}, {list(indice.columnas)!r}, unique=False{opciones})"
+        )
+        downgrade.insert(0, f"    op.drop_index({indice.nombre!r}, table_name={indice.tabla!r})")
+    archivo = directorio / f"{revision}_indices_recomendados.py"
+    archivo.write_text(PLANTILLA_MIGRACION.format(
+        revision=revision,
+        anterior=revision_head(directorio),
+        fecha=datetime.now().isoformat(sep=" "),
+        upgrade="\n".join(upgrade),
+        downgrade="\n".join(downgrade),
+    ), encoding="utf-8")
+    return archivo
+
+
+def resumen_plan(plan: dict) -> str:
+    raiz = plan["Plan"]
+    return (
+        f"{plan['Execution Time']:>9.2f} ms | buffers hit {raiz.get('Shared Hit Blocks', 0)}"
+        f" read {raiz.get('Shared Read Blocks', 0)}"
+    )
+
+
+def verificar(db, recomendados: dict, formas: dict, planes: dict) -> None:
+    """
+    Crea los índices dentro de un SAVEPOINT, repite los EXPLAIN de las formas
+    afectadas e imprime el antes y el después.
+    """
+    origenes = {h.origen for hallazgos in recomendados.values() for h in hallazgos}
+    savepoint = db.begin_nested()
+    try:
+        for indice in recomendados:
+            db.execute(text(indice.ddl()))
+        for tabla in {indice.tabla for indice in recomendados}:
+            db.execute(text(f"ANALYZE {tabla}"))
+        print("\nVerificación con los índices creados (antes -> después):")
+        for huella, forma in formas.items():
+            if forma["escenario"] not in origenes:
+                continue
+            despues = explicar(db, forma)
+            print(f"  {forma['escenario']:<30} {resumen_plan(planes[huella])}")
+            print(f"  {'':<30} {resumen_plan(despues)}")
+    finally:
+        savepoint.rollback()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--habitaciones", type=int, default=300)
+    parser.add_argument("--reservas", type=int, default=300_000)
+    parser.add_argument("--clientes", type=int, default=20_000)
+    parser.add_argument("--servicios", type=int, default=8)
+    parser.add_argument("--umbral-filas", type=int, default=10_000,
+                        help="filas estimadas a partir de las cuales una tabla se considera grande")
+    parser.add_argument("--planes", help="guardar los planes EXPLAIN en este archivo JSON")
+    parser.add_argument("--sin-migracion", action="store_true", help="no escribir la revisión de Alembic")
+    parser.add_argument("--sin-verificar", action="store_true", help="no repetir los EXPLAIN con los índices creados")
+    args = parser.parse_args()
+
+    with sesion_desechable() as db:
+        if db.get_bind().dialect.name != "postgresql":
+            print("El asesor de índices requiere PostgreSQL (EXPLAIN ANALYZE, BUFFERS).")
+            sys.exit(1)
+        print(f"Sembrando {args.habitaciones} habitaciones, {args.reservas} reservas y {args.clientes} clientes...")
+        datos = sembrar(db, args.habitaciones, args.reservas, args.clientes, args.servicios)
+        formas = capturar_formas(db, escenarios(datos))
+        grandes = tablas_grandes(db, args.umbral_filas)
+        existentes = indices_existentes(db)
+
+        planes, hallazgos = {}, []
+        print(f"\nFormas de consulta capturadas: {len(formas)} | Tablas grandes: {', '.join(sorted(grandes)) or '-'}")
+        for huella, forma in formas.items():
+            plan = planes[huella] = explicar(db, forma)
+            encontrados = escaneos_secuenciales(plan, grandes, forma["escenario"])
+            hallazgos.extend(encontrados)
+            print(f"  {forma['escenario']:<30} {resumen_plan(plan)}{'  <- Seq Scan' if encontrados else ''}")
+        hallazgos.extend(claves_foraneas_sin_indice(existentes, grandes))
+
+        if args.planes:
+            with open(args.planes, "w", encoding="utf-8") as archivo:
+                json.dump(
+                    [{"escenario": f["escenario"], "huella": h, "plan": planes[h]} for h, f in formas.items()],
+                    archivo, ensure_ascii=False, indent=2, default=str,
+                )
+
+        print("\nHallazgos:")
+        for hallazgo in hallazgos:
+            print(f"  [{hallazgo.origen}] {hallazgo.detalle}")
+        if not hallazgos:
+            print("  Ninguno.")
+
+        recomendados = recomendar(hallazgos, existentes)
+        print("\nÍndices recomendados:")
+        for indice in recomendados:
+            print(f"  {indice.ddl()}")
+        if not recomendados:
+            print("  Ninguno.")
+            return
+
+        if not args.sin_verificar:
+            verificar(db, recomendados, formas, planes)
+        if not args.sin_migracion:
+            print(f"\nRevisión de Alembic escrita en {escribir_migracion(recomendados)}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,86 @@
+"""
+Benchmark: lecturas concurrentes de reservas con la pila síncrona
+(un hilo por petición) frente a la pila asíncrona (AsyncSession).
+
+Uso:
+    python -m benchmarks.bench_async --concurrencia 50 --peticiones 2000
+
+Los datos sembrados se confirman (cada petición usa su propia conexión) y se
+eliminan al terminar.
+"""
+
+import argparse
+import asyncio
+import random
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from sqlalchemy import select
+
+from crud.asincrono.reserva_crud import ReservaCRUDAsync
+from crud.reserva_crud import ReservaCRUD
+from database.config import SessionLocal, motor_asincrono, sesiones_asincronas
+from entities.reserva import Reserva
+from benchmarks.comun import eliminar_datos_sembrados, sembrar_hotel
+
+
+def leer_sincrono(id_reserva):
+    db = SessionLocal()
+    try:
+        ReservaCRUD.obtener_reserva(db, id_reserva)
+    finally:
+        db.close()
+
+
+async def leer_asincrono(semaforo, id_reserva):
+    async with semaforo:
+        async with sesiones_asincronas()() as db:
+            await ReservaCRUDAsync.obtener_reserva(db, id_reserva)
+
+
+async def ejecutar_asincrono(ids, concurrencia):
+    semaforo = asyncio.Semaphore(concurrencia)
+    await asyncio.gather(*(leer_asincrono(semaforo, id_reserva) for id_reserva in ids))
+    await motor_asincrono().dispose()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--concurrencia", type=int, default=50)
+    parser.add_argument("--peticiones", type=int, default=2000)
+    parser.add_argument("--reservas", type=int, default=20_000)
+    args = parser.parse_args()
+
+    db = SessionLocal()
+    try:
+        datos = sembrar_hotel(db, habitaciones=200, reservas=args.reservas)
+        db.commit()
+        todas = db.execute(select(Reserva.id_reserva).where(Reserva.id_cliente == datos["id_usuario"])).scalars().all()
+    finally:
+        db.close()
+
+    try:
+        ids = random.Random(7).choices(todas, k=args.peticiones)
+
+        inicio = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=args.concurrencia) as hilos:
+            list(hilos.map(leer_sincrono, ids))
+        sincrono = time.perf_counter() - inicio
+
+        inicio = time.perf_counter()
+        asyncio.run(ejecutar_asincrono(ids, args.concurrencia))
+        asincrono = time.perf_counter() - inicio
+
+        print(f"Peticiones: {args.peticiones} | Concurrencia: {args.concurrencia}")
+        print(f"Síncrono (hilos):   {sincrono:.3f} s ({args.peticiones / sincrono:.1f} lecturas/s)")
+        print(f"Asíncrono (asyncio): {asincrono:.3f} s ({args.peticiones / asincrono:.1f} lecturas/s)")
+    finally:
+        db = SessionLocal()
+        try:
+            eliminar_datos_sembrados(db, datos)
+        finally:
+            db.close()
+
+
+if __name__ == "__main__":
+    main()
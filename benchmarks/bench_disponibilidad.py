@@ -0,0 +1,58 @@
+"""
+Benchmark: búsqueda de habitaciones libres por rango de fechas frente al
+escaneo por la bandera `Habitacion.disponible`.
+
+Uso:
+    python -m benchmarks.bench_disponibilidad --habitaciones 300 --reservas 300000
+
+Todo se ejecuta dentro de una transacción que se revierte al terminar.
+"""
+
+import argparse
+from datetime import date, timedelta
+
+from crud.disponibilidad_crud import DisponibilidadCRUD
+from entities.habitacion import Habitacion
+from benchmarks.comun import imprimir_resultados, medir, sembrar_hotel, sesion_desechable
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--habitaciones", type=int, default=300)
+    parser.add_argument("--reservas", type=int, default=300_000)
+    parser.add_argument("--repeticiones", type=int, default=50)
+    args = parser.parse_args()
+
+    with sesion_desechable() as db:
+        print(f"Sembrando {args.habitaciones} habitaciones y {args.reservas} reservas...")
+        datos = sembrar_hotel(db, habitaciones=args.habitaciones, reservas=args.reservas)
+        nombre_tipo, id_tipo = next(iter(datos["tipos"].items()))
+        fecha_entrada = date.today() + timedelta(days=30)
+        fecha_salida = fecha_entrada + timedelta(days=3)
+        historica = date.today() - timedelta(days=60)
+
+        def bandera():
+            db.query(Habitacion).filter_by(tipo=nombre_tipo, disponible=True).first()
+
+        def rango_futuro():
+            DisponibilidadCRUD.obtener_habitaciones_disponibles(db, id_tipo, fecha_entrada, fecha_salida, limite=1)
+
+        def rango_historico():
+            DisponibilidadCRUD.obtener_habitaciones_disponibles(db, id_tipo, historica, historica + timedelta(days=3), limite=1)
+
+        def rango_todas():
+            DisponibilidadCRUD.obtener_habitaciones_disponibles(db, id_tipo, historica, historica + timedelta(days=3))
+
+        resultados = {
+            "bandera disponible (actual)": medir(bandera, args.repeticiones),
+            "rango futuro, primera libre": medir(rango_futuro, args.repeticiones),
+            "rango histórico, primera libre": medir(rango_historico, args.repeticiones),
+            "rango histórico, todas las libres": medir(rango_todas, args.repeticiones),
+        }
+        imprimir_resultados(
+            f"Disponibilidad ({args.habitaciones} habitaciones, {args.reservas} reservas)", resultados
+        )
+
+
+if __name__ == "__main__":
+    main()
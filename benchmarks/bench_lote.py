@@ -0,0 +1,94 @@
+"""
+Benchmark: alta masiva de habitaciones con HabitacionCRUD.crear_habitacion,
+confirmando cada habitación frente a una unidad de trabajo (`lote`) con un
+único commit.
+
+Uso:
+    python -m benchmarks.bench_lote --habitaciones 1000
+
+Los commits son reales (un SAVEPOINT no cuesta lo mismo que un COMMIT), así
+que los datos se eliminan al terminar.
+"""
+
+import argparse
+import time
+
+from sqlalchemy import delete
+
+from crud.habitacion_crud import HabitacionCRUD
+from database.config import SessionLocal, engine
+from database.instrumentacion import instrumentacion
+from entities.habitacion import Habitacion
+from benchmarks.comun import eliminar_datos_sembrados, sembrar_hotel
+
+NUMERO_INICIAL = 800_000
+
+
+def nuevas_habitaciones(datos, cantidad, desplazamiento):
+    nombre, id_tipo = next(iter(datos["tipos"].items()))
+    return [
+        Habitacion(
+            numero=NUMERO_INICIAL + desplazamiento + i,
+            id_tipo=id_tipo,
+            tipo=nombre,
+            precio=150_000,
+            id_usuario_crea=datos["id_usuario"],
+        )
+        for i in range(cantidad)
+    ]
+
+
+def cronometrar(funcion) -> dict:
+    instrumentacion.reiniciar()
+    inicio = time.perf_counter()
+    funcion()
+    duracion = time.perf_counter() - inicio
+    sentencias = sum(s["ejecuciones"] for s in instrumentacion.resumen()["sentencias"])
+    return {"segundos": duracion, "sentencias": sentencias}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--habitaciones", type=int, default=1000)
+    args = parser.parse_args()
+
+    db = SessionLocal()
+    try:
+        datos = sembrar_hotel(db, habitaciones=0)
+        db.commit()
+    finally:
+        db.close()
+
+    instrumentacion.instalar(engine)
+    db = SessionLocal()
+    try:
+        def una_por_una():
+            for habitacion in nuevas_habitaciones(datos, args.habitaciones, 0):
+                HabitacionCRUD.crear_habitacion(db, habitacion)
+
+        def en_lote():
+            crud = HabitacionCRUD(db)
+            with crud.lote():
+                for habitacion in nuevas_habitaciones(datos, args.habitaciones, args.habitaciones):
+                    crud.crear_habitacion(db, habitacion)
+
+        resultados = {
+            "commit por habitación": cronometrar(una_por_una),
+            "unidad de trabajo (un commit)": cronometrar(en_lote),
+        }
+        print(f"Habitaciones creadas por modo: {args.habitaciones}")
+        for nombre, r in resultados.items():
+            print(
+                f"{nombre:<34} {r['segundos']:>8.3f} s | {args.habitaciones / r['segundos']:>9.1f} hab/s"
+                f" | {r['sentencias']} sentencias"
+            )
+    finally:
+        instrumentacion.desinstalar(engine)
+        db.rollback()
+        db.execute(delete(Habitacion).where(Habitacion.id_usuario_crea == datos["id_usuario"]))
+        eliminar_datos_sembrados(db, datos)
+        db.close()
+
+
+if __name__ == "__main__":
+    main()
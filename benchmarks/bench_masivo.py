@@ -0,0 +1,104 @@
+"""
+Benchmark: alta masiva de habitaciones y usuarios con los métodos bulk_crear_*
+frente a la unidad de trabajo con crear_* fila por fila.
+
+Uso:
+    python -m benchmarks.bench_masivo --habitaciones 20000 --usuarios 50000
+
+Los datos se confirman (COPY y los commits son reales) y se eliminan al terminar.
+"""
+
+import argparse
+import time
+import uuid
+
+from sqlalchemy import delete
+
+from crud.habitacion_crud import HabitacionCRUD
+from crud.usuario_crud import UsuarioCRUD
+from database.config import SessionLocal
+from entities.habitacion import Habitacion
+from entities.usuario import Usuario
+from benchmarks.comun import eliminar_datos_sembrados, sembrar_hotel
+
+NUMERO_INICIAL = 700_000
+
+
+def habitaciones(datos, cantidad, desplazamiento):
+    nombre, id_tipo = next(iter(datos["tipos"].items()))
+    return [
+        Habitacion(
+            numero=NUMERO_INICIAL + desplazamiento + i,
+            id_tipo=id_tipo,
+            tipo=nombre,
+            precio=150_000,
+            id_usuario_crea=datos["id_usuario"],
+        )
+        for i in range(cantidad)
+    ]
+
+
+def usuarios(prefijo, cantidad):
+    return [
+        Usuario(
+            nombre="Masivo",
+            apellidos="Benchmark",
+            tipo_usuario="Cliente",
+            nombre_usuario=f"{prefijo}{i}",
+            clave="bench",
+        )
+        for i in range(cantidad)
+    ]
+
+
+def cronometrar(nombre, cantidad, funcion):
+    inicio = time.perf_counter()
+    funcion()
+    duracion = time.perf_counter() - inicio
+    print(f"{nombre:<40} {cantidad:>7} filas en {duracion:>8.3f} s | {cantidad / duracion:>10.1f} filas/s")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--habitaciones", type=int, default=20_000)
+    parser.add_argument("--usuarios", type=int, default=50_000)
+    parser.add_argument("--fila-por-fila", type=int, default=2_000,
+                        help="filas para la variante crear_* dentro de un lote (más lenta)")
+    args = parser.parse_args()
+
+    db = SessionLocal()
+    try:
+        datos = sembrar_hotel(db, habitaciones=0)
+        db.commit()
+    finally:
+        db.close()
+
+    prefijo = f"masivo_{uuid.uuid4().hex[:8]}_"
+    db = SessionLocal()
+    try:
+        def habitaciones_fila_por_fila():
+            with HabitacionCRUD(db).lote():
+                for habitacion in habitaciones(datos, args.fila_por_fila, 0):
+                    HabitacionCRUD.crear_habitacion(db, habitacion)
+
+        def usuarios_fila_por_fila():
+            with UsuarioCRUD(db).lote():
+                for usuario in usuarios(prefijo + "f", args.fila_por_fila):
+                    UsuarioCRUD.crear_usuario(db, usuario)
+
+        cronometrar("habitaciones: crear_habitacion en lote", args.fila_por_fila, habitaciones_fila_por_fila)
+        cronometrar("habitaciones: bulk_crear_habitaciones", args.habitaciones,
+                    lambda: HabitacionCRUD.bulk_crear_habitaciones(db, habitaciones(datos, args.habitaciones, args.fila_por_fila)))
+        cronometrar("usuarios: crear_usuario en lote", args.fila_por_fila, usuarios_fila_por_fila)
+        cronometrar("usuarios: bulk_crear_usuarios", args.usuarios,
+                    lambda: UsuarioCRUD.bulk_crear_usuarios(db, usuarios(prefijo + "b", args.usuarios)))
+    finally:
+        db.rollback()
+        db.execute(delete(Habitacion).where(Habitacion.id_usuario_crea == datos["id_usuario"]))
+        db.execute(delete(Usuario).where(Usuario.nombre_usuario.startswith(prefijo)))
+        eliminar_datos_sembrados(db, datos)
+        db.close()
+
+
+if __name__ == "__main__":
+    main()
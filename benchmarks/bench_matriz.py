@@ -0,0 +1,111 @@
+"""
+Benchmark: búsqueda de fechas flexibles ("cualquier tipo libre N noches en los
+próximos D días") con una consulta de disponibilidad por fecha candidata y
+tipo, frente a la matriz de disponibilidad en memoria (MatrizDisponibilidad).
+
+Uso:
+    python -m benchmarks.bench_matriz --habitaciones 2000 --dias 60 --noches 3
+
+Siembra habitaciones y reservas activas futuras dentro de una transacción que
+se revierte al terminar. También mide la carga de la matriz y comprueba que
+las dos búsquedas dan el mismo resultado.
+"""
+
+import argparse
+import random
+import uuid
+from datetime import date, timedelta
+
+from crud.disponibilidad_crud import DisponibilidadCRUD
+from crud.matriz_disponibilidad import MatrizDisponibilidad
+from entities.reserva import Reserva
+from benchmarks.comun import imprimir_resultados, insertar_por_lotes, medir, sembrar_hotel, sesion_desechable
+
+
+def sembrar_futuras(db, datos: dict, dias: int, ocupacion: float, semilla: int = 42) -> int:
+    """Reservas activas sin solapamientos que ocupan ~`ocupacion` de las noches de los próximos `dias` días."""
+    aleatorio = random.Random(semilla)
+    filas = []
+    for id_habitacion in datos["habitaciones"]:
+        fecha = date.today()
+        while fecha < date.today() + timedelta(days=dias):
+            noches = aleatorio.randint(1, 5)
+            if aleatorio.random() < ocupacion:
+                filas.append({
+                    "id_reserva": uuid.uuid4(),
+                    "id_cliente": datos["id_usuario"],
+                    "id_habitacion": id_habitacion,
+                    "fecha_entrada": fecha,
+                    "fecha_salida": fecha + timedelta(days=noches),
+                    "estado_reserva": "Activa",
+                    "numero_de_personas": 2,
+                    "noches": noches,
+                    "costo_total": 100_000.0 * noches,
+                    "id_usuario_crea": datos["id_usuario"],
+                })
+            fecha += timedelta(days=noches)
+    insertar_por_lotes(db, Reserva, filas)
+    db.flush()
+    return len(filas)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--habitaciones", type=int, default=2000)
+    parser.add_argument("--dias", type=int, default=60, help="días de fechas de entrada candidatas")
+    parser.add_argument("--noches", type=int, default=3)
+    parser.add_argument("--ocupacion", type=float, default=0.85, help="fracción de noches reservadas")
+    parser.add_argument("--repeticiones", type=int, default=5)
+    args = parser.parse_args()
+
+    with sesion_desechable() as db:
+        datos = sembrar_hotel(db, habitaciones=args.habitaciones)
+        reservas = sembrar_futuras(db, datos, args.dias + args.noches, args.ocupacion)
+        print(f"Sembradas {args.habitaciones} habitaciones y {reservas} reservas activas futuras")
+        hoy = date.today()
+        tipos = list(datos["tipos"].values())
+        candidatas = [hoy + timedelta(days=d) for d in range(args.dias)]
+
+        def por_fecha_sql():
+            return [
+                (entrada, id_tipo)
+                for entrada in candidatas
+                for id_tipo in tipos
+                if DisponibilidadCRUD.obtener_habitaciones_disponibles(
+                    db, id_tipo, entrada, entrada + timedelta(days=args.noches), limite=1
+                )
+            ]
+
+        def cargar():
+            return MatrizDisponibilidad.cargar(db, hoy, args.dias + args.noches, conectar=False)
+
+        matriz = cargar()
+
+        def por_matriz():
+            return [
+                (entrada, id_tipo)
+                for entrada, id_tipo, _ in matriz.buscar_estancias(args.noches, hasta=hoy + timedelta(days=args.dias))
+                if id_tipo in datos["tipos"].values()
+            ]
+
+        # Las habitaciones de otros datos de la base también están en la matriz: solo se comparan las sembradas
+        if sorted(por_fecha_sql(), key=str) != sorted(por_matriz(), key=str):
+            raise SystemExit("La matriz y las consultas SQL no coinciden")
+
+        entrada = hoy + timedelta(days=args.dias // 2)
+        resultados = {
+            f"SQL: {len(candidatas) * len(tipos)} consultas por fecha y tipo": medir(por_fecha_sql, args.repeticiones),
+            "matriz: carga": medir(cargar, args.repeticiones),
+            "matriz: buscar_estancias": medir(por_matriz, args.repeticiones),
+            "matriz: libres_por_tipo": medir(
+                lambda: matriz.libres_por_tipo(entrada, entrada + timedelta(days=args.noches)), args.repeticiones
+            ),
+        }
+        imprimir_resultados(
+            f"Búsqueda flexible: {args.noches} noches en {args.dias} días, {args.habitaciones} habitaciones",
+            resultados,
+        )
+
+
+if __name__ == "__main__":
+    main()
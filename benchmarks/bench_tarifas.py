@@ -0,0 +1,104 @@
+"""
+Benchmark: cotizar muchas estancias con el calendario de tarifas. Compara un
+bucle por noche en Python sobre las tarifas leídas, una consulta SUM por
+estancia (TarifaCRUD.cotizar_estancia) y la cotización vectorizada de
+CalendarioTarifas (sumas acumuladas de NumPy, una llamada para todas).
+
+Uso:
+    python -m benchmarks.bench_tarifas --habitaciones 500 --estancias 5000 --dias 365
+
+Siembra habitaciones y un año de tarifas (fines de semana y temporada alta)
+dentro de una transacción que se revierte al terminar, y comprueba que los
+tres métodos dan los mismos totales.
+"""
+
+import argparse
+import random
+from datetime import date, timedelta
+
+from sqlalchemy import select
+
+from crud.calendario_tarifas import CalendarioTarifas
+from crud.tarifa_crud import TarifaCRUD, sentencia_fijar
+from entities.tarifa_diaria import Tarifa_Diaria
+from benchmarks.comun import imprimir_resultados, medir, sembrar_hotel, sesion_desechable
+
+PRECIO_BASE = 100_000.0
+
+
+def sembrar_tarifas(db, tipos: list, inicio: date, dias: int) -> int:
+    """Viernes y sábados un 30 % más caros y diciembre y julio un 50 % más caros, para cada tipo."""
+    filas = []
+    for id_tipo in tipos:
+        for i in range(dias):
+            fecha = inicio + timedelta(days=i)
+            recargo = (0.3 if fecha.weekday() in (4, 5) else 0) + (0.5 if fecha.month in (7, 12) else 0)
+            if recargo:
+                filas.append({"id_tipo": id_tipo, "fecha": fecha, "precio": PRECIO_BASE * (1 + recargo)})
+    db.execute(sentencia_fijar(db, filas))
+    db.flush()
+    return len(filas)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--habitaciones", type=int, default=500)
+    parser.add_argument("--estancias", type=int, default=5000, help="estancias a cotizar")
+    parser.add_argument("--dias", type=int, default=365, help="días del calendario")
+    parser.add_argument("--repeticiones", type=int, default=5)
+    args = parser.parse_args()
+
+    with sesion_desechable() as db:
+        datos = sembrar_hotel(db, habitaciones=args.habitaciones)
+        tipos = list(datos["tipos"].values())
+        hoy = date.today()
+        print(f"Sembradas {sembrar_tarifas(db, tipos, hoy, args.dias):,} tarifas")
+        aleatorio = random.Random(42)
+        estancias = []
+        for _ in range(args.estancias):
+            noches = aleatorio.randint(1, 14)
+            estancias.append((
+                aleatorio.choice(tipos), hoy + timedelta(days=aleatorio.randint(0, args.dias - noches)), noches
+            ))
+
+        def por_noche():
+            tarifas = {
+                (t.id_tipo, t.fecha): t.precio
+                for t in db.execute(select(Tarifa_Diaria).where(Tarifa_Diaria.id_tipo.in_(tipos))).scalars()
+            }
+            return [
+                sum(tarifas.get((id_tipo, entrada + timedelta(days=i)), PRECIO_BASE) for i in range(noches))
+                for id_tipo, entrada, noches in estancias
+            ]
+
+        def por_consulta():
+            return [
+                TarifaCRUD.cotizar_estancia(db, id_tipo, PRECIO_BASE, entrada, entrada + timedelta(days=noches))
+                for id_tipo, entrada, noches in estancias
+            ]
+
+        def cargar():
+            return CalendarioTarifas.cargar(db, hoy, args.dias)
+
+        calendario = cargar()
+        tipos_estancia, entradas, noches = zip(*estancias)
+
+        def vectorizada():
+            return calendario.cotizar(tipos_estancia, entradas, noches, PRECIO_BASE)
+
+        referencia = por_noche()
+        for nombre, totales in (("SUM por estancia", por_consulta()), ("vectorizada", vectorizada())):
+            if any(abs(a - b) > 1e-6 for a, b in zip(referencia, totales)):
+                raise SystemExit(f"La cotización {nombre} no coincide con el bucle por noche")
+
+        resultados = {
+            "bucle por noche en Python": medir(por_noche, args.repeticiones),
+            f"{args.estancias} consultas SUM": medir(por_consulta, args.repeticiones),
+            "calendario: carga": medir(cargar, args.repeticiones),
+            "calendario: cotizar": medir(vectorizada, args.repeticiones),
+        }
+        imprimir_resultados(f"Cotizar {args.estancias} estancias ({args.dias} días de calendario)", resultados)
+
+
+if __name__ == "__main__":
+    main()
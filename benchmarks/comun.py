@@ -0,0 +1,170 @@
+"""
+Utilidades compartidas por los benchmarks.
+
+Los benchmarks usan la base de datos configurada en `database/config.py` y
+trabajan dentro de una transacción que se revierte al terminar, de modo que
+los datos sembrados nunca quedan guardados.
+"""
+
+import random
+import statistics
+import time
+import uuid
+from contextlib import contextmanager
+from datetime import date, timedelta
+
+from sqlalchemy import delete, insert
+from sqlalchemy.orm import Session
+
+from entities.cliente import Cliente
+from entities.habitacion import Habitacion
+from entities.reserva import Reserva
+from entities.tipo_habitacion import Tipo_Habitacion
+from entities.usuario import Usuario
+
+TAMANO_LOTE = 10_000
+
+
+@contextmanager
+def sesion_desechable():
+    """
+    Sesión ligada a una transacción externa que se revierte al salir.
+    Los commit() de los CRUD se convierten en SAVEPOINT dentro de ella.
+    """
+    from database.config import engine
+
+    with engine.connect() as conexion:
+        transaccion = conexion.begin()
+        db = Session(bind=conexion, join_transaction_mode="create_savepoint")
+        try:
+            yield db
+        finally:
+            db.close()
+            transaccion.rollback()
+
+
+def medir(funcion, repeticiones: int = 20) -> dict:
+    """
+    Ejecuta `funcion` varias veces y devuelve estadísticas en milisegundos.
+    """
+    tiempos = []
+    for _ in range(repeticiones):
+        inicio = time.perf_counter()
+        funcion()
+        tiempos.append((time.perf_counter() - inicio) * 1000)
+    tiempos.sort()
+    return {
+        "repeticiones": repeticiones,
+        "min_ms": round(tiempos[0], 3),
+        "mediana_ms": round(statistics.median(tiempos), 3),
+        "p95_ms": round(tiempos[min(len(tiempos) - 1, int(len(tiempos) * 0.95))], 3),
+    }
+
+
+def imprimir_resultados(titulo: str, resultados: dict) -> None:
+    print("\n" + "=" * 60)
+    print(titulo)
+    print("=" * 60)
+    for nombre, estadisticas in resultados.items():
+        print(
+            f"{nombre:<40} mediana {estadisticas['mediana_ms']:>9.3f} ms"
+            f" | p95 {estadisticas['p95_ms']:>9.3f} ms"
+        )
+
+
+def insertar_por_lotes(db: Session, modelo, filas: list) -> None:
+    for i in range(0, len(filas), TAMANO_LOTE):
+        db.execute(insert(modelo), filas[i:i + TAMANO_LOTE])
+
+
+def sembrar_hotel(db: Session, habitaciones: int = 300, reservas: int = 0, semilla: int = 42) -> dict:
+    """
+    Crea un usuario cliente, tres tipos de habitación, `habitaciones` habitaciones
+    y `reservas` reservas históricas sin solapamientos por habitación.
+
+    Returns:
+        dict con los identificadores creados (usuario, tipos, habitaciones).
+    """
+    aleatorio = random.Random(semilla)
+    id_usuario = uuid.uuid4()
+    db.execute(insert(Usuario).values(
+        id_usuario=id_usuario,
+        nombre="Benchmark",
+        apellidos="Benchmark",
+        tipo_usuario="Cliente",
+        nombre_usuario=f"bench_{id_usuario.hex[:12]}",
+        clave="bench",
+    ))
+    db.execute(insert(Cliente).values(id_cliente=id_usuario))
+
+    tipos = {}
+    for nombre in ("Estándar", "Suite", "Premium"):
+        id_tipo = uuid.uuid4()
+        tipos[nombre] = id_tipo
+        db.execute(insert(Tipo_Habitacion).values(
+            id_tipo=id_tipo,
+            nombre_tipo=f"{nombre} bench {id_tipo.hex[:6]}",
+            id_usuario_crea=id_usuario,
+        ))
+
+    nombres_tipo = list(tipos)
+    filas_habitacion = []
+    for i in range(habitaciones):
+        nombre = nombres_tipo[i % len(nombres_tipo)]
+        filas_habitacion.append({
+            "id_habitacion": uuid.uuid4(),
+            "numero": 900_000 + i,
+            "id_tipo": tipos[nombre],
+            "tipo": nombre,
+            "precio": float(aleatorio.choice((120_000, 180_000, 250_000))),
+            "disponible": True,
+            "id_usuario_crea": id_usuario,
+        })
+    insertar_por_lotes(db, Habitacion, filas_habitacion)
+
+    filas_reserva = []
+    if habitaciones and reservas:
+        por_habitacion = max(1, reservas // habitaciones)
+        inicio_historia = date.today() - timedelta(days=por_habitacion * 4)
+        for habitacion in filas_habitacion:
+            fecha = inicio_historia
+            for _ in range(por_habitacion):
+                noches = aleatorio.randint(1, 3)
+                filas_reserva.append({
+                    "id_reserva": uuid.uuid4(),
+                    "id_cliente": id_usuario,
+                    "id_habitacion": habitacion["id_habitacion"],
+                    "fecha_entrada": fecha,
+                    "fecha_salida": fecha + timedelta(days=noches),
+                    "estado_reserva": aleatorio.choice(("Activa", "Cancelada", "Finalizada")),
+                    "numero_de_personas": 2,
+                    "noches": noches,
+                    "costo_total": habitacion["precio"] * noches,
+                    "id_usuario_crea": id_usuario,
+                })
+                fecha += timedelta(days=noches + 1)
+                if len(filas_reserva) >= TAMANO_LOTE:
+                    insertar_por_lotes(db, Reserva, filas_reserva)
+                    filas_reserva = []
+        insertar_por_lotes(db, Reserva, filas_reserva)
+    db.flush()
+    return {
+        "id_usuario": id_usuario,
+        "tipos": tipos,
+        "habitaciones": [h["id_habitacion"] for h in filas_habitacion],
+    }
+
+
+def eliminar_datos_sembrados(db: Session, datos: dict) -> None:
+    """
+    Elimina y confirma los datos creados por `sembrar_hotel` cuando se sembraron
+    fuera de una transacción desechable.
+    """
+    habitaciones = datos["habitaciones"]
+    db.execute(delete(Reserva).where(Reserva.id_cliente == datos["id_usuario"]))
+    db.execute(delete(Reserva).where(Reserva.id_habitacion.in_(habitaciones)))
+    db.execute(delete(Habitacion).where(Habitacion.id_habitacion.in_(habitaciones)))
+    db.execute(delete(Tipo_Habitacion).where(Tipo_Habitacion.id_tipo.in_(datos["tipos"].values())))
+    db.execute(delete(Cliente).where(Cliente.id_cliente == datos["id_usuario"]))
+    db.execute(delete(Usuario).where(Usuario.id_usuario == datos["id_usuario"]))
+    db.commit()
@@ -0,0 +1,125 @@
+"""
+Prueba de estrés: varios hilos reservan a la vez el mismo tipo de habitación
+para las mismas fechas usando ReservaCRUD.asignar_habitacion.
+
+Comprueba que ninguna habitación queda con dos reservas activas solapadas e
+informa las reservas por segundo. Termina con código 1 si detecta una doble
+reserva.
+
+Uso:
+    python -m benchmarks.estres_reservas --hilos 16 --habitaciones 200
+
+Los datos sembrados se confirman (cada hilo usa su propia conexión) y se
+eliminan al terminar.
+"""
+
+import argparse
+import sys
+import threading
+import time
+from datetime import date, timedelta
+
+from sqlalchemy import func, select
+
+from crud.reserva_crud import ReservaCRUD
+from database.config import SessionLocal
+from entities.reserva import Reserva
+from benchmarks.comun import eliminar_datos_sembrados, sembrar_hotel
+
+
+def reservar_hasta_agotar(id_tipo, id_usuario, fecha_entrada, fecha_salida, resultados, errores):
+    db = SessionLocal()
+    try:
+        while True:
+            reserva = Reserva(
+                id_cliente=id_usuario,
+                fecha_entrada=fecha_entrada,
+                fecha_salida=fecha_salida,
+                estado_reserva="Activa",
+                numero_de_personas=2,
+                noches=(fecha_salida - fecha_entrada).days,
+                costo_total=0,
+                id_usuario_crea=id_usuario,
+            )
+            try:
+                ReservaCRUD.asignar_habitacion(db, reserva, id_tipo)
+            except ValueError:
+                break
+            resultados.append(reserva.id_habitacion)
+    except Exception as e:
+        errores.append(e)
+    finally:
+        db.close()
+
+
+def limpiar(datos):
+    db = SessionLocal()
+    try:
+        eliminar_datos_sembrados(db, datos)
+    finally:
+        db.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--hilos", type=int, default=16)
+    parser.add_argument("--habitaciones", type=int, default=200)
+    args = parser.parse_args()
+
+    db = SessionLocal()
+    try:
+        datos = sembrar_hotel(db, habitaciones=args.habitaciones)
+        db.commit()
+    finally:
+        db.close()
+
+    try:
+        id_tipo = next(iter(datos["tipos"].values()))
+        esperadas = len(range(0, args.habitaciones, len(datos["tipos"])))
+        fecha_entrada = date.today() + timedelta(days=365)
+        fecha_salida = fecha_entrada + timedelta(days=2)
+
+        resultados, errores = [], []
+        hilos = [
+            threading.Thread(
+                target=reservar_hasta_agotar,
+                args=(id_tipo, datos["id_usuario"], fecha_entrada, fecha_salida, resultados, errores),
+            )
+            for _ in range(args.hilos)
+        ]
+        inicio = time.perf_counter()
+        for hilo in hilos:
+            hilo.start()
+        for hilo in hilos:
+            hilo.join()
+        duracion = time.perf_counter() - inicio
+
+        db = SessionLocal()
+        try:
+            duplicadas = db.execute(
+                select(Reserva.id_habitacion, func.count())
+                .where(
+                    Reserva.id_habitacion.in_(datos["habitaciones"]),
+                    Reserva.estado_reserva == "Activa",
+                )
+                .group_by(Reserva.id_habitacion)
+                .having(func.count() > 1)
+            ).all()
+        finally:
+            db.close()
+
+        print(f"Hilos: {args.hilos} | Habitaciones del tipo: {esperadas}")
+        print(f"Reservas confirmadas: {len(resultados)} en {duracion:.3f} s "
+              f"({len(resultados) / duracion:.1f} reservas/s)")
+        print(f"Errores inesperados: {len(errores)}")
+        for error in errores[:5]:
+            print(f"  - {error!r}")
+        print(f"Habitaciones con doble reserva: {len(duplicadas)}")
+        if duplicadas or len(resultados) != esperadas or errores:
+            sys.exit(1)
+    finally:
+        limpiar(datos)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,312 @@
+"""
+Generador de datos sintéticos para pruebas de carga: usuarios, clientes,
+administradores, tipos de habitación, habitaciones, servicios, años de reservas
+con estacionalidad y los servicios contratados en cada reserva.
+
+Uso:
+    python -m benchmarks.generador_datos --clientes 200000 --habitaciones 25000 --anios 5
+    python -m benchmarks.generador_datos --eliminar
+
+A diferencia de los benchmarks, los datos SÍ se guardan. Con la misma semilla,
+los mismos parámetros y la misma `--fecha-referencia` se generan exactamente las
+mismas filas (incluidos los ids). Las reservas se escriben por bloques con `crud.masivo.insertar_filas`
+(COPY en PostgreSQL) y un commit por bloque. Cada habitación produce del orden
+de 80 reservas por año, así que 25.000 habitaciones y 5 años son ~10 millones.
+"""
+
+import argparse
+import random
+import time
+import uuid
+from bisect import bisect
+from datetime import date, datetime, timedelta, timezone
+
+from sqlalchemy import delete, exists, select
+
+from crud.masivo import insertar_filas
+from database.config import SessionLocal
+from entities.administrador import Administrador
+from entities.cliente import Cliente
+from entities.habitacion import Habitacion
+from entities.reserva import Reserva
+from entities.reserva_servicios import Reserva_Servicios
+from entities.servicios_adicionales import Servicios_Adicionales
+from entities.tipo_habitacion import Tipo_Habitacion
+from entities.usuario import Usuario
+
+# Factor de ocupación por mes (temporada alta en vacaciones de mitad y fin de año)
+TEMPORADA = {1: 0.80, 2: 0.55, 3: 0.60, 4: 0.70, 5: 0.60, 6: 0.90,
+             7: 0.95, 8: 0.85, 9: 0.55, 10: 0.60, 11: 0.65, 12: 1.00}
+# Viernes y sábado llegan más huéspedes
+FACTOR_FIN_DE_SEMANA = 1.25
+# Probabilidad de que llegue una reserva a una habitación libre con factor 1
+PROBABILIDAD_LLEGADA = 0.45
+
+NOCHES = (1, 2, 3, 4, 5, 6, 7)
+ACUMULADO_NOCHES = (0.30, 0.55, 0.73, 0.83, 0.90, 0.95)  # límites superiores de 1 a 6 noches
+
+TIPOS = {"Estándar": (120_000, 180_000), "Suite": (250_000, 380_000), "Premium": (400_000, 650_000)}
+SERVICIOS = {
+    "Desayuno": 25_000, "Spa": 120_000, "Transporte aeropuerto": 60_000, "Lavandería": 30_000,
+    "Minibar": 45_000, "Parqueadero": 20_000, "Tour ciudad": 90_000, "Cena romántica": 150_000,
+}
+NOMBRES = ("Ana", "Luis", "María", "Carlos", "Laura", "Andrés", "Sofía", "Juan", "Valentina", "Diego",
+           "Camila", "Jorge", "Paula", "Felipe", "Daniela", "Santiago", "Natalia", "Mateo", "Lucía", "Sebastián")
+APELLIDOS = ("García", "Rodríguez", "Martínez", "López", "González", "Pérez", "Sánchez", "Ramírez", "Torres",
+             "Flores", "Rivera", "Gómez", "Díaz", "Cortés", "Isaza", "Morales", "Castro", "Ortiz", "Vargas", "Rojas")
+
+TAMANO_BLOQUE = 200_000
+
+
+def generador(semilla: int, fase: str) -> random.Random:
+    """Un generador por fase, para que cambiar una cantidad no altere las demás fases."""
+    return random.Random(f"{semilla}-{fase}")
+
+
+def nuevo_id(aleatorio: random.Random) -> uuid.UUID:
+    return uuid.UUID(int=aleatorio.getrandbits(128), version=4)
+
+
+def usuarios(semilla: int, prefijo: str, clientes: int, administradores: int) -> tuple:
+    """Filas de usuario de los administradores y de los clientes, en ese orden."""
+    aleatorio = generador(semilla, "usuarios")
+    admins, clis = [], []
+    for tipo, cantidad, destino in (("Administrador", administradores, admins), ("Cliente", clientes, clis)):
+        for i in range(cantidad):
+            destino.append({
+                "id_usuario": nuevo_id(aleatorio),
+                "nombre": aleatorio.choice(NOMBRES),
+                "apellidos": f"{aleatorio.choice(APELLIDOS)} {aleatorio.choice(APELLIDOS)}",
+                "telefono": f"3{aleatorio.randrange(10**9):09d}",
+                "tipo_usuario": tipo,
+                "nombre_usuario": f"{prefijo}_{'admin' if tipo == 'Administrador' else 'cli'}_{i}",
+                "clave": "clave",
+            })
+    return admins, clis
+
+
+def catalogo(db, modelo, columna_nombre, filas: list) -> dict:
+    """
+    Inserta las filas del catálogo cuyo nombre no existe y devuelve nombre -> fila
+    guardada (un dict, no un objeto ORM), reutilizando las que ya estaban.
+    """
+    nombres = [fila[columna_nombre.key] for fila in filas]
+    existentes = set(db.execute(select(columna_nombre).where(columna_nombre.in_(nombres))).scalars())
+    insertar_filas(db, modelo, [fila for fila in filas if fila[columna_nombre.key] not in existentes])
+    guardadas = db.execute(select(*modelo.__table__.columns).where(columna_nombre.in_(nombres))).mappings()
+    return {fila[columna_nombre.key]: dict(fila) for fila in guardadas}
+
+
+def probabilidades_llegada(desde: date, hasta: date) -> list:
+    """Probabilidad de que empiece una reserva en cada día del rango, según temporada y día de la semana."""
+    dias = []
+    dia = desde
+    while dia < hasta:
+        factor = TEMPORADA[dia.month] * (FACTOR_FIN_DE_SEMANA if dia.weekday() in (4, 5) else 1.0)
+        dias.append(min(1.0, PROBABILIDAD_LLEGADA * factor))
+        dia += timedelta(days=1)
+    return dias
+
+
+def reservas_de_habitacion(aleatorio, habitacion: dict, desde: date, llegadas: list, hoy: date,
+                           clientes: list, servicios: list, prob_servicio: float, id_creador):
+    """
+    Recorre los días de una habitación y genera reservas que nunca se solapan
+    (la restricción de exclusión de PostgreSQL lo exige para las activas).
+    Devuelve (filas de reserva, filas de reserva_servicios).
+    """
+    r = aleatorio.random
+    filas, enlaces = [], []
+    total_dias = len(llegadas)
+    precio = habitacion["precio"]
+    dia = 0
+    while dia < total_dias:
+        if r() >= llegadas[dia]:
+            dia += 1
+            continue
+        noches = NOCHES[bisect(ACUMULADO_NOCHES, r())]
+        entrada = desde + timedelta(days=dia)
+        salida = entrada + timedelta(days=noches)
+        if salida <= hoy:
+            estado = "Cancelada" if r() < 0.10 else "Finalizada"
+        elif entrada > hoy:
+            estado = "Cancelada" if r() < 0.08 else "Activa"
+        else:
+            estado = "Activa"
+        id_reserva = nuevo_id(aleatorio)
+        costo = precio * noches
+        if r() < prob_servicio:
+            for servicio in aleatorio.sample(servicios, 1 + int(r() * min(3, len(servicios)))):
+                enlaces.append({"id_reserva": id_reserva, "id_servicio": servicio["id_servicio"], "precio": servicio["precio"]})
+                costo += servicio["precio"]
+        creacion = datetime.combine(entrada - timedelta(days=int(r() * 60)), datetime.min.time(), timezone.utc)
+        filas.append({
+            "id_reserva": id_reserva,
+            "id_cliente": clientes[int(r() * len(clientes))],
+            "id_habitacion": habitacion["id_habitacion"],
+            "fecha_entrada": entrada,
+            "fecha_salida": salida,
+            "estado_reserva": estado,
+            "numero_de_personas": 1 + int(r() * 4),
+            "noches": noches,
+            "costo_total": costo,
+            "id_usuario_crea": id_creador,
+            "fecha_creacion": creacion + timedelta(seconds=int(r() * 86_400)),
+        })
+        dia += noches
+    return filas, enlaces
+
+
+def generar(db, args) -> dict:
+    inicio = time.perf_counter()
+    hoy = args.fecha_referencia
+    admins, clis = usuarios(args.semilla, args.prefijo, args.clientes, args.administradores)
+    id_creador = admins[0]["id_usuario"]
+    insertar_filas(db, Usuario, admins + clis)
+    insertar_filas(db, Administrador, [{"id_admin": u["id_usuario"]} for u in admins])
+    insertar_filas(db, Cliente, [{"id_cliente": u["id_usuario"]} for u in clis])
+    db.commit()
+    print(f"Usuarios: {len(admins)} administradores y {len(clis)} clientes")
+
+    aleatorio = generador(args.semilla, "catalogo")
+    nombres_tipo = list(TIPOS)[:args.tipos] + [f"Tipo {i}" for i in range(len(TIPOS) + 1, args.tipos + 1)]
+    tipos = catalogo(db, Tipo_Habitacion, Tipo_Habitacion.nombre_tipo, [
+        {"id_tipo": nuevo_id(aleatorio), "nombre_tipo": nombre, "descripcion": f"Habitación {nombre}",
+         "id_usuario_crea": id_creador}
+        for nombre in nombres_tipo
+    ])
+    nombres_servicio = list(SERVICIOS)[:args.servicios] + [
+        f"Servicio {i}" for i in range(len(SERVICIOS) + 1, args.servicios + 1)
+    ]
+    servicios = list(catalogo(db, Servicios_Adicionales, Servicios_Adicionales.nombre_servicio, [
+        {"id_servicio": nuevo_id(aleatorio), "nombre_servicio": nombre,
+         "precio": float(SERVICIOS.get(nombre, 50_000)), "descripcion": nombre, "id_usuario_crea": id_creador}
+        for nombre in nombres_servicio
+    ]).values())
+
+    aleatorio = generador(args.semilla, "habitaciones")
+    habitaciones = []
+    for i in range(args.habitaciones):
+        nombre = nombres_tipo[i % len(nombres_tipo)]
+        minimo, maximo = TIPOS.get(nombre, (150_000, 300_000))
+        habitaciones.append({
+            "id_habitacion": nuevo_id(aleatorio),
+            "numero": args.numero_inicial + i,
+            "id_tipo": tipos[nombre]["id_tipo"],
+            "tipo": nombre[:20],
+            "precio": float(aleatorio.randrange(minimo, maximo + 1, 10_000)),
+            "disponible": True,
+            "id_usuario_crea": id_creador,
+        })
+    insertar_filas(db, Habitacion, habitaciones)
+    db.commit()
+    print(f"Catálogo: {len(tipos)} tipos, {len(servicios)} servicios y {len(habitaciones)} habitaciones")
+
+    desde = hoy - timedelta(days=365 * args.anios)
+    llegadas = probabilidades_llegada(desde, hoy + timedelta(days=args.dias_futuro))
+    ids_clientes = [u["id_usuario"] for u in clis]
+    aleatorio = generador(args.semilla, "reservas")
+    total_reservas = total_enlaces = 0
+    bloque, enlaces = [], []
+
+    def escribir():
+        nonlocal total_reservas, total_enlaces, bloque, enlaces
+        total_reservas += insertar_filas(db, Reserva, bloque)
+        total_enlaces += insertar_filas(db, Reserva_Servicios, enlaces)
+        db.commit()
+        bloque, enlaces = [], []
+        transcurrido = time.perf_counter() - inicio
+        print(f"  {total_reservas:>11,} reservas | {total_reservas / transcurrido:>9,.0f} reservas/s", flush=True)
+
+    for habitacion in habitaciones:
+        filas, nuevos_enlaces = reservas_de_habitacion(
+            aleatorio, habitacion, desde, llegadas, hoy, ids_clientes, servicios, args.prob_servicio, id_creador
+        )
+        bloque.extend(filas)
+        enlaces.extend(nuevos_enlaces)
+        if len(bloque) >= TAMANO_BLOQUE:
+            escribir()
+    if bloque:
+        escribir()
+    return {
+        "reservas": total_reservas,
+        "reserva_servicios": total_enlaces,
+        "segundos": time.perf_counter() - inicio,
+    }
+
+
+def eliminar(db, prefijo: str) -> None:
+    """
+    Elimina los datos creados por el generador con `prefijo`: todo lo que creó su
+    primer administrador y los usuarios con ese prefijo. Los tipos y servicios que
+    ya existían antes de generar se conservan.
+    """
+    id_creador = db.execute(
+        select(Usuario.id_usuario).where(Usuario.nombre_usuario == f"{prefijo}_admin_0")
+    ).scalar()
+    if id_creador is None:
+        print(f"No hay datos generados con el prefijo '{prefijo}'.")
+        return
+    generados = Usuario.nombre_usuario.startswith(f"{prefijo}_", autoescape=True)
+    ids_usuarios = select(Usuario.id_usuario).where(generados)
+    reservas = select(Reserva.id_reserva).where(Reserva.id_usuario_crea == id_creador)
+    db.execute(delete(Reserva_Servicios).where(Reserva_Servicios.id_reserva.in_(reservas)))
+    db.execute(delete(Reserva).where(Reserva.id_usuario_crea == id_creador))
+    db.execute(delete(Habitacion).where(Habitacion.id_usuario_crea == id_creador))
+    db.execute(delete(Tipo_Habitacion).where(
+        Tipo_Habitacion.id_usuario_crea == id_creador,
+        ~exists().where(Habitacion.id_tipo == Tipo_Habitacion.id_tipo),
+    ))
+    db.execute(delete(Servicios_Adicionales).where(
+        Servicios_Adicionales.id_usuario_crea == id_creador,
+        ~exists().where(Reserva_Servicios.id_servicio == Servicios_Adicionales.id_servicio),
+    ))
+    db.execute(delete(Cliente).where(Cliente.id_cliente.in_(ids_usuarios)))
+    db.execute(delete(Administrador).where(Administrador.id_admin.in_(ids_usuarios)))
+    db.execute(delete(Usuario).where(generados))
+    db.commit()
+    print(f"Datos generados con el prefijo '{prefijo}' eliminados.")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--semilla", type=int, default=42)
+    parser.add_argument("--prefijo", default="gen", help="prefijo de los nombres de usuario generados")
+    parser.add_argument("--clientes", type=int, default=10_000)
+    parser.add_argument("--administradores", type=int, default=3)
+    parser.add_argument("--tipos", type=int, default=3)
+    parser.add_argument("--servicios", type=int, default=8)
+    parser.add_argument("--habitaciones", type=int, default=300)
+    parser.add_argument("--numero-inicial", type=int, default=1000, help="número de la primera habitación")
+    parser.add_argument("--anios", type=int, default=3, help="años de historia hasta hoy")
+    parser.add_argument("--dias-futuro", type=int, default=180, help="días de reservas futuras")
+    parser.add_argument("--fecha-referencia", type=date.fromisoformat, default=date.today(),
+                        help="fecha que se toma como hoy (AAAA-MM-DD)")
+    parser.add_argument("--prob-servicio", type=float, default=0.3,
+                        help="probabilidad de que una reserva contrate servicios")
+    parser.add_argument("--eliminar", action="store_true", help="eliminar los datos generados con el prefijo")
+    args = parser.parse_args()
+    if args.administradores < 1:
+        parser.error("--administradores debe ser al menos 1")
+    if args.clientes < 1:
+        parser.error("--clientes debe ser al menos 1")
+
+    db = SessionLocal()
+    try:
+        if args.eliminar:
+            eliminar(db, args.prefijo)
+            return
+        resultado = generar(db, args)
+        print(
+            f"Generadas {resultado['reservas']:,} reservas y {resultado['reserva_servicios']:,} servicios"
+            f" contratados en {resultado['segundos']:.1f} s (semilla {args.semilla})"
+        )
+    except Exception:
+        db.rollback()
+        raise
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,112 @@
+"""
+Prueba de crecimiento de memoria: ejecuta miles de acciones de menú de
+SistemaGestion y mide con tracemalloc la memoria retenida cada cierto número
+de acciones, con una sesión por acción frente a una única sesión para todo el
+proceso (el comportamiento anterior).
+
+Uso:
+    python -m benchmarks.memoria_sesiones --acciones 2000 --habitaciones 200
+
+Con una sesión por acción la memoria debe quedar plana tras el calentamiento:
+si crece más de --max-crecimiento KiB entre la primera medida y cualquiera de
+las siguientes, termina con código 1. Los datos sembrados se eliminan al terminar.
+"""
+
+import argparse
+import contextlib
+import gc
+import os
+import sys
+import tracemalloc
+
+from crud.usuario_crud import UsuarioSesion
+from database.config import SessionLocal
+from entities.usuario import Usuario
+from main import SistemaGestion
+from benchmarks.comun import eliminar_datos_sembrados, sembrar_hotel
+
+ACCIONES = ("listar_habitaciones", "mostrar_reservas", "mostrar_perfil")
+CALENTAMIENTO = 200
+# Crecimiento tolerado con una sesión por acción (ruido de cachés internas de Python y SQLAlchemy)
+MAX_CRECIMIENTO_KIB = 256
+
+
+def ejecutar_acciones(sistema: SistemaGestion, acciones: int, puntos: int) -> list:
+    """
+    Ejecuta `acciones` acciones y devuelve la memoria retenida (KiB) en `puntos`
+    momentos equiespaciados, medida tras un ciclo del recolector.
+    """
+    cada = max(1, acciones // puntos)
+    medidas = []
+    with open(os.devnull, "w") as nulo, contextlib.redirect_stdout(nulo):
+        for _ in range(CALENTAMIENTO):
+            getattr(sistema, ACCIONES[_ % len(ACCIONES)])()
+        gc.collect()
+        tracemalloc.start()
+        try:
+            for i in range(1, acciones + 1):
+                getattr(sistema, ACCIONES[i % len(ACCIONES)])()
+                if i % cada == 0:
+                    gc.collect()
+                    medidas.append((i, tracemalloc.get_traced_memory()[0] / 1024))
+        finally:
+            tracemalloc.stop()
+    return medidas
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--acciones", type=int, default=2000)
+    parser.add_argument("--habitaciones", type=int, default=200)
+    parser.add_argument("--reservas", type=int, default=400)
+    parser.add_argument("--puntos", type=int, default=10)
+    parser.add_argument("--max-crecimiento", type=float, default=MAX_CRECIMIENTO_KIB,
+                        help="KiB que puede crecer la memoria con una sesión por acción")
+    args = parser.parse_args()
+
+    datos = None
+    try:
+        db = SessionLocal()
+        try:
+            datos = sembrar_hotel(db, habitaciones=args.habitaciones, reservas=args.reservas)
+            db.commit()
+            usuario = UsuarioSesion.desde_usuario(db.get(Usuario, datos["id_usuario"]))
+        finally:
+            db.close()
+
+        resultados = {}
+        with SistemaGestion() as sistema:
+            sistema.usuario_actual = usuario
+            resultados["sesión por acción"] = ejecutar_acciones(sistema, args.acciones, args.puntos)
+
+        with SistemaGestion() as sistema:
+            # Sesión abierta antes de las acciones: todas la reutilizan, como antes.
+            sistema._abrir_sesion()
+            sistema.usuario_actual = usuario
+            resultados["sesión única"] = ejecutar_acciones(sistema, args.acciones, args.puntos)
+
+        print(f"Memoria retenida (KiB) tras N acciones ({', '.join(ACCIONES)}):")
+        for nombre, medidas in resultados.items():
+            print(f"\n{nombre}")
+            for i, kib in medidas:
+                print(f"  {i:>8} acciones: {kib:>10.1f} KiB")
+            primera, ultima = medidas[0][1], medidas[-1][1]
+            print(f"  crecimiento: {ultima - primera:+.1f} KiB")
+    finally:
+        if datos is not None:
+            db = SessionLocal()
+            try:
+                eliminar_datos_sembrados(db, datos)
+            finally:
+                db.close()
+
+    medidas = resultados["sesión por acción"]
+    crecimiento = max(kib for _, kib in medidas) - medidas[0][1]
+    if crecimiento > args.max_crecimiento:
+        print(f"\nLa memoria creció {crecimiento:.1f} KiB con una sesión por acción "
+              f"(máximo {args.max_crecimiento:.0f} KiB)")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,175 @@
+"""
+Presupuesto de consultas por acción de SistemaGestion: ejecuta cada acción con
+sus input() respondidos de antemano y falla si emite más sentencias SQL que
+las declaradas en PRESUPUESTOS. Así una consulta N+1 o una carga perezosa
+nueva rompe la comprobación aunque no se note en los tiempos.
+
+Uso:
+    python -m benchmarks.presupuesto_consultas
+    python -m benchmarks.presupuesto_consultas --sqlite /tmp/presupuesto.db
+    python -m benchmarks.presupuesto_consultas --solo reserva --sin-raiseload
+
+Por defecto las relaciones se cargan como `lazy="raise"` durante cada acción
+(ver `sin_carga_perezosa`), de modo que un acceso a una relación no cargada
+también cuenta como fallo. Las cachés de referencia y de reportes se vacían
+antes de cada acción: el presupuesto cubre el peor caso. Termina con código 1
+si alguna acción supera su presupuesto o falla.
+"""
+
+import argparse
+import io
+import sys
+from datetime import date, timedelta
+
+from benchmarks.suite import entradas_de_consola, limpiar, sembrar, usar_sqlite
+
+DATASET = {"habitaciones": 20, "reservas": 200, "servicios": 3}
+
+# Acción de SistemaGestion -> número máximo de sentencias SQL.
+# Las entradas de cada acción se calculan en `entradas_por_accion`.
+PRESUPUESTOS = {
+    "mostrar_perfil": 0,
+    "mostrar_reservas": 1,
+    "listar_habitaciones": 1,
+    "listar_reservas": 1,
+    "listar_reservas_activas": 1,
+    "listar_usuarios": 1,
+    "listar_servicios": 1,
+    # indicadores + servicios más vendidos + cancelaciones
+    "mostrar_reportes": 3,
+    # Las escrituras de reservas mantienen ocupacion_diaria: al restar una reserva se
+    # lee su aporte (fechas, tipo y servicios en un SELECT) y se aplica con un upsert.
+    # listado + UPDATE condicionado + aporte + upsert (2 antes del resumen)
+    "cancelar_reserva": 4,
+    # listado + búsqueda por id + aporte + upsert + carga de reserva_servicios que
+    # hace db.delete + DELETE (4 antes del resumen: el aporte y el upsert suman 2)
+    "eliminar_reserva": 6,
+    "reservar_servicios": 5,
+    "reservar_habitacion": 9,
+}
+
+# Texto que las acciones imprimen cuando capturan una excepción
+_MARCAS_DE_ERROR = ("Error", "error")
+
+
+def entradas_por_accion(db, datos: dict) -> dict:
+    """
+    Respuestas a los input() de cada acción. Todas eligen reservas del usuario
+    sembrado, nunca datos ajenos: eliminar_reserva recibe la posición de la
+    última reserva sembrada dentro del listado completo.
+    """
+    from crud.reserva_crud import ReservaCRUD
+    from crud.servicios_adicioneles_crud import ServiciosAdicionalesCRUD
+    from crud.tipo_habitacion_crud import TipoHabitacionCRUD
+
+    id_usuario = datos["id_usuario"]
+    id_tipo = next(iter(datos["tipos"].values()))
+    tipos = TipoHabitacionCRUD.obtener_tipos_referencia(db)
+    servicios = ServiciosAdicionalesCRUD.obtener_servicios_referencia(db)
+    opcion_tipo = str(next(i for i, t in enumerate(tipos, 1) if t.id_tipo == id_tipo))
+    opciones_servicio = ",".join(
+        str(i) for i, s in enumerate(servicios, 1) if s.nombre_servicio.startswith("Suite bench")
+    )
+    propias = [
+        i for i, fila in enumerate(ReservaCRUD.obtener_reservas_detalladas(db), 1)
+        if fila.Reserva.id_cliente == id_usuario
+    ]
+    entrada = date.today() + timedelta(days=400)
+    return {
+        "mostrar_reportes": ["", ""],
+        "cancelar_reserva": ["1", "1"],
+        "eliminar_reserva": [str(propias[-1]), "1"],
+        "reservar_servicios": ["1", opciones_servicio],
+        "reservar_habitacion": ["2", "2", entrada.isoformat(), opcion_tipo, "1", "2"],
+    }
+
+
+def comprobar(datos: dict, solo: str = None, raiseload: bool = True) -> list:
+    """
+    Ejecuta cada acción dentro de su presupuesto y devuelve
+    (acción, sentencias, presupuesto, fallo) por acción; fallo es None si pasó.
+    """
+    import contextlib
+
+    from crud.cache_referencia import cache_referencia
+    from crud.reporte_crud import cache_reportes
+    from crud.usuario_crud import UsuarioSesion
+    from database.config import SessionLocal
+    from database.instrumentacion import PresupuestoConsultasExcedido, presupuesto_consultas, sin_carga_perezosa
+    from entities.usuario import Usuario
+    from main import SistemaGestion
+
+    with SessionLocal() as db:
+        usuario = UsuarioSesion.desde_usuario(db.get(Usuario, datos["id_usuario"]))
+        entradas = entradas_por_accion(db, datos)
+
+    resultados = []
+    for accion, maximo in PRESUPUESTOS.items():
+        if solo and solo not in accion:
+            continue
+        sistema = SistemaGestion()
+        sistema.usuario_actual = usuario
+        cache_referencia.invalidar()
+        cache_reportes.invalidar()
+        salida = io.StringIO()
+        fallo = None
+        contador = None
+        try:
+            with contextlib.ExitStack() as pila:
+                if raiseload:
+                    pila.enter_context(sin_carga_perezosa())
+                contador = pila.enter_context(presupuesto_consultas(maximo, nombre=accion))
+                pila.enter_context(entradas_de_consola(entradas.get(accion, ()), salida))
+                getattr(sistema, accion)()
+        except PresupuestoConsultasExcedido as e:
+            fallo = str(e)
+        except Exception as e:
+            fallo = f"{accion}: {type(e).__name__}: {e}"
+        impreso = salida.getvalue()
+        if fallo is None and any(marca in impreso for marca in _MARCAS_DE_ERROR):
+            # Las acciones capturan sus excepciones y solo las imprimen
+            fallo = f"{accion}: la acción informó un error:\n" + "\n".join(
+                "  " + linea for linea in impreso.splitlines() if any(m in linea for m in _MARCAS_DE_ERROR)
+            )
+        resultados.append((accion, contador.total if contador else None, maximo, fallo))
+    return resultados
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sqlite", metavar="RUTA", help="usar un archivo SQLite nuevo como sustituto local")
+    parser.add_argument("--solo", help="comprobar solo las acciones cuyo nombre contiene este texto")
+    parser.add_argument("--sin-raiseload", action="store_true", help="permitir la carga perezosa de relaciones")
+    args = parser.parse_args()
+
+    if args.sqlite:
+        usar_sqlite(args.sqlite)
+
+    from crud.cache_referencia import cache_referencia
+    from database.config import create_tables, engine
+    import entities  # noqa: F401  registra todos los modelos antes de create_all
+
+    if args.sqlite:
+        create_tables()
+    cache_referencia.invalidar()
+    print(f"Sembrando {DATASET} en {engine.dialect.name}...")
+    datos = sembrar(DATASET)
+    try:
+        resultados = comprobar(datos, args.solo, raiseload=not args.sin_raiseload)
+    finally:
+        limpiar(datos)
+        cache_referencia.invalidar()
+
+    print(f"\n{'Acción':<26} {'sentencias':>10} {'presupuesto':>12}")
+    for accion, sentencias, maximo, fallo in resultados:
+        estado = "ok" if fallo is None else "FALLA"
+        print(f"{accion:<26} {sentencias if sentencias is not None else '-':>10} {maximo:>12}  {estado}")
+    fallos = [fallo for *_, fallo in resultados if fallo is not None]
+    for fallo in fallos:
+        print(f"\n{fallo}")
+    if fallos:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,97 @@
+"""
+Tiempos de los reportes de ReporteCRUD sobre los datos ya cargados, comparados
+con objetivos en milisegundos. Los objetivos de OBJETIVOS_MS son para unos 10
+millones de reservas en PostgreSQL, generadas y resumidas con:
+
+    python -m benchmarks.generador_datos --clientes 200000 --habitaciones 25000 --anios 5
+    python hotel.py ocupacion reconstruir --desde 2020-01-01 --hasta 2026-01-01 --hilos 8
+
+Uso:
+    python -m benchmarks.reportes
+    python -m benchmarks.reportes --dias 90 --repeticiones 10 --salida reportes.json
+
+Cada reporte se mide sobre el periodo cerrado [hoy - --dias, hoy) consultando la
+base de datos (sin caché) y leyendo de la caché de reportes ya cargada. Los
+datos no se modifican. Termina con código 1 si alguna mediana supera su objetivo.
+"""
+
+import argparse
+import json
+import sys
+from datetime import date, timedelta
+
+from sqlalchemy import func, select
+
+from benchmarks.comun import imprimir_resultados, medir
+
+# Mediana máxima en milisegundos por reporte, con 10 millones de reservas y un año de periodo
+OBJETIVOS_MS = {
+    # Leen ocupacion_diaria: días x tipos filas, independiente del número de reservas
+    "indicadores": 50,
+    "ocupacion_por_dia": 100,
+    # Agregan las reservas del periodo (unos 2 millones en un año)
+    "servicios_mas_vendidos": 2000,
+    "cancelaciones": 1500,
+    # Periodos cerrados servidos desde cache_reportes
+    "indicadores (caché)": 1,
+    "ocupacion_por_dia (caché)": 1,
+    "servicios_mas_vendidos (caché)": 1,
+    "cancelaciones (caché)": 1,
+}
+
+
+def reportes(db, desde: date, hasta: date, usar_cache: bool) -> dict:
+    from crud.reporte_crud import ReporteCRUD
+
+    return {
+        "indicadores": lambda: ReporteCRUD.indicadores(db, desde, hasta, usar_cache=usar_cache),
+        "ocupacion_por_dia": lambda: ReporteCRUD.ocupacion_por_dia(db, desde, hasta, usar_cache=usar_cache),
+        "servicios_mas_vendidos": lambda: ReporteCRUD.servicios_mas_vendidos(db, desde, hasta, usar_cache=usar_cache),
+        "cancelaciones": lambda: ReporteCRUD.cancelaciones(db, desde, hasta, usar_cache=usar_cache),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--dias", type=int, default=365, help="días del periodo, terminando ayer")
+    parser.add_argument("--repeticiones", type=int, default=5)
+    parser.add_argument("--salida", help="guardar los resultados en este archivo JSON")
+    args = parser.parse_args()
+
+    from crud.reporte_crud import cache_reportes
+    from database.config import SessionLocal, engine
+    from entities.reserva import Reserva
+    import entities  # noqa: F401  registra todos los modelos y sus relaciones
+
+    hasta = date.today()
+    desde = hasta - timedelta(days=args.dias)
+    resultados = {}
+    with SessionLocal() as db:
+        total = db.execute(select(func.count()).select_from(Reserva)).scalar()
+        print(f"{total:,} reservas en {engine.dialect.name}; periodo {desde} → {hasta}")
+        for nombre, reporte in reportes(db, desde, hasta, usar_cache=False).items():
+            resultados[nombre] = medir(reporte, args.repeticiones)
+        cache_reportes.invalidar()
+        for nombre, reporte in reportes(db, desde, hasta, usar_cache=True).items():
+            reporte()
+            resultados[f"{nombre} (caché)"] = medir(reporte, args.repeticiones)
+        cache_reportes.invalidar()
+
+    imprimir_resultados(f"Reportes ({args.repeticiones} repeticiones)", resultados)
+    excedidos = [
+        f"{nombre}: mediana {estadisticas['mediana_ms']:.1f} ms > {OBJETIVOS_MS[nombre]} ms"
+        for nombre, estadisticas in resultados.items()
+        if estadisticas["mediana_ms"] > OBJETIVOS_MS[nombre]
+    ]
+    if args.salida:
+        with open(args.salida, "w", encoding="utf-8") as archivo:
+            json.dump({"reservas": total, "desde": desde.isoformat(), "hasta": hasta.isoformat(),
+                       "objetivos_ms": OBJETIVOS_MS, "resultados": resultados}, archivo, indent=2)
+    for excedido in excedidos:
+        print(f"Objetivo superado: {excedido}")
+    if excedidos:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
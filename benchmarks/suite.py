@@ -0,0 +1,387 @@
+"""
+Suite de benchmarks de las operaciones de los CRUD y de los flujos de
+SistemaGestion (reservar, cancelar, listar reservas y agregar servicios),
+sobre un conjunto de datos fijo. Los resultados se guardan en JSON para
+compararlos entre commits.
+
+Uso:
+    python -m benchmarks.suite --dataset pequeno --salida base.json
+    python -m benchmarks.suite --dataset pequeno --comparar base.json --salida actual.json
+    python -m benchmarks.suite --sqlite /tmp/suite.db --repeticiones 10
+
+Por defecto usa la base de datos configurada (PostgreSQL): siembra el conjunto
+de datos, lo confirma y lo elimina al terminar. Con `--sqlite` usa un archivo
+SQLite nuevo como sustituto local. Además de los tiempos, cada operación
+registra cuántas sentencias SQL ejecuta por llamada, que no depende del ruido
+de la máquina.
+"""
+
+import argparse
+import builtins
+import contextlib
+import itertools
+import json
+import os
+import subprocess
+import sys
+from datetime import date, datetime, timedelta
+
+# Conjuntos de datos fijos (sembrar_hotel usa siempre la misma semilla)
+DATASETS = {
+    "pequeno": {"habitaciones": 60, "reservas": 6_000, "servicios": 6},
+    "mediano": {"habitaciones": 300, "reservas": 60_000, "servicios": 12},
+    "grande": {"habitaciones": 1_500, "reservas": 600_000, "servicios": 24},
+}
+NUMERO_INICIAL = 950_000
+VERSION_FORMATO = 1
+
+
+def usar_sqlite(ruta: str) -> None:
+    """
+    Apunta la configuración a un archivo SQLite nuevo. Debe llamarse antes de
+    importar `database.config`. Las columnas UUID de PostgreSQL se guardan
+    como texto de 32 caracteres.
+    """
+    from sqlalchemy.dialects.postgresql import UUID
+    from sqlalchemy.ext.compiler import compiles
+
+    @compiles(UUID, "sqlite")
+    def _uuid_sqlite(tipo, compilador, **kw):
+        return "CHAR(32)"
+
+    if os.path.exists(ruta):
+        os.remove(ruta)
+    os.environ["DATABASE_URL"] = f"sqlite:///{ruta}"
+
+
+def commit_actual():
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+@contextlib.contextmanager
+def entradas_de_consola(entradas, salida=None):
+    """
+    Responde los input() de SistemaGestion con `entradas`. Lo impreso se
+    escribe en `salida` si se indica y, si no, se descarta.
+    """
+    respuestas = iter(entradas)
+    original = builtins.input
+    builtins.input = lambda *args: next(respuestas)
+    try:
+        with contextlib.ExitStack() as pila:
+            if salida is None:
+                salida = pila.enter_context(open(os.devnull, "w"))
+            pila.enter_context(contextlib.redirect_stdout(salida))
+            yield
+    finally:
+        builtins.input = original
+
+
+def sembrar(dataset: dict) -> dict:
+    from sqlalchemy import select
+    from crud.servicios_adicioneles_crud import ServiciosAdicionalesCRUD
+    from database.config import SessionLocal
+    from entities.reserva import Reserva
+    from entities.servicios_adicionales import Servicios_Adicionales
+    from entities.usuario import Usuario
+    from benchmarks.comun import sembrar_hotel
+
+    db = SessionLocal()
+    try:
+        datos = sembrar_hotel(db, habitaciones=dataset["habitaciones"], reservas=dataset["reservas"])
+        db.commit()
+        marca = datos["id_usuario"].hex[:6]
+        ServiciosAdicionalesCRUD.bulk_crear_servicios(db, [
+            Servicios_Adicionales(
+                nombre_servicio=f"Suite bench {marca} {i}",
+                precio=10_000.0 * (i + 1),
+                descripcion="Servicio de la suite de benchmarks",
+                id_usuario_crea=datos["id_usuario"],
+            )
+            for i in range(dataset["servicios"])
+        ])
+        usuario = db.get(Usuario, datos["id_usuario"])
+        datos["nombre_usuario"] = usuario.nombre_usuario
+        datos["id_reserva"] = db.execute(
+            select(Reserva.id_reserva).where(Reserva.id_cliente == datos["id_usuario"]).limit(1)
+        ).scalar()
+        return datos
+    finally:
+        db.close()
+
+
+def limpiar(datos: dict) -> None:
+    """Elimina lo sembrado y lo creado por las operaciones (todo pertenece al usuario sembrado)."""
+    from sqlalchemy import delete, select
+    from database.config import SessionLocal
+    from entities.habitacion import Habitacion
+    from entities.reserva import Reserva
+    from entities.reserva_servicios import Reserva_Servicios
+    from entities.servicios_adicionales import Servicios_Adicionales
+    from benchmarks.comun import eliminar_datos_sembrados
+
+    db = SessionLocal()
+    try:
+        reservas = select(Reserva.id_reserva).where(Reserva.id_cliente == datos["id_usuario"])
+        db.execute(delete(Reserva_Servicios).where(Reserva_Servicios.id_reserva.in_(reservas)))
+        db.execute(delete(Reserva).where(Reserva.id_cliente == datos["id_usuario"]))
+        db.execute(delete(Servicios_Adicionales).where(Servicios_Adicionales.id_usuario_crea == datos["id_usuario"]))
+        db.execute(delete(Reserva).where(Reserva.id_habitacion.in_(
+            select(Habitacion.id_habitacion).where(Habitacion.id_usuario_crea == datos["id_usuario"])
+        )))
+        db.execute(delete(Habitacion).where(Habitacion.id_usuario_crea == datos["id_usuario"]))
+        eliminar_datos_sembrados(db, datos)
+    finally:
+        db.close()
+
+
+def operaciones(db, datos: dict) -> dict:
+    """
+    Nombre -> función sin argumentos. Las operaciones de los CRUD comparten la
+    sesión `db`; los flujos usan SistemaGestion con una sesión por acción.
+    """
+    from sqlalchemy import select
+    from crud.disponibilidad_crud import DisponibilidadCRUD
+    from crud.habitacion_crud import HabitacionCRUD
+    from crud.reserva_crud import ReservaCRUD
+    from crud.reserva_servicios_crud import ReservaServiciosCRUD
+    from crud.servicios_adicioneles_crud import ServiciosAdicionalesCRUD
+    from crud.tarifa_crud import TarifaCRUD
+    from crud.tipo_habitacion_crud import TipoHabitacionCRUD
+    from crud.usuario_crud import UsuarioCRUD, UsuarioSesion
+    from database.config import SessionLocal
+    from entities.habitacion import Habitacion
+    from entities.reserva import Reserva
+    from entities.servicios_adicionales import Servicios_Adicionales
+    from entities.usuario import Usuario
+    from main import SistemaGestion
+
+    contador = itertools.count()
+    hoy = date.today()
+    nombre_tipo, id_tipo = next(iter(datos["tipos"].items()))
+    id_habitacion = datos["habitaciones"][0]
+    id_usuario = datos["id_usuario"]
+    ids_servicios = db.execute(
+        select(Servicios_Adicionales.id_servicio)
+        .where(Servicios_Adicionales.id_usuario_crea == id_usuario)
+        .order_by(Servicios_Adicionales.nombre_servicio)
+    ).scalars().all()
+    usuario_crud = UsuarioCRUD(db)
+
+    def fechas_futuras():
+        # Cada llamada reserva una ventana distinta, posterior a la historia sembrada
+        entrada = hoy + timedelta(days=400 + 3 * next(contador))
+        return entrada, entrada + timedelta(days=2)
+
+    def crear_habitacion():
+        HabitacionCRUD.crear_habitacion(db, Habitacion(
+            numero=NUMERO_INICIAL + next(contador), id_tipo=id_tipo, tipo=nombre_tipo[:20],
+            precio=150_000, id_usuario_crea=id_usuario,
+        ))
+
+    def asignar_habitacion():
+        entrada, salida = fechas_futuras()
+        ReservaCRUD.asignar_habitacion(db, Reserva(
+            id_cliente=id_usuario, fecha_entrada=entrada, fecha_salida=salida, estado_reserva="Activa",
+            numero_de_personas=2, noches=2, costo_total=300_000, id_usuario_crea=id_usuario,
+        ), id_tipo)
+
+    def actualizar_costo_total():
+        ReservaCRUD.actualizar_costo_total(db, datos["id_reserva"], 1_000)
+        db.commit()
+
+    def primeras_activas():
+        iterador = ReservaCRUD.iterar_reservas_activas(db)
+        try:
+            return list(itertools.islice(iterador, 1000))
+        finally:
+            iterador.close()
+
+    def abrir_sesion():
+        with SessionLocal() as sesion:
+            sesion.execute(select(1))
+
+    with SessionLocal() as sesion:
+        usuario_actual = UsuarioSesion.desde_usuario(sesion.get(Usuario, id_usuario))
+        tipos = TipoHabitacionCRUD.obtener_tipos_referencia(sesion)
+        servicios = ServiciosAdicionalesCRUD.obtener_servicios_referencia(sesion)
+    opcion_tipo = str(next(i for i, t in enumerate(tipos, 1) if t.id_tipo == id_tipo))
+    opciones_servicio = ",".join(
+        str(i) for i, s in enumerate(servicios, 1) if s.id_servicio in set(ids_servicios[:2])
+    )
+
+    def flujo(metodo: str, entradas=lambda: ()):
+        def ejecutar():
+            sistema = SistemaGestion()
+            sistema.usuario_actual = usuario_actual
+            with entradas_de_consola(entradas()):
+                getattr(sistema, metodo)()
+        return ejecutar
+
+    def entradas_reserva():
+        entrada, _ = fechas_futuras()
+        return ["2", "2", entrada.isoformat(), opcion_tipo, "1", "2"]
+
+    return {
+        "SessionLocal (abrir, SELECT 1, cerrar)": abrir_sesion,
+        "HabitacionCRUD.crear_habitacion": crear_habitacion,
+        "HabitacionCRUD.obtener_habitacion": lambda: HabitacionCRUD.obtener_habitacion(db, id_habitacion),
+        "HabitacionCRUD.obtener_habitaciones": lambda: HabitacionCRUD.obtener_habitaciones(db),
+        "HabitacionCRUD.actualizar_habitacion": lambda: HabitacionCRUD.actualizar_habitacion(
+            db, id_habitacion, precio=float(150_000 + next(contador)), id_usuario_edita=id_usuario
+        ),
+        "TipoHabitacionCRUD.obtener_tipos_habitacion": lambda: TipoHabitacionCRUD.obtener_tipos_habitacion(db),
+        "TipoHabitacionCRUD.obtener_tipos_referencia": lambda: TipoHabitacionCRUD.obtener_tipos_referencia(db),
+        "ServiciosAdicionalesCRUD.obtener_servicios": lambda: ServiciosAdicionalesCRUD.obtener_servicios(db),
+        "ServiciosAdicionalesCRUD.obtener_servicios_referencia":
+            lambda: ServiciosAdicionalesCRUD.obtener_servicios_referencia(db),
+        "UsuarioCRUD.obtener_usuario_por_nombre":
+            lambda: UsuarioCRUD.obtener_usuario_por_nombre(db, datos["nombre_usuario"]),
+        "UsuarioCRUD.autenticar_usuario": lambda: usuario_crud.autenticar_usuario(datos["nombre_usuario"], "bench"),
+        "UsuarioCRUD.actualizar_usuario": lambda: UsuarioCRUD.actualizar_usuario(
+            db, id_usuario, id_usuario_edita=id_usuario, telefono=str(next(contador))
+        ),
+        "DisponibilidadCRUD.obtener_habitaciones_disponibles":
+            lambda: DisponibilidadCRUD.obtener_habitaciones_disponibles(db, id_tipo, *fechas_futuras(), limite=1),
+        "DisponibilidadCRUD.habitacion_disponible":
+            lambda: DisponibilidadCRUD.habitacion_disponible(db, id_habitacion, *fechas_futuras()),
+        "DisponibilidadCRUD.contar_disponibles_por_tipo":
+            lambda: DisponibilidadCRUD.contar_disponibles_por_tipo(db, *fechas_futuras()),
+        "TarifaCRUD.cotizar_estancia":
+            lambda: TarifaCRUD.cotizar_estancia(db, id_tipo, 100_000.0, *fechas_futuras()),
+        "ReservaCRUD.obtener_reserva": lambda: ReservaCRUD.obtener_reserva(db, datos["id_reserva"]),
+        "ReservaCRUD.obtener_reservas_detalladas (cliente)":
+            lambda: ReservaCRUD.obtener_reservas_detalladas(db, id_cliente=id_usuario),
+        "ReservaCRUD.obtener_reservas_activas (página de 50)":
+            lambda: ReservaCRUD.obtener_reservas_activas(db, limite=50),
+        "ReservaCRUD.iterar_reservas_activas (1000)": primeras_activas,
+        "ReservaCRUD.actualizar_costo_total": actualizar_costo_total,
+        "ReservaCRUD.asignar_habitacion": asignar_habitacion,
+        "ReservaServiciosCRUD.agregar_servicios":
+            lambda: ReservaServiciosCRUD.agregar_servicios(db, datos["id_reserva"], ids_servicios[:2]),
+        "flujo: reservar habitación": flujo("reservar_habitacion", entradas_reserva),
+        "flujo: cancelar reserva": flujo("cancelar_reserva", lambda: ["1", "1"]),
+        "flujo: mostrar mis reservas": flujo("mostrar_reservas"),
+        "flujo: listar reservas activas": flujo("listar_reservas_activas"),
+        "flujo: agregar servicios": flujo("reservar_servicios", lambda: ["1", opciones_servicio]),
+    }
+
+
+def medir_operaciones(ops: dict, repeticiones: int, filtro: str = None) -> dict:
+    from database.config import engine
+    from database.instrumentacion import instrumentacion
+    from benchmarks.comun import medir
+
+    resultados = {}
+    instrumentacion.instalar(engine)
+    try:
+        for nombre, funcion in ops.items():
+            if filtro and filtro.lower() not in nombre.lower():
+                continue
+            funcion()  # calentamiento
+            instrumentacion.reiniciar()
+            estadisticas = medir(funcion, repeticiones)
+            sentencias = sum(s["ejecuciones"] for s in instrumentacion.resumen()["sentencias"])
+            estadisticas["sentencias_por_llamada"] = round(sentencias / repeticiones, 2)
+            resultados[nombre] = estadisticas
+            print(
+                f"{nombre:<55} mediana {estadisticas['mediana_ms']:>9.3f} ms | p95 {estadisticas['p95_ms']:>9.3f} ms"
+                f" | {estadisticas['sentencias_por_llamada']:>6} sentencias",
+                flush=True,
+            )
+    finally:
+        instrumentacion.desinstalar(engine)
+    return resultados
+
+
+def comparar(base: dict, actual: dict, umbral_pct: float) -> list:
+    """
+    Imprime la variación de la mediana de cada operación respecto a `base` y
+    devuelve las operaciones que empeoraron más de `umbral_pct` por ciento o
+    que ahora ejecutan más sentencias.
+    """
+    print(f"\nComparación con {base.get('commit') or 'base'} ({base['motor']}, dataset {base['dataset']}):")
+    regresiones = []
+    for nombre, resultado in actual["resultados"].items():
+        anterior = base["resultados"].get(nombre)
+        if anterior is None:
+            print(f"  {nombre:<55} (nueva)")
+            continue
+        cambio = (resultado["mediana_ms"] - anterior["mediana_ms"]) / anterior["mediana_ms"] * 100
+        mas_sentencias = resultado["sentencias_por_llamada"] > anterior.get("sentencias_por_llamada", float("inf"))
+        marca = ""
+        if cambio > umbral_pct or mas_sentencias:
+            marca = "  <- REGRESIÓN"
+            regresiones.append(nombre)
+        elif cambio < -umbral_pct:
+            marca = "  mejora"
+        print(
+            f"  {nombre:<55} {anterior['mediana_ms']:>9.3f} -> {resultado['mediana_ms']:>9.3f} ms"
+            f" ({cambio:+6.1f}%) | sentencias {anterior.get('sentencias_por_llamada', '?')}"
+            f" -> {resultado['sentencias_por_llamada']}{marca}"
+        )
+    return regresiones
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--dataset", choices=DATASETS, default="pequeno")
+    parser.add_argument("--repeticiones", type=int, default=30)
+    parser.add_argument("--sqlite", metavar="RUTA", help="usar un archivo SQLite nuevo como sustituto local")
+    parser.add_argument("--solo", help="medir solo las operaciones cuyo nombre contiene este texto")
+    parser.add_argument("--salida", help="guardar los resultados en este archivo JSON")
+    parser.add_argument("--comparar", metavar="JSON", help="comparar con los resultados de una ejecución anterior")
+    parser.add_argument("--umbral", type=float, default=10.0, help="porcentaje de empeoramiento que cuenta como regresión")
+    parser.add_argument("--fallar-en-regresion", action="store_true", help="terminar con código 1 si hay regresiones")
+    args = parser.parse_args()
+
+    if args.sqlite:
+        usar_sqlite(args.sqlite)
+
+    from crud.cache_referencia import cache_referencia
+    from database.config import SessionLocal, create_tables, engine
+    import entities  # noqa: F401  registra todos los modelos antes de create_all
+
+    if args.sqlite:
+        create_tables()
+    cache_referencia.invalidar()
+    dataset = DATASETS[args.dataset]
+    print(f"Sembrando el dataset '{args.dataset}' ({dataset}) en {engine.dialect.name}...")
+    datos = sembrar(dataset)
+    try:
+        db = SessionLocal()
+        try:
+            resultados = medir_operaciones(operaciones(db, datos), args.repeticiones, args.solo)
+        finally:
+            db.close()
+    finally:
+        limpiar(datos)
+        cache_referencia.invalidar()
+
+    actual = {
+        "version": VERSION_FORMATO,
+        "commit": commit_actual(),
+        "fecha": datetime.now().isoformat(timespec="seconds"),
+        "motor": engine.dialect.name,
+        "dataset": args.dataset,
+        "parametros": dict(dataset, repeticiones=args.repeticiones),
+        "resultados": resultados,
+    }
+    if args.salida:
+        with open(args.salida, "w", encoding="utf-8") as archivo:
+            json.dump(actual, archivo, ensure_ascii=False, indent=2)
+        print(f"\nResultados guardados en {args.salida}")
+    if args.comparar:
+        with open(args.comparar, encoding="utf-8") as archivo:
+            regresiones = comparar(json.load(archivo), actual, args.umbral)
+        if regresiones and args.fallar_en_regresion:
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
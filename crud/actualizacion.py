@@ -0,0 +1,37 @@
+from sqlalchemy import update
+from sqlalchemy.orm import Session
+
+
+def valores_actualizables(modelo, cambios: dict) -> dict:
+    """
+    Filtra `cambios` a las columnas de la tabla que se pueden actualizar (todas
+    salvo la clave primaria). Las claves que no son columnas se ignoran, igual que
+    antes se ignoraban los atributos inexistentes.
+    """
+    columnas = {c.key for c in modelo.__table__.columns if not c.primary_key}
+    return {clave: valor for clave, valor in cambios.items() if clave in columnas}
+
+
+def sentencia_actualizacion(modelo, columna_id, valor_id, valores: dict, *condiciones):
+    """
+    `UPDATE ... WHERE id = :id RETURNING *` que devuelve la entidad con los valores
+    ya guardados y, con synchronize_session="fetch", actualiza el objeto si ya
+    estaba en la sesión usando el mismo RETURNING (sin SELECT adicional). `condiciones` se agregan al WHERE para validar contra el estado
+    actual de la fila en la misma sentencia.
+    """
+    return (
+        update(modelo)
+        .where(columna_id == valor_id, *condiciones)
+        .values(**valores)
+        .returning(modelo)
+        .execution_options(synchronize_session="fetch")
+    )
+
+
+def actualizar_por_id(db: Session, modelo, columna_id, valor_id, valores: dict, *condiciones):
+    """
+    Actualiza una fila en un solo viaje a la base de datos y devuelve la entidad,
+    o None si ninguna fila cumplió el WHERE. No hace commit.
+    """
+    sentencia = sentencia_actualizacion(modelo, columna_id, valor_id, valores, *condiciones)
+    return db.execute(sentencia).scalars().first()
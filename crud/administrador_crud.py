@@ -1,6 +1,9 @@
+from sqlalchemy import select
 from sqlalchemy.orm import Session
 from sqlalchemy.dialects.postgresql import UUID
 from entities.administrador import Administrador
+from crud.paginacion import paginar
+from crud.unidad_trabajo import confirmar, lote
 
 class AdministradorCRUD:
     """
@@ -10,9 +13,10 @@ class AdministradorCRUD:
     los cuales deben estar asociados a un usuario previamente creado.
 
     Funciones principales:
-        - crear_administrador(db: Session, administrador: Administrador) -> Administrador
+        - lote() -> ContextManager  (unidad de trabajo con un único commit)
+        - crear_administrador(db: Session, administrador: Administrador, refrescar: bool = False) -> Administrador
         - obtener_administrador(db: Session, id_admin: UUID) -> Administrador
-        - obtener_administradores(db: Session, skip: int = 0, limit: int = 100) -> List[Administrador]
+        - obtener_administradores(db: Session, despues_de: UUID = None, limite: int = 100) -> List[Administrador]
         - eliminar_administrador(db: Session, id_admin: UUID) -> bool
 
     Notas:
@@ -20,15 +24,17 @@ class AdministradorCRUD:
     """
     def __init__(self, db):
         self.db = db
-        
+
+    def lote(self):
+        return lote(self.db)
+
     @staticmethod
-    def crear_administrador(db: Session, administrador: Administrador):
+    def crear_administrador(db: Session, administrador: Administrador, refrescar: bool = False):
         if not administrador.id_admin:
             raise ValueError("El administrador debe estar asociado a un usuario")
         
         db.add(administrador)
-        db.commit()
-        db.refresh(administrador)
+        confirmar(db, administrador, refrescar=refrescar)
         return administrador
 
     @staticmethod
@@ -39,8 +45,8 @@ class AdministradorCRUD:
         return admin
 
     @staticmethod
-    def obtener_administradores(db: Session, skip: int = 0, limit: int = 100):
-        return db.query(Administrador).offset(skip).limit(limit).all()
+    def obtener_administradores(db: Session, despues_de: UUID = None, limite: int = 100):
+        return paginar(db, select(Administrador), Administrador.id_admin, despues_de, limite)
 
     @staticmethod
     def eliminar_administrador(db: Session, id_admin: UUID) -> bool:
@@ -48,5 +54,5 @@ class AdministradorCRUD:
         if not admin:
             raise ValueError("Administrador no encontrado")
         db.delete(admin)
-        db.commit()
+        confirmar(db)
         return True
@@ -0,0 +1,48 @@
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.dialects.postgresql import UUID
+from entities.administrador import Administrador
+from crud.paginacion import consulta_paginada
+
+class AdministradorCRUDAsync:
+    """
+    Versión asíncrona (AsyncSession) del CRUD de la entidad Administrador.
+
+    Funciones principales:
+        - crear_administrador(db: AsyncSession, administrador: Administrador) -> Administrador
+        - obtener_administrador(db: AsyncSession, id_admin: UUID) -> Administrador
+        - obtener_administradores(db: AsyncSession, despues_de: UUID = None, limite: int = 100) -> List[Administrador]
+        - eliminar_administrador(db: AsyncSession, id_admin: UUID) -> bool
+    """
+    def __init__(self, db):
+        self.db = db
+
+    @staticmethod
+    async def crear_administrador(db: AsyncSession, administrador: Administrador):
+        if not administrador.id_admin:
+            raise ValueError("El administrador debe estar asociado a un usuario")
+
+        db.add(administrador)
+        await db.commit()
+        return administrador
+
+    @staticmethod
+    async def obtener_administrador(db: AsyncSession, id_admin: UUID):
+        admin = await db.get(Administrador, id_admin)
+        if not admin:
+            raise ValueError("Administrador no encontrado")
+        return admin
+
+    @staticmethod
+    async def obtener_administradores(db: AsyncSession, despues_de: UUID = None, limite: int = 100):
+        resultado = await db.execute(consulta_paginada(select(Administrador), Administrador.id_admin, despues_de, limite))
+        return resultado.scalars().all()
+
+    @staticmethod
+    async def eliminar_administrador(db: AsyncSession, id_admin: UUID) -> bool:
+        admin = await db.get(Administrador, id_admin)
+        if not admin:
+            raise ValueError("Administrador no encontrado")
+        await db.delete(admin)
+        await db.commit()
+        return True
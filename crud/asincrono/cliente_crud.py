@@ -0,0 +1,48 @@
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.dialects.postgresql import UUID
+from entities.cliente import Cliente
+from crud.paginacion import consulta_paginada
+
+class ClienteCRUDAsync:
+    """
+    Versión asíncrona (AsyncSession) del CRUD de la entidad Cliente.
+
+    Funciones principales:
+        - crear_cliente(db: AsyncSession, cliente: Cliente) -> Cliente
+        - obtener_cliente(db: AsyncSession, id_cliente: UUID) -> Cliente
+        - obtener_clientes(db: AsyncSession, despues_de: UUID = None, limite: int = 100) -> List[Cliente]
+        - eliminar_cliente(db: AsyncSession, id_cliente: UUID) -> bool
+    """
+    def __init__(self, db):
+        self.db = db
+
+    @staticmethod
+    async def crear_cliente(db: AsyncSession, cliente: Cliente):
+        if not cliente.id_cliente:
+            raise ValueError("El cliente debe estar asociado a un usuario")
+
+        db.add(cliente)
+        await db.commit()
+        return cliente
+
+    @staticmethod
+    async def obtener_cliente(db: AsyncSession, id_cliente: UUID):
+        cliente = await db.get(Cliente, id_cliente)
+        if not cliente:
+            raise ValueError("Cliente no encontrado")
+        return cliente
+
+    @staticmethod
+    async def obtener_clientes(db: AsyncSession, despues_de: UUID = None, limite: int = 100):
+        resultado = await db.execute(consulta_paginada(select(Cliente), Cliente.id_cliente, despues_de, limite))
+        return resultado.scalars().all()
+
+    @staticmethod
+    async def eliminar_cliente(db: AsyncSession, id_cliente: UUID) -> bool:
+        cliente = await db.get(Cliente, id_cliente)
+        if not cliente:
+            raise ValueError("Cliente no encontrado")
+        await db.delete(cliente)
+        await db.commit()
+        return True
@@ -0,0 +1,74 @@
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.dialects.postgresql import UUID
+from entities.habitacion import Habitacion
+from crud.actualizacion import sentencia_actualizacion, valores_actualizables
+from crud.insercion import sentencia_insertar_si_no_existe
+from crud.paginacion import consulta_paginada
+from crud.habitacion_crud import CLAVE_HABITACION
+
+class HabitacionCRUDAsync:
+    """
+    Versión asíncrona (AsyncSession) del CRUD de la entidad Habitación.
+
+    Funciones principales:
+        - crear_habitacion(db: AsyncSession, habitacion: Habitacion) -> Habitacion
+        - obtener_habitacion(db: AsyncSession, id_habitacion: UUID) -> Habitacion
+        - obtener_habitaciones(db: AsyncSession, despues_de: int = None, limite: int = None) -> List[Habitacion]
+        - actualizar_habitacion(db: AsyncSession, id_habitacion: UUID, **kwargs) -> Habitacion
+        - eliminar_habitacion(db: AsyncSession, id_habitacion: UUID) -> bool
+
+    Notas:
+        - Igual que ReservaCRUDAsync, no mantiene ocupacion_diaria: tras cambiar aquí el
+          tipo de una habitación hay que reconstruir el resumen de sus fechas.
+    """
+    def __init__(self, db):
+        self.db = db
+
+    @staticmethod
+    async def crear_habitacion(db: AsyncSession, habitacion: Habitacion):
+        if habitacion.precio <= 0:
+            raise ValueError("El precio debe ser mayor a 0")
+
+        resultado = await db.execute(sentencia_insertar_si_no_existe(db, habitacion, Habitacion.numero))
+        creada = resultado.scalars().first()
+        if not creada:
+            raise ValueError("El número de habitación ya está en uso")
+        await db.commit()
+        return creada
+
+    @staticmethod
+    async def obtener_habitacion(db: AsyncSession, id_habitacion: UUID):
+        habitacion = await db.get(Habitacion, id_habitacion)
+        if not habitacion:
+            raise ValueError("Habitación no encontrada")
+        return habitacion
+
+    @staticmethod
+    async def obtener_habitaciones(db: AsyncSession, despues_de: int = None, limite: int = None):
+        resultado = await db.execute(consulta_paginada(select(Habitacion), CLAVE_HABITACION, despues_de, limite))
+        return resultado.scalars().all()
+
+    @staticmethod
+    async def actualizar_habitacion(db: AsyncSession, id_habitacion: UUID, **kwargs):
+        valores = valores_actualizables(Habitacion, kwargs)
+        if not valores:
+            return await HabitacionCRUDAsync.obtener_habitacion(db, id_habitacion)
+        if "precio" in valores and valores["precio"] <= 0:
+            raise ValueError("El precio debe ser mayor a 0")
+
+        resultado = await db.execute(sentencia_actualizacion(Habitacion, Habitacion.id_habitacion, id_habitacion, valores))
+        habitacion = resultado.scalars().first()
+        if not habitacion:
+            raise ValueError("Habitación no encontrada")
+        await db.commit()
+        return habitacion
+
+    @staticmethod
+    async def eliminar_habitacion(db: AsyncSession, id_habitacion: UUID) -> bool:
+        habitacion = await db.get(Habitacion, id_habitacion)
+        if not habitacion:
+            raise ValueError("Habitación no encontrada")
+        await db.delete(habitacion)
+        await db.commit()
+        return True
@@ -0,0 +1,198 @@
+from sqlalchemy import select
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.dialects.postgresql import UUID
+from entities.habitacion import Habitacion
+from entities.reserva import Reserva
+from entities.usuario import Usuario
+from crud.actualizacion import sentencia_actualizacion, valores_actualizables
+from crud.disponibilidad_crud import condicion_habitacion_libre
+from crud.ocupacion_crud import OcupacionCRUD
+from crud.paginacion import TAMANO_LOTE_STREAMING, consulta_paginada, consulta_streaming
+from crud.reserva_crud import CAMPOS_RESUMEN, CLAVE_RESERVA
+
+class ReservaCRUDAsync:
+    """
+    Versión asíncrona (AsyncSession) del CRUD de la entidad Reserva.
+
+    Funciones principales:
+        - crear_reserva(db: AsyncSession, reserva: Reserva) -> Reserva
+        - obtener_reserva(db: AsyncSession, id_reserva: UUID) -> Reserva
+        - obtener_reservas(db: AsyncSession, despues_de: tuple = None, limite: int = None) -> List[Reserva]
+        - iterar_reservas(db: AsyncSession, tamano_lote: int = 1000) -> AsyncIterator[Reserva]
+        - obtener_reservas_cliente(db: AsyncSession, id_cliente: UUID) -> List[Reserva]
+        - obtener_reservas_detalladas(db: AsyncSession, id_cliente: UUID = None, estado: str = None) -> List[Row]
+        - actualizar_reserva(db: AsyncSession, id_reserva: UUID, **kwargs) -> Reserva
+        - eliminar_reserva(db: AsyncSession, id_reserva: UUID) -> bool
+        - obtener_reservas_activas(db: AsyncSession, despues_de: tuple = None, limite: int = None) -> List[Reserva]
+        - actualizar_costo_total(db: AsyncSession, id_reserva: UUID, monto_extra: float) -> Reserva
+        - asignar_habitacion(db: AsyncSession, reserva: Reserva, id_tipo: UUID, max_intentos: int = 3, costo=None) -> Reserva
+
+    Notas:
+        - Mismas validaciones que ReservaCRUD.
+        - Mantiene el resumen de ocupación igual que ReservaCRUD, en la misma
+          transacción: las funciones de OcupacionCRUD se ejecutan sobre la sesión
+          síncrona subyacente con `AsyncSession.run_sync`.
+    """
+    def __init__(self, db):
+        self.db = db
+
+    @staticmethod
+    async def crear_reserva(db: AsyncSession, reserva: Reserva):
+        if not reserva.id_cliente or not reserva.id_habitacion:
+            raise ValueError("La reserva debe estar asociada a un cliente y una habitación")
+
+        if reserva.fecha_entrada >= reserva.fecha_salida:
+            raise ValueError("La fecha de entrada debe ser anterior a la fecha de salida")
+
+        db.add(reserva)
+        await db.flush()
+        await db.run_sync(OcupacionCRUD.aplicar_reserva, reserva.id_reserva, 1)
+        await db.commit()
+        await db.refresh(reserva)
+        return reserva
+
+    @staticmethod
+    async def obtener_reserva(db: AsyncSession, id_reserva: UUID):
+        reserva = await db.get(Reserva, id_reserva)
+        if not reserva:
+            raise ValueError("Reserva no encontrada")
+        return reserva
+
+    @staticmethod
+    async def obtener_reservas(db: AsyncSession, despues_de: tuple = None, limite: int = None):
+        resultado = await db.execute(consulta_paginada(select(Reserva), CLAVE_RESERVA, despues_de, limite))
+        return resultado.scalars().all()
+
+    @staticmethod
+    async def iterar_reservas(db: AsyncSession, tamano_lote: int = TAMANO_LOTE_STREAMING):
+        resultado = await db.stream_scalars(consulta_streaming(select(Reserva), CLAVE_RESERVA, tamano_lote))
+        async for reserva in resultado:
+            yield reserva
+
+    @staticmethod
+    async def obtener_reservas_cliente(db: AsyncSession, id_cliente: UUID):
+        resultado = await db.execute(select(Reserva).where(Reserva.id_cliente == id_cliente))
+        return resultado.scalars().all()
+
+    @staticmethod
+    async def obtener_reservas_detalladas(db: AsyncSession, id_cliente: UUID = None, estado: str = None):
+        """
+        Equivalente asíncrono de ReservaCRUD.obtener_reservas_detalladas.
+        """
+        consulta = (
+            select(
+                Reserva,
+                Habitacion.numero.label("numero_habitacion"),
+                Usuario.nombre.label("nombre_cliente"),
+                Usuario.apellidos.label("apellidos_cliente"),
+            )
+            .outerjoin(Habitacion, Habitacion.id_habitacion == Reserva.id_habitacion)
+            .outerjoin(Usuario, Usuario.id_usuario == Reserva.id_cliente)
+            .order_by(Reserva.fecha_entrada, Reserva.id_reserva)
+        )
+        if id_cliente is not None:
+            consulta = consulta.where(Reserva.id_cliente == id_cliente)
+        if estado is not None:
+            consulta = consulta.where(Reserva.estado_reserva == estado)
+        resultado = await db.execute(consulta)
+        return resultado.all()
+
+    @staticmethod
+    async def actualizar_reserva(db: AsyncSession, id_reserva: UUID, **kwargs):
+        valores = valores_actualizables(Reserva, kwargs)
+        if not valores:
+            return await ReservaCRUDAsync.obtener_reserva(db, id_reserva)
+
+        entrada, salida = valores.get("fecha_entrada"), valores.get("fecha_salida")
+        condiciones = []
+        if entrada and salida:
+            if entrada >= salida:
+                raise ValueError("La fecha de entrada debe ser anterior a la fecha de salida")
+        elif entrada:
+            condiciones.append(Reserva.fecha_salida > entrada)
+        elif salida:
+            condiciones.append(Reserva.fecha_entrada < salida)
+
+        afecta_resumen = not CAMPOS_RESUMEN.isdisjoint(valores)
+        anterior = await db.run_sync(OcupacionCRUD.leer_aporte, id_reserva) if afecta_resumen else None
+        resultado = await db.execute(sentencia_actualizacion(Reserva, Reserva.id_reserva, id_reserva, valores, *condiciones))
+        reserva = resultado.scalars().first()
+        if not reserva:
+            if await db.scalar(select(Reserva.id_reserva).where(Reserva.id_reserva == id_reserva)) is None:
+                raise ValueError("Reserva no encontrada")
+            raise ValueError("La fecha de entrada debe ser anterior a la fecha de salida")
+        if afecta_resumen:
+            await db.run_sync(OcupacionCRUD.aplicar_aporte, anterior, -1)
+            await db.run_sync(OcupacionCRUD.aplicar_reserva, id_reserva, 1)
+        await db.commit()
+        return reserva
+
+    @staticmethod
+    async def eliminar_reserva(db: AsyncSession, id_reserva: UUID) -> bool:
+        reserva = await db.get(Reserva, id_reserva)
+        if not reserva:
+            raise ValueError("Reserva no encontrada")
+        await db.run_sync(OcupacionCRUD.aplicar_reserva, id_reserva, -1)
+        await db.delete(reserva)
+        await db.commit()
+        return True
+
+    @staticmethod
+    async def obtener_reservas_activas(db: AsyncSession, despues_de: tuple = None, limite: int = None):
+        consulta = select(Reserva).where(Reserva.estado_reserva == "Activa")
+        resultado = await db.execute(consulta_paginada(consulta, CLAVE_RESERVA, despues_de, limite))
+        return resultado.scalars().all()
+
+    @staticmethod
+    async def actualizar_costo_total(db: AsyncSession, id_reserva, monto_extra: float):
+        anterior = await db.run_sync(OcupacionCRUD.leer_aporte, id_reserva)
+        resultado = await db.execute(sentencia_actualizacion(
+            Reserva, Reserva.id_reserva, id_reserva, {"costo_total": Reserva.costo_total + monto_extra}
+        ))
+        reserva = resultado.scalars().first()
+        if not reserva:
+            raise ValueError("Reserva no encontrada")
+        await db.run_sync(OcupacionCRUD.aplicar_aporte, anterior, -1)
+        await db.run_sync(OcupacionCRUD.aplicar_reserva, id_reserva, 1)
+        return reserva
+
+    @staticmethod
+    async def asignar_habitacion(db: AsyncSession, reserva: Reserva, id_tipo: UUID, max_intentos: int = 3, costo=None):
+        """
+        Equivalente asíncrono de ReservaCRUD.asignar_habitacion.
+        """
+        if not reserva.id_cliente:
+            raise ValueError("La reserva debe estar asociada a un cliente")
+        if reserva.fecha_entrada >= reserva.fecha_salida:
+            raise ValueError("La fecha de entrada debe ser anterior a la fecha de salida")
+
+        for _ in range(max_intentos):
+            consulta = (
+                select(Habitacion)
+                .where(
+                    Habitacion.id_tipo == id_tipo,
+                    Habitacion.disponible.is_(True),
+                    condicion_habitacion_libre(db, reserva.fecha_entrada, reserva.fecha_salida),
+                )
+                .order_by(Habitacion.numero)
+                .limit(1)
+                .with_for_update(skip_locked=True, of=Habitacion)
+            )
+            habitacion = (await db.execute(consulta)).scalars().first()
+            if not habitacion:
+                raise ValueError("No hay habitaciones disponibles de ese tipo para esas fechas")
+
+            reserva.id_habitacion = habitacion.id_habitacion
+            if costo is not None:
+                reserva.costo_total = costo(habitacion)
+            db.add(reserva)
+            try:
+                await db.flush()
+            except IntegrityError:
+                await db.rollback()
+                continue
+            await db.run_sync(OcupacionCRUD.sumar_reserva_nueva, reserva, habitacion.id_tipo)
+            await db.commit()
+            return reserva
+        raise ValueError("No se pudo asignar una habitación, intente de nuevo")
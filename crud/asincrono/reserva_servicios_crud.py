@@ -0,0 +1,51 @@
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.dialects.postgresql import UUID
+from entities.reserva_servicios import Reserva_Servicios
+from crud.paginacion import consulta_paginada
+from crud.reserva_servicios_crud import CLAVE_RESERVA_SERVICIO, precio_catalogo
+
+class ReservaServiciosCRUDAsync:
+    """
+    Versión asíncrona (AsyncSession) del CRUD de la entidad Reserva_Servicios.
+
+    Funciones principales:
+        - crear_reserva_servicio(db: AsyncSession, reserva_servicio: Reserva_Servicios) -> Reserva_Servicios
+        - obtener_reserva_servicio(db: AsyncSession, id_reserva: UUID, id_servicio: UUID) -> Reserva_Servicios
+        - obtener_reservas_servicios(db: AsyncSession, despues_de: tuple = None, limite: int = 100) -> List[Reserva_Servicios]
+        - eliminar_reserva_servicio(db: AsyncSession, id_reserva: UUID, id_servicio: UUID) -> bool
+    """
+    def __init__(self, db):
+        self.db = db
+
+    @staticmethod
+    async def crear_reserva_servicio(db: AsyncSession, reserva_servicio: Reserva_Servicios):
+        if not reserva_servicio.id_reserva or not reserva_servicio.id_servicio:
+            raise ValueError("El registro debe estar asociado a una reserva y un servicio")
+
+        if reserva_servicio.precio is None:
+            reserva_servicio.precio = precio_catalogo(reserva_servicio.id_servicio)
+        db.add(reserva_servicio)
+        await db.commit()
+        return reserva_servicio
+
+    @staticmethod
+    async def obtener_reserva_servicio(db: AsyncSession, id_reserva: UUID, id_servicio: UUID):
+        rs = await db.get(Reserva_Servicios, (id_reserva, id_servicio))
+        if not rs:
+            raise ValueError("Reserva-Servicio no encontrado")
+        return rs
+
+    @staticmethod
+    async def obtener_reservas_servicios(db: AsyncSession, despues_de: tuple = None, limite: int = 100):
+        resultado = await db.execute(consulta_paginada(select(Reserva_Servicios), CLAVE_RESERVA_SERVICIO, despues_de, limite))
+        return resultado.scalars().all()
+
+    @staticmethod
+    async def eliminar_reserva_servicio(db: AsyncSession, id_reserva: UUID, id_servicio: UUID) -> bool:
+        rs = await db.get(Reserva_Servicios, (id_reserva, id_servicio))
+        if not rs:
+            raise ValueError("Reserva-Servicio no encontrado")
+        await db.delete(rs)
+        await db.commit()
+        return True
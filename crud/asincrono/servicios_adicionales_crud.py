@@ -0,0 +1,68 @@
+from datetime import date
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.dialects.postgresql import UUID
+from entities.servicios_adicionales import Servicios_Adicionales
+from crud.insercion import sentencia_insertar_si_no_existe
+from crud.paginacion import consulta_paginada
+from crud.servicios_adicioneles_crud import CLAVE_SERVICIO
+
+class ServiciosAdicionalesCRUDAsync:
+    """
+    Versión asíncrona (AsyncSession) del CRUD de la entidad Servicios_Adicionales.
+
+    Funciones principales:
+        - crear_servicio(db: AsyncSession, servicio: Servicios_Adicionales) -> Servicios_Adicionales
+        - obtener_servicio(db: AsyncSession, id_servicio: UUID) -> Servicios_Adicionales
+        - obtener_servicios(db: AsyncSession, despues_de: tuple = None, limite: int = None) -> List[Servicios_Adicionales]
+        - actualizar_servicio(db: AsyncSession, servicio: Servicios_Adicionales, id_usuario_edita: UUID, fecha_edita: date) -> Servicios_Adicionales
+        - eliminar_servicio(db: AsyncSession, id_servicio: UUID) -> bool
+
+    Notas:
+        - Se valida nombre no vacío, precio mayor a 0 y unicidad del servicio.
+    """
+    def __init__(self, db):
+        self.db = db
+
+    @staticmethod
+    async def crear_servicio(db: AsyncSession, servicio: Servicios_Adicionales):
+        if not servicio.nombre_servicio or not servicio.nombre_servicio.strip():
+            raise ValueError("El nombre del servicio no puede estar vacío")
+        if servicio.precio <= 0:
+            raise ValueError("El precio del servicio debe ser mayor a 0")
+
+        resultado = await db.execute(sentencia_insertar_si_no_existe(db, servicio, Servicios_Adicionales.nombre_servicio))
+        creado = resultado.scalars().first()
+        if not creado:
+            raise ValueError("El servicio adicional ya existe")
+        await db.commit()
+        return creado
+
+    @staticmethod
+    async def obtener_servicio(db: AsyncSession, id_servicio: UUID):
+        servicio = await db.get(Servicios_Adicionales, id_servicio)
+        if not servicio:
+            raise ValueError("Servicio no encontrado")
+        return servicio
+
+    @staticmethod
+    async def obtener_servicios(db: AsyncSession, despues_de: tuple = None, limite: int = None):
+        resultado = await db.execute(consulta_paginada(select(Servicios_Adicionales), CLAVE_SERVICIO, despues_de, limite))
+        return resultado.scalars().all()
+
+    @staticmethod
+    async def actualizar_servicio(db: AsyncSession, servicio: Servicios_Adicionales, id_usuario_edita: UUID, fecha_edita: date):
+        servicio.id_usuario_edita = id_usuario_edita
+        servicio.fecha_edicion = fecha_edita
+        await db.commit()
+        await db.refresh(servicio)
+        return servicio
+
+    @staticmethod
+    async def eliminar_servicio(db: AsyncSession, id_servicio: UUID) -> bool:
+        servicio = await db.get(Servicios_Adicionales, id_servicio)
+        if not servicio:
+            raise ValueError("Servicio no encontrado")
+        await db.delete(servicio)
+        await db.commit()
+        return True
@@ -0,0 +1,56 @@
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.dialects.postgresql import UUID
+from entities.tipo_habitacion import Tipo_Habitacion
+from crud.insercion import sentencia_insertar_si_no_existe
+from crud.paginacion import consulta_paginada
+from crud.tipo_habitacion_crud import CLAVE_TIPO
+
+class TipoHabitacionCRUDAsync:
+    """
+    Versión asíncrona (AsyncSession) del CRUD de la entidad Tipo_Habitacion.
+
+    Funciones principales:
+        - crear_tipo_habitacion(db: AsyncSession, tipo: Tipo_Habitacion) -> Tipo_Habitacion
+        - obtener_tipo_habitacion(db: AsyncSession, id_tipo: UUID) -> Tipo_Habitacion
+        - obtener_tipos_habitacion(db: AsyncSession, despues_de: tuple = None, limite: int = None) -> List[Tipo_Habitacion]
+        - eliminar_tipo_habitacion(db: AsyncSession, id_tipo: UUID) -> bool
+
+    Notas:
+        - Se valida que no se repitan tipos de habitación con el mismo nombre.
+    """
+    def __init__(self, db):
+        self.db = db
+
+    @staticmethod
+    async def crear_tipo_habitacion(db: AsyncSession, tipo: Tipo_Habitacion):
+        if not tipo.nombre_tipo or not tipo.nombre_tipo.strip():
+            raise ValueError("El nombre del tipo de habitación no puede estar vacío")
+
+        resultado = await db.execute(sentencia_insertar_si_no_existe(db, tipo, Tipo_Habitacion.nombre_tipo))
+        creado = resultado.scalars().first()
+        if not creado:
+            raise ValueError("El tipo de habitación ya existe")
+        await db.commit()
+        return creado
+
+    @staticmethod
+    async def obtener_tipo_habitacion(db: AsyncSession, id_tipo: UUID):
+        tipo = await db.get(Tipo_Habitacion, id_tipo)
+        if not tipo:
+            raise ValueError("Tipo de habitación no encontrado")
+        return tipo
+
+    @staticmethod
+    async def obtener_tipos_habitacion(db: AsyncSession, despues_de: tuple = None, limite: int = None):
+        resultado = await db.execute(consulta_paginada(select(Tipo_Habitacion), CLAVE_TIPO, despues_de, limite))
+        return resultado.scalars().all()
+
+    @staticmethod
+    async def eliminar_tipo_habitacion(db: AsyncSession, id_tipo: UUID) -> bool:
+        tipo = await db.get(Tipo_Habitacion, id_tipo)
+        if not tipo:
+            raise ValueError("Tipo de habitación no encontrado")
+        await db.delete(tipo)
+        await db.commit()
+        return True
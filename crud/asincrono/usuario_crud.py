@@ -0,0 +1,95 @@
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.dialects.postgresql import UUID
+from entities.usuario import Usuario
+from crud.actualizacion import sentencia_actualizacion, valores_actualizables
+from crud.insercion import sentencia_insertar_si_no_existe
+from crud.paginacion import consulta_paginada
+from crud.usuario_crud import CLAVE_USUARIO
+
+class UsuarioCRUDAsync:
+    """
+    Versión asíncrona (AsyncSession) del CRUD de la entidad Usuario.
+
+    Funciones principales:
+        - crear_usuario(db: AsyncSession, nuevo_usuario: Usuario) -> Usuario
+        - obtener_usuario(db: AsyncSession, id_usuario: UUID) -> Usuario
+        - obtener_usuario_por_nombre(db: AsyncSession, nombre_usuario: str) -> Usuario
+        - obtener_usuarios(db: AsyncSession, despues_de: str = None, limite: int = 100) -> List[Usuario]
+        - actualizar_usuario(db: AsyncSession, id_usuario: UUID, id_usuario_edita: UUID, **kwargs) -> Usuario
+        - eliminar_usuario(db: AsyncSession, id_usuario: UUID) -> bool
+        - autenticar_usuario(db: AsyncSession, nombre_usuario: str, contrasena: str) -> Optional[Usuario]
+
+    Notas:
+        - Valida que el nombre de usuario sea único y no exceda 50 caracteres.
+        - La contraseña no debe exceder 10 caracteres.
+        - id_usuario_edita no se guarda: la tabla usuario no tiene esa columna.
+    """
+    def __init__(self, db):
+        self.db = db
+
+    @staticmethod
+    async def crear_usuario(db: AsyncSession, nuevo_usuario: Usuario):
+        resultado = await db.execute(sentencia_insertar_si_no_existe(db, nuevo_usuario, Usuario.nombre_usuario))
+        creado = resultado.scalars().first()
+        if not creado:
+            raise ValueError(f"El nombre de usuario '{nuevo_usuario.nombre_usuario}' ya está en uso.")
+        await db.commit()
+        return creado
+
+    @staticmethod
+    async def obtener_usuario(db: AsyncSession, id_usuario: UUID):
+        return await db.get(Usuario, id_usuario)
+
+    @staticmethod
+    async def obtener_usuario_por_nombre(db: AsyncSession, nombre_usuario: str):
+        return await db.scalar(select(Usuario).where(Usuario.nombre_usuario == nombre_usuario.strip()))
+
+    @staticmethod
+    async def obtener_usuarios(db: AsyncSession, despues_de: str = None, limite: int = 100):
+        resultado = await db.execute(consulta_paginada(select(Usuario), CLAVE_USUARIO, despues_de, limite))
+        return resultado.scalars().all()
+
+    @staticmethod
+    async def actualizar_usuario(db: AsyncSession, id_usuario: UUID, id_usuario_edita: UUID = None, **kwargs):
+        valores = valores_actualizables(Usuario, kwargs)
+        if not valores:
+            return await UsuarioCRUDAsync.obtener_usuario(db, id_usuario)
+
+        if "nombre_usuario" in valores:
+            nuevo_nombre = valores["nombre_usuario"].strip()
+            if len(nuevo_nombre) > 50:
+                raise ValueError("El nombre de usuario no puede exceder 50 caracteres")
+            existente = await db.scalar(select(Usuario.id_usuario).where(Usuario.nombre_usuario == nuevo_nombre))
+            if existente and existente != id_usuario:
+                raise ValueError("Ya existe un usuario con ese nombre")
+            valores["nombre_usuario"] = nuevo_nombre
+
+        if "clave" in valores and len(valores["clave"]) > 10:
+            raise ValueError("La clave no puede exceder 10 caracteres")
+
+        resultado = await db.execute(sentencia_actualizacion(Usuario, Usuario.id_usuario, id_usuario, valores))
+        usuario = resultado.scalars().first()
+        if not usuario:
+            return None
+        await db.commit()
+        return usuario
+
+    @staticmethod
+    async def eliminar_usuario(db: AsyncSession, id_usuario: UUID) -> bool:
+        usuario = await db.get(Usuario, id_usuario)
+        if usuario:
+            await db.delete(usuario)
+            await db.commit()
+            return True
+        return False
+
+    @staticmethod
+    async def autenticar_usuario(db: AsyncSession, nombre_usuario: str, contrasena: str):
+        """
+        Autenticar un usuario usando nombre de usuario y contraseña en texto plano.
+        """
+        usuario = await db.scalar(select(Usuario).where(Usuario.nombre_usuario == nombre_usuario))
+        if usuario and usuario.clave == contrasena:
+            return usuario
+        return None
@@ -0,0 +1,126 @@
+"""
+Caché en proceso para datos de referencia que casi nunca cambian
+(tipos de habitación y servicios adicionales).
+
+Guarda copias inmutables (no objetos ORM, que dependen de una sesión) con un
+tiempo de vida (TTL) y un número máximo de entradas. Los CRUD de
+Tipo_Habitacion y Servicios_Adicionales invalidan sus entradas al escribir; el
+TTL acota cuánto tarda en verse un cambio hecho por otro proceso.
+"""
+
+import os
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from uuid import UUID
+
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+
+from crud.unidad_trabajo import en_lote
+from database.instrumentacion import instrumentacion
+
+
+@dataclass(frozen=True)
+class TipoHabitacionRef:
+    id_tipo: UUID
+    nombre_tipo: str
+    descripcion: str
+
+
+@dataclass(frozen=True)
+class ServicioRef:
+    id_servicio: UUID
+    nombre_servicio: str
+    precio: float
+    descripcion: str
+
+
+class CacheReferencia:
+    """
+    Caché clave -> valor con expiración por TTL y desalojo LRU al superar
+    `max_entradas`. Es segura entre hilos y cuenta aciertos y fallos.
+
+    Cada invalidación avanza una generación: un valor cuya carga empezó antes de
+    una invalidación se devuelve a quien lo cargó pero no se guarda, porque
+    puede ser anterior a la escritura que la provocó.
+    """
+
+    def __init__(self, ttl_segundos: float = 300.0, max_entradas: int = 64):
+        self.ttl_segundos = ttl_segundos
+        self.max_entradas = max_entradas
+        self._lock = threading.Lock()
+        self._entradas = OrderedDict()
+        self._generacion = 0
+        self.reiniciar_estadisticas()
+
+    def reiniciar_estadisticas(self) -> None:
+        with self._lock:
+            self.aciertos = 0
+            self.fallos = 0
+            self.invalidaciones = 0
+
+    def obtener(self, clave, cargar):
+        """
+        Devuelve el valor de `clave`, llamando a `cargar()` si no está o expiró.
+        """
+        ahora = time.monotonic()
+        with self._lock:
+            entrada = self._entradas.get(clave)
+            if entrada is not None and entrada[0] > ahora:
+                self._entradas.move_to_end(clave)
+                self.aciertos += 1
+                return entrada[1]
+            self.fallos += 1
+            generacion = self._generacion
+
+        valor = cargar()
+        with self._lock:
+            if generacion != self._generacion:
+                return valor
+            self._entradas[clave] = (time.monotonic() + self.ttl_segundos, valor)
+            self._entradas.move_to_end(clave)
+            while len(self._entradas) > self.max_entradas:
+                self._entradas.popitem(last=False)
+        return valor
+
+    def invalidar(self, *claves) -> None:
+        """
+        Elimina las claves indicadas, o toda la caché si no se indica ninguna.
+        """
+        with self._lock:
+            self.invalidaciones += 1
+            self._generacion += 1
+            if not claves:
+                self._entradas.clear()
+            for clave in claves:
+                self._entradas.pop(clave, None)
+
+    def estadisticas(self) -> dict:
+        with self._lock:
+            consultas = self.aciertos + self.fallos
+            return {
+                "entradas": len(self._entradas),
+                "aciertos": self.aciertos,
+                "fallos": self.fallos,
+                "invalidaciones": self.invalidaciones,
+                "tasa_aciertos": round(self.aciertos / consultas, 3) if consultas else 0.0,
+            }
+
+
+cache_referencia = CacheReferencia(
+    ttl_segundos=float(os.getenv("CACHE_REFERENCIA_TTL", "300")),
+    max_entradas=int(os.getenv("CACHE_REFERENCIA_MAX_ENTRADAS", "64")),
+)
+instrumentacion.registrar_fuente("Caché de referencia", cache_referencia.estadisticas)
+
+
+def invalidar_tras_escritura(db: Session, *claves) -> None:
+    """
+    Invalida las claves tras una escritura. Dentro de un lote se vuelve a invalidar
+    al hacer el commit, para que nadie deje en caché datos anteriores a la confirmación.
+    """
+    cache_referencia.invalidar(*claves)
+    if en_lote(db):
+        event.listen(db, "after_commit", lambda sesion: cache_referencia.invalidar(*claves), once=True)
@@ -0,0 +1,109 @@
+from datetime import date, timedelta
+
+import numpy as np
+from sqlalchemy import func, select
+from sqlalchemy.orm import Session
+from entities.habitacion import Habitacion
+from entities.tarifa_diaria import Tarifa_Diaria
+from crud.matriz_disponibilidad import dias_desde
+
+# Días que cubre el calendario a partir de su fecha inicial
+DIAS_CALENDARIO = 365
+
+
+class CalendarioTarifas:
+    """
+    Tarifas por tipo de habitación y noche en memoria, con NumPy, para cotizar
+    muchas estancias en una sola llamada vectorizada.
+
+    Guarda por tipo la suma acumulada de las tarifas y del número de noches con
+    tarifa, de modo que el total de cualquier estancia son dos restas:
+    tarifas[entrada:salida] + precio_base x (noches - noches_con_tarifa), sin
+    recorrer las noches en Python.
+
+    Funciones principales:
+        - cargar(db: Session, inicio: date = None, dias: int = 365) -> CalendarioTarifas
+        - cotizar(ids_tipo, fechas_entrada, noches, precios_base=None) -> np.ndarray
+        - cotizar_estancias(estancias: List[tuple], noches: int) -> List[tuple]
+
+    Notas:
+        - Sin `precios_base` las noches sin tarifa se valoran al menor precio de las
+          habitaciones a la venta del tipo: es un precio "desde". Si el tipo no
+          tiene habitaciones a la venta el total es NaN.
+        - Es una foto del calendario al cargarlo: tras fijar_tarifas hay que volver
+          a cargarlo. La reserva se cobra con TarifaCRUD.cotizar_estancia.
+        - Las estancias deben caber en [inicio, inicio + dias).
+    """
+    def __init__(self, inicio: date, dias: int, ids_tipo, tarifas, precios_base):
+        self.inicio = inicio
+        self.dias = dias
+        self.ids_tipo = ids_tipo
+        self.precios_base = precios_base
+        self._fila_tipo = {id_tipo: i for i, id_tipo in enumerate(ids_tipo)}
+        # tipos x (dias + 1): columna d = suma de las noches [0, d)
+        self._tarifas_acumuladas = np.zeros((len(ids_tipo), dias + 1))
+        np.cumsum(np.nan_to_num(tarifas), axis=1, out=self._tarifas_acumuladas[:, 1:])
+        self._con_tarifa_acumuladas = np.zeros((len(ids_tipo), dias + 1), dtype=np.int64)
+        np.cumsum(~np.isnan(tarifas), axis=1, out=self._con_tarifa_acumuladas[:, 1:])
+
+    @classmethod
+    def cargar(cls, db: Session, inicio: date = None, dias: int = DIAS_CALENDARIO):
+        """Lee el menor precio a la venta de cada tipo y las tarifas de [inicio, inicio + dias)."""
+        inicio = inicio or date.today()
+        if dias <= 0:
+            raise ValueError("El calendario debe cubrir al menos un día")
+        minimos = dict(db.execute(
+            select(Habitacion.id_tipo, func.min(Habitacion.precio))
+            .where(Habitacion.disponible.is_(True))
+            .group_by(Habitacion.id_tipo)
+        ).all())
+        filas = db.execute(
+            select(Tarifa_Diaria.id_tipo, Tarifa_Diaria.fecha, Tarifa_Diaria.precio).where(
+                Tarifa_Diaria.fecha >= inicio, Tarifa_Diaria.fecha < inicio + timedelta(days=dias)
+            )
+        ).all()
+        ids_tipo = sorted(set(minimos) | {f.id_tipo for f in filas}, key=str)
+        fila_tipo = {id_tipo: i for i, id_tipo in enumerate(ids_tipo)}
+        tarifas = np.full((len(ids_tipo), dias), np.nan)
+        if filas:
+            tarifas[
+                np.array([fila_tipo[f.id_tipo] for f in filas], dtype=np.int64),
+                dias_desde([f.fecha for f in filas], inicio),
+            ] = [f.precio for f in filas]
+        precios_base = np.array([minimos.get(id_tipo, np.nan) for id_tipo in ids_tipo], dtype=float)
+        return cls(inicio, dias, ids_tipo, tarifas, precios_base)
+
+    def cotizar(self, ids_tipo, fechas_entrada, noches, precios_base=None) -> np.ndarray:
+        """
+        Total de cada estancia (ids_tipo[i], fechas_entrada[i], noches[i]).
+        `noches` y `precios_base` pueden ser un valor para todas o uno por estancia.
+        """
+        filas = np.array([self._fila_tipo.get(id_tipo, -1) for id_tipo in ids_tipo], dtype=np.int64)
+        if (filas < 0).any():
+            raise ValueError("Tipo de habitación sin precio en el calendario")
+        entradas = dias_desde(fechas_entrada, self.inicio)
+        noches = np.broadcast_to(np.asarray(noches, dtype=np.int64), entradas.shape)
+        salidas = entradas + noches
+        if (noches <= 0).any():
+            raise ValueError("El número de noches debe ser mayor a cero")
+        if len(entradas) and (entradas.min() < 0 or salidas.max() > self.dias):
+            raise ValueError(
+                f"Las estancias deben estar entre {self.inicio} y {self.inicio + timedelta(days=self.dias)}"
+            )
+        base = self.precios_base[filas] if precios_base is None else np.asarray(precios_base, dtype=float)
+        tarifas = self._tarifas_acumuladas[filas, salidas] - self._tarifas_acumuladas[filas, entradas]
+        con_tarifa = self._con_tarifa_acumuladas[filas, salidas] - self._con_tarifa_acumuladas[filas, entradas]
+        return tarifas + base * (noches - con_tarifa)
+
+    def cotizar_estancias(self, estancias: list, noches: int) -> list:
+        """
+        Cotiza el resultado de MatrizDisponibilidad.buscar_estancias en una llamada.
+
+        Returns:
+            Lista de (fecha_entrada, id_tipo, habitaciones_libres, total_desde).
+        """
+        if not estancias:
+            return []
+        fechas, tipos, libres = zip(*estancias)
+        totales = self.cotizar(tipos, fechas, noches)
+        return [(f, t, l, float(total)) for f, t, l, total in zip(fechas, tipos, libres, totales)]
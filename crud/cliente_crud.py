@@ -1,6 +1,9 @@
+from sqlalchemy import select
 from sqlalchemy.orm import Session
 from sqlalchemy.dialects.postgresql import UUID
 from entities.cliente import Cliente
+from crud.paginacion import paginar
+from crud.unidad_trabajo import confirmar, lote
 
 class ClienteCRUD:
     """
@@ -10,22 +13,25 @@ class ClienteCRUD:
     Cada cliente debe estar asociado a un usuario existente.
 
     Funciones principales:
-        - crear_cliente(db: Session, cliente: Cliente) -> Cliente
+        - lote() -> ContextManager  (unidad de trabajo con un único commit)
+        - crear_cliente(db: Session, cliente: Cliente, refrescar: bool = False) -> Cliente
         - obtener_cliente(db: Session, id_cliente: UUID) -> Cliente
-        - obtener_clientes(db: Session, skip: int = 0, limit: int = 100) -> List[Cliente]
+        - obtener_clientes(db: Session, despues_de: UUID = None, limite: int = 100) -> List[Cliente]
         - eliminar_cliente(db: Session, id_cliente: UUID) -> bool
     """
     def __init__(self, db):
         self.db = db
-        
+
+    def lote(self):
+        return lote(self.db)
+
     @staticmethod
-    def crear_cliente(db: Session, cliente: Cliente):
+    def crear_cliente(db: Session, cliente: Cliente, refrescar: bool = False):
         if not cliente.id_cliente:
             raise ValueError("El cliente debe estar asociado a un usuario")
         
         db.add(cliente)
-        db.commit()
-        db.refresh(cliente)
+        confirmar(db, cliente, refrescar=refrescar)
         return cliente
 
     @staticmethod
@@ -36,8 +42,8 @@ class ClienteCRUD:
         return cliente
 
     @staticmethod
-    def obtener_clientes(db: Session, skip: int = 0, limit: int = 100):
-        return db.query(Cliente).offset(skip).limit(limit).all()
+    def obtener_clientes(db: Session, despues_de: UUID = None, limite: int = 100):
+        return paginar(db, select(Cliente), Cliente.id_cliente, despues_de, limite)
 
     @staticmethod
     def eliminar_cliente(db: Session, id_cliente: UUID) -> bool:
@@ -45,5 +51,5 @@ class ClienteCRUD:
         if not cliente:
             raise ValueError("Cliente no encontrado")
         db.delete(cliente)
-        db.commit()
+        confirmar(db)
         return True
@@ -0,0 +1,149 @@
+from datetime import date
+from sqlalchemy import and_, exists, func, literal_column, select
+from sqlalchemy.orm import Session
+from sqlalchemy.dialects.postgresql import UUID
+from entities.habitacion import Habitacion
+from entities.ocupacion_diaria import Ocupacion_Diaria
+from entities.reserva import Reserva
+
+ESTADO_RESERVA_ACTIVA = "Activa"
+ESTADO_RESERVA_FINALIZADA = "Finalizada"
+ESTADO_RESERVA_CANCELADA = "Cancelada"
+# Estados que cuentan como habitación vendida en los resúmenes de ocupación
+ESTADOS_RESERVA_VENDIDA = (ESTADO_RESERVA_ACTIVA, ESTADO_RESERVA_FINALIZADA)
+
+
+def periodo_reserva():
+    """
+    Expresión `daterange(fecha_entrada, fecha_salida, '[)')` de una reserva.
+
+    Debe coincidir exactamente con la expresión de la restricción de exclusión
+    GiST creada en la migración, para que PostgreSQL pueda usar ese índice.
+    """
+    return func.daterange(Reserva.fecha_entrada, Reserva.fecha_salida, literal_column("'[)'"))
+
+
+def condicion_solapamiento(db: Session, fecha_entrada: date, fecha_salida: date):
+    """
+    Condición SQL que es verdadera cuando una reserva se cruza con el rango
+    [fecha_entrada, fecha_salida). En PostgreSQL usa el operador `&&` sobre
+    daterange (indexado); en otros motores usa la comparación equivalente.
+    """
+    if db.get_bind().dialect.name == "postgresql":
+        rango = func.daterange(fecha_entrada, fecha_salida, literal_column("'[)'"))
+        return periodo_reserva().op("&&")(rango)
+    return and_(Reserva.fecha_entrada < fecha_salida, Reserva.fecha_salida > fecha_entrada)
+
+
+def condicion_habitacion_libre(db: Session, fecha_entrada: date, fecha_salida: date):
+    """
+    Condición SQL que es verdadera cuando la habitación no tiene reservas
+    activas que se crucen con el rango solicitado.
+    """
+    return ~exists().where(
+        Reserva.id_habitacion == Habitacion.id_habitacion,
+        Reserva.estado_reserva == ESTADO_RESERVA_ACTIVA,
+        condicion_solapamiento(db, fecha_entrada, fecha_salida),
+    )
+
+
+def habitaciones_por_tipo():
+    """Subconsulta (id_tipo, habitaciones) con las habitaciones habilitadas para la venta."""
+    return (
+        select(Habitacion.id_tipo, func.count().label("habitaciones"))
+        .where(Habitacion.disponible.is_(True))
+        .group_by(Habitacion.id_tipo)
+        .subquery("habitaciones")
+    )
+
+
+def sentencia_disponibles_por_tipo(fecha_entrada: date, fecha_salida: date):
+    """
+    Por tipo: habitaciones a la venta menos el máximo de habitaciones vendidas en
+    una noche de [fecha_entrada, fecha_salida), según los contadores de ocupacion_diaria.
+    """
+    vendidas = (
+        select(Ocupacion_Diaria.id_tipo, func.max(Ocupacion_Diaria.habitaciones_vendidas).label("vendidas"))
+        .where(Ocupacion_Diaria.fecha >= fecha_entrada, Ocupacion_Diaria.fecha < fecha_salida)
+        .group_by(Ocupacion_Diaria.id_tipo)
+        .subquery("vendidas")
+    )
+    habitaciones = habitaciones_por_tipo()
+    return (
+        select(habitaciones.c.id_tipo, habitaciones.c.habitaciones - func.coalesce(vendidas.c.vendidas, 0))
+        .outerjoin(vendidas, vendidas.c.id_tipo == habitaciones.c.id_tipo)
+    )
+
+
+class DisponibilidadCRUD:
+    """
+    Módulo de consulta de disponibilidad de habitaciones por rango de fechas.
+
+    Una habitación está disponible para [fecha_entrada, fecha_salida) cuando está
+    habilitada para la venta (`disponible=True`) y no tiene reservas activas que
+    se crucen con ese rango. Así una reserva para el mes próximo no bloquea la
+    habitación para hoy.
+
+    Funciones principales:
+        - obtener_habitaciones_disponibles(db: Session, id_tipo: UUID, fecha_entrada: date, fecha_salida: date, limite: int = None) -> List[Habitacion]
+        - habitacion_disponible(db: Session, id_habitacion: UUID, fecha_entrada: date, fecha_salida: date) -> bool
+        - contar_disponibles_por_tipo(db: Session, fecha_entrada: date, fecha_salida: date) -> Dict[UUID, int]
+
+    Notas:
+        - En PostgreSQL la búsqueda usa la restricción de exclusión GiST sobre
+          (id_habitacion, daterange(fecha_entrada, fecha_salida)) de la migración
+          `c1a2f3e4d5b6`, que además impide reservas activas solapadas.
+        - contar_disponibles_por_tipo no revisa habitación por habitación: lee los
+          contadores por día y tipo de ocupacion_diaria, que ReservaCRUD mantiene en la
+          misma transacción que cada reserva, y las habitaciones a la venta de cada tipo,
+          que reflejan al momento altas, bajas y cambios de tipo. Es una aproximación
+          para mostrar, no para decidir: cuenta de más si las noches libres están
+          repartidas entre habitaciones distintas, y de menos si hay habitaciones
+          retiradas de la venta con reservas; además no ve el resumen vacío (antes de
+          reconstruirlo) ni las cargas masivas. La disponibilidad real la deciden
+          obtener_habitaciones_disponibles y ReservaCRUD.asignar_habitacion.
+    """
+    def __init__(self, db):
+        self.db = db
+
+    @staticmethod
+    def _validar_rango(fecha_entrada: date, fecha_salida: date):
+        if fecha_entrada >= fecha_salida:
+            raise ValueError("La fecha de entrada debe ser anterior a la fecha de salida")
+
+    @staticmethod
+    def obtener_habitaciones_disponibles(db: Session, id_tipo: UUID, fecha_entrada: date, fecha_salida: date, limite: int = None):
+        DisponibilidadCRUD._validar_rango(fecha_entrada, fecha_salida)
+        consulta = (
+            select(Habitacion)
+            .where(
+                Habitacion.id_tipo == id_tipo,
+                Habitacion.disponible.is_(True),
+                condicion_habitacion_libre(db, fecha_entrada, fecha_salida),
+            )
+            .order_by(Habitacion.numero)
+        )
+        if limite is not None:
+            consulta = consulta.limit(limite)
+        return db.execute(consulta).scalars().all()
+
+    @staticmethod
+    def habitacion_disponible(db: Session, id_habitacion: UUID, fecha_entrada: date, fecha_salida: date) -> bool:
+        DisponibilidadCRUD._validar_rango(fecha_entrada, fecha_salida)
+        consulta = select(Habitacion.id_habitacion).where(
+            Habitacion.id_habitacion == id_habitacion,
+            Habitacion.disponible.is_(True),
+            condicion_habitacion_libre(db, fecha_entrada, fecha_salida),
+        )
+        return db.execute(consulta).first() is not None
+
+    @staticmethod
+    def contar_disponibles_por_tipo(db: Session, fecha_entrada: date, fecha_salida: date) -> dict:
+        """
+        Habitaciones que se pueden vender de cada tipo en [fecha_entrada, fecha_salida),
+        con una sola consulta. Los tipos sin habitaciones a la venta no aparecen.
+        """
+        DisponibilidadCRUD._validar_rango(fecha_entrada, fecha_salida)
+        filas = db.execute(sentencia_disponibles_por_tipo(fecha_entrada, fecha_salida))
+        # Las reservas de habitaciones retiradas de la venta pueden dejar el resultado bajo cero
+        return {id_tipo: max(disponibles, 0) for id_tipo, disponibles in filas}
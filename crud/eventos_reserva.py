@@ -0,0 +1,65 @@
+"""
+Cambios de ocupación de habitaciones para las estructuras en memoria que
+siguen las reservas (p. ej. MatrizDisponibilidad).
+
+Las escrituras de ReservaCRUD registran en la sesión qué noches de qué
+habitación ocupan o liberan. Los cambios se entregan a los oyentes solo
+después del commit, en el hilo que lo hace, y se descartan si la transacción
+se deshace: un oyente nunca ve una reserva que no llegó a guardarse.
+Sin oyentes suscritos registrar no hace nada.
+"""
+
+import threading
+from dataclasses import dataclass
+from datetime import date
+from uuid import UUID
+
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+
+_CLAVE_CAMBIOS = "cambios_ocupacion"
+_lock = threading.Lock()
+_oyentes = []
+
+
+@dataclass(frozen=True)
+class CambioOcupacion:
+    """La habitación pasa a estar ocupada (signo=1) o libre (signo=-1) en [fecha_entrada, fecha_salida)."""
+    id_habitacion: UUID
+    fecha_entrada: date
+    fecha_salida: date
+    signo: int
+
+
+def suscribir(oyente) -> None:
+    """Registra `oyente(cambios: list)`, que recibe los cambios de cada commit."""
+    with _lock:
+        _oyentes.append(oyente)
+
+
+def cancelar_suscripcion(oyente) -> None:
+    with _lock:
+        if oyente in _oyentes:
+            _oyentes.remove(oyente)
+
+
+def registrar_cambio(db: Session, id_habitacion: UUID, fecha_entrada: date, fecha_salida: date, signo: int) -> None:
+    if not _oyentes or id_habitacion is None:
+        return
+    db.info.setdefault(_CLAVE_CAMBIOS, []).append(CambioOcupacion(id_habitacion, fecha_entrada, fecha_salida, signo))
+
+
+@event.listens_for(Session, "after_commit")
+def _entregar(db: Session) -> None:
+    cambios = db.info.pop(_CLAVE_CAMBIOS, None)
+    if not cambios:
+        return
+    with _lock:
+        oyentes = list(_oyentes)
+    for oyente in oyentes:
+        oyente(cambios)
+
+
+@event.listens_for(Session, "after_rollback")
+def _descartar(db: Session) -> None:
+    db.info.pop(_CLAVE_CAMBIOS, None)
@@ -1,7 +1,17 @@
+from sqlalchemy import select
 from sqlalchemy.orm import Session
 from sqlalchemy.dialects.postgresql import UUID
 from entities.habitacion import Habitacion
 from datetime import date
+from crud.paginacion import TAMANO_LOTE_STREAMING, iterar, paginar
+from crud.actualizacion import actualizar_por_id, valores_actualizables
+from crud.insercion import insertar_si_no_existe
+from crud.masivo import duplicados, filas_de, insertar_filas, valores_existentes
+from crud.ocupacion_crud import OcupacionCRUD
+from crud.unidad_trabajo import confirmar, lote
+
+# Clave estable para la paginación por clave (keyset)
+CLAVE_HABITACION = Habitacion.numero
 
 class HabitacionCRUD:
     """
@@ -9,29 +19,57 @@ class HabitacionCRUD:
 
     Define las operaciones relacionadas con la gestión de habitaciones en el hotel.
     Incluye validaciones de número único y precio positivo.
+    Los listados se paginan por número de habitación: `despues_de` es el número
+    de la última habitación de la página anterior.
 
     Funciones principales:
+        - lote() -> ContextManager  (unidad de trabajo con un único commit)
         - crear_habitacion(db: Session, habitacion: Habitacion) -> Habitacion
+        - bulk_crear_habitaciones(db: Session, habitaciones: List[Habitacion]) -> int
         - obtener_habitacion(db: Session, id_habitacion: UUID) -> Habitacion
-        - obtener_habitaciones(db: Session) -> List[Habitacion]
+        - obtener_habitaciones(db: Session, despues_de: int = None, limite: int = None) -> List[Habitacion]
+        - iterar_habitaciones(db: Session, tamano_lote: int = 1000) -> Iterator[Habitacion]
         - actualizar_habitacion(db: Session, id_habitacion: UUID, **kwargs) -> Habitacion
         - eliminar_habitacion(db: Session, id_habitacion: UUID) -> bool
+
+    Notas:
+        - Cambiar el tipo de una habitación pasa el aporte de sus reservas en
+          ocupacion_diaria al tipo nuevo en la misma transacción.
     """
     def __init__(self, db):
         self.db = db
+
+    def lote(self):
+        return lote(self.db)
+
     @staticmethod
     def crear_habitacion(db: Session, habitacion: Habitacion):
         if habitacion.precio <= 0:
             raise ValueError("El precio debe ser mayor a 0")
-        
-        existente = db.query(Habitacion).filter(Habitacion.numero == habitacion.numero).first()
-        if existente:
+
+        creada = insertar_si_no_existe(db, habitacion, Habitacion.numero)
+        if not creada:
             raise ValueError("El número de habitación ya está en uso")
+        confirmar(db)
+        return creada
 
-        db.add(habitacion)
-        db.commit()
-        db.refresh(habitacion)
-        return habitacion
+    @staticmethod
+    def bulk_crear_habitaciones(db: Session, habitaciones):
+        """
+        Crea muchas habitaciones con una sola consulta de unicidad y una inserción
+        por lotes (COPY en PostgreSQL para lotes muy grandes). Valida el lote
+        completo antes de insertar: si una habitación no es válida no se inserta ninguna.
+        """
+        if any(h.precio is None or h.precio <= 0 for h in habitaciones):
+            raise ValueError("El precio debe ser mayor a 0")
+        numeros = [h.numero for h in habitaciones]
+        repetidos = duplicados(numeros) | valores_existentes(db, Habitacion.numero, numeros)
+        if repetidos:
+            raise ValueError(f"Los números de habitación ya están en uso: {sorted(repetidos)[:10]}")
+
+        insertadas = insertar_filas(db, Habitacion, filas_de(Habitacion, habitaciones))
+        confirmar(db)
+        return insertadas
 
     @staticmethod
     def obtener_habitacion(db: Session, id_habitacion: UUID):
@@ -41,21 +79,33 @@ class HabitacionCRUD:
         return habitacion
 
     @staticmethod
-    def obtener_habitaciones(db: Session):
-        return db.query(Habitacion).all()
+    def obtener_habitaciones(db: Session, despues_de: int = None, limite: int = None):
+        return paginar(db, select(Habitacion), CLAVE_HABITACION, despues_de, limite)
+
+    @staticmethod
+    def iterar_habitaciones(db: Session, tamano_lote: int = TAMANO_LOTE_STREAMING):
+        return iterar(db, select(Habitacion), CLAVE_HABITACION, tamano_lote)
 
     @staticmethod
     def actualizar_habitacion(db: Session, id_habitacion: UUID, **kwargs):
-        habitacion = db.query(Habitacion).filter(Habitacion.id_habitacion == id_habitacion).first()
+        valores = valores_actualizables(Habitacion, kwargs)
+        if not valores:
+            return HabitacionCRUD.obtener_habitacion(db, id_habitacion)
+        if "precio" in valores and valores["precio"] <= 0:
+            raise ValueError("El precio debe ser mayor a 0")
+
+        tipo_anterior = None
+        if "id_tipo" in valores:
+            tipo_anterior = db.scalar(
+                select(Habitacion.id_tipo).where(Habitacion.id_habitacion == id_habitacion).with_for_update()
+            )
+        habitacion = actualizar_por_id(db, Habitacion, Habitacion.id_habitacion, id_habitacion, valores)
         if not habitacion:
             raise ValueError("Habitación no encontrada")
-
-        for key, value in kwargs.items():
-            if hasattr(habitacion, key):
-                setattr(habitacion, key, value)
-
-        db.commit()
-        db.refresh(habitacion)
+        if tipo_anterior is not None:
+            # Las reservas ya sumadas al resumen de ocupación pasan al tipo nuevo
+            OcupacionCRUD.mover_habitacion(db, id_habitacion, tipo_anterior, habitacion.id_tipo)
+        confirmar(db)
         return habitacion
 
     @staticmethod
@@ -64,5 +114,5 @@ class HabitacionCRUD:
         if not habitacion:
             raise ValueError("Habitación no encontrada")
         db.delete(habitacion)
-        db.commit()
+        confirmar(db)
         return True
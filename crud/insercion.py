@@ -0,0 +1,32 @@
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.orm import Session
+
+from crud.masivo import filas_de
+
+# INSERT con soporte de ON CONFLICT según el motor
+INSERT_POR_DIALECTO = {"postgresql": postgresql.insert, "sqlite": sqlite.insert}
+
+
+def sentencia_insertar_si_no_existe(db: Session, objeto, columna_unica):
+    """
+    `INSERT ... ON CONFLICT (columna_unica) DO NOTHING RETURNING *` para un objeto
+    de una entidad. Al ejecutarla devuelve la entidad insertada (con los valores por
+    defecto del servidor), o nada si ya existía una fila con el mismo valor único:
+    la comprobación y la inserción son una sola sentencia atómica.
+    """
+    modelo = type(objeto)
+    insertar = INSERT_POR_DIALECTO[db.get_bind().dialect.name]
+    return (
+        insertar(modelo)
+        .values(**filas_de(modelo, [objeto])[0])
+        .on_conflict_do_nothing(index_elements=[columna_unica])
+        .returning(modelo)
+    )
+
+
+def insertar_si_no_existe(db: Session, objeto, columna_unica):
+    """
+    Inserta `objeto` y devuelve la entidad guardada, o None si el valor de
+    `columna_unica` ya estaba en uso. No hace commit.
+    """
+    return db.execute(sentencia_insertar_si_no_existe(db, objeto, columna_unica)).scalars().first()
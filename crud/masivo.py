@@ -0,0 +1,97 @@
+import io
+
+from sqlalchemy import insert, select
+from sqlalchemy.orm import Session
+
+# Tamaño de cada executemany; SQLAlchemy los agrupa en INSERT ... VALUES de varias filas
+TAMANO_LOTE_INSERCION = 5_000
+# A partir de este número de filas se usa COPY en PostgreSQL
+UMBRAL_COPY = 20_000
+
+
+def filas_de(modelo, objetos: list) -> list:
+    """
+    Convierte objetos de la entidad en diccionarios listos para insertar, aplicando
+    los valores por defecto de Python (ids UUID, banderas). Los ids generados se
+    asignan también a los objetos para que el llamador pueda usarlos.
+
+    Las columnas con default del servidor (p. ej. fecha_creacion) se omiten si
+    ningún objeto las trae, para que las complete la base de datos.
+    """
+    columnas = []
+    for columna in modelo.__table__.columns:
+        if columna.server_default is not None and all(getattr(o, columna.key) is None for o in objetos):
+            continue
+        columnas.append(columna)
+
+    filas = []
+    for objeto in objetos:
+        fila = {}
+        for columna in columnas:
+            valor = getattr(objeto, columna.key)
+            if valor is None and columna.default is not None:
+                valor = columna.default.arg(None) if columna.default.is_callable else columna.default.arg
+                setattr(objeto, columna.key, valor)
+            fila[columna.key] = valor
+        filas.append(fila)
+    return filas
+
+
+def valores_existentes(db: Session, columna, valores) -> set:
+    """
+    Devuelve cuáles de `valores` ya existen en `columna`, con una sola consulta IN.
+    """
+    if not valores:
+        return set()
+    return set(db.execute(select(columna).where(columna.in_(set(valores)))).scalars())
+
+
+def duplicados(valores) -> set:
+    vistos, repetidos = set(), set()
+    for valor in valores:
+        if valor in vistos:
+            repetidos.add(valor)
+        vistos.add(valor)
+    return repetidos
+
+
+def _campo_csv(valor) -> str:
+    """
+    Campo CSV para COPY: None va vacío y sin comillas, que COPY lee como NULL; el
+    resto va entre comillas, así una cadena vacía se guarda como '' y no como NULL.
+    """
+    if valor is None:
+        return ""
+    return '"' + str(valor).replace('"', '""') + '"'
+
+
+def _copiar(db: Session, tabla, filas: list) -> None:
+    columnas = list(filas[0])
+    buffer = io.StringIO()
+    for fila in filas:
+        buffer.write(",".join(_campo_csv(fila[c]) for c in columnas))
+        buffer.write("\n")
+    buffer.seek(0)
+    conexion = db.connection().connection.driver_connection
+    with conexion.cursor() as cursor:
+        cursor.copy_expert(
+            f"COPY {tabla.name} ({', '.join(columnas)}) FROM STDIN WITH (FORMAT csv)",
+            buffer,
+        )
+
+
+def insertar_filas(db: Session, modelo, filas: list) -> int:
+    """
+    Inserta `filas` en la tabla del modelo dentro de la transacción actual.
+
+    Usa COPY en PostgreSQL (psycopg2) a partir de UMBRAL_COPY filas y, en otro
+    caso, executemany por lotes de TAMANO_LOTE_INSERCION. No hace commit.
+    """
+    if not filas:
+        return 0
+    if len(filas) >= UMBRAL_COPY and db.get_bind().dialect.driver == "psycopg2":
+        _copiar(db, modelo.__table__, filas)
+    else:
+        for i in range(0, len(filas), TAMANO_LOTE_INSERCION):
+            db.execute(insert(modelo), filas[i:i + TAMANO_LOTE_INSERCION])
+    return len(filas)
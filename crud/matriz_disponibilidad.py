@@ -0,0 +1,220 @@
+import threading
+from datetime import date, timedelta
+
+import numpy as np
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+from sqlalchemy.dialects.postgresql import UUID
+from entities.habitacion import Habitacion
+from entities.reserva import Reserva
+from crud.disponibilidad_crud import ESTADO_RESERVA_ACTIVA, condicion_solapamiento
+from crud.eventos_reserva import cancelar_suscripcion, suscribir
+
+# Días que cubre la matriz a partir de su fecha inicial
+DIAS_MATRIZ = 365
+# Reservas leídas por lote al cargar
+TAMANO_LOTE_CARGA = 50_000
+
+
+def dias_desde(fechas, inicio: date) -> np.ndarray:
+    return (np.array(fechas, dtype="datetime64[D]") - np.datetime64(inicio, "D")).astype(np.int64)
+
+
+class MatrizDisponibilidad:
+    """
+    Ocupación en memoria de habitaciones x días, con NumPy, para búsquedas de
+    calendario ("cualquier tipo libre 3 noches en los próximos 60 días") sin una
+    consulta de solapamiento por fecha candidata.
+
+    `ocupacion[h, d]` cuenta las reservas activas de la habitación h en la noche
+    inicio + d. Se carga una vez desde reserva/habitacion y, mientras está
+    conectada, se corrige tras cada commit con los cambios que registra
+    ReservaCRUD (ver crud/eventos_reserva.py). Todas las búsquedas son
+    operaciones vectorizadas sobre la matriz.
+
+    Funciones principales:
+        - cargar(db: Session, inicio: date = None, dias: int = 365, conectar: bool = True) -> MatrizDisponibilidad
+        - aplicar_cambios(cambios: List[CambioOcupacion]) -> None
+        - habitaciones_libres(id_tipo: UUID, fecha_entrada: date, fecha_salida: date) -> List[UUID]
+        - libres_por_tipo(fecha_entrada: date, fecha_salida: date) -> Dict[UUID, int]
+        - buscar_estancias(noches: int, desde: date = None, hasta: date = None, id_tipo: UUID = None) -> List[tuple]
+        - calendario(desde: date = None, hasta: date = None) -> Dict[UUID, np.ndarray]
+        - desconectar() -> None
+
+    Notas:
+        - Igual que DisponibilidadCRUD, una habitación está libre si está a la venta y
+          no tiene reservas activas esa noche.
+        - Los cambios de reservas hechos fuera de ReservaCRUD (ReservaCRUDAsync,
+          cargas masivas, otros procesos) y las altas, bajas o cambios de tipo de
+          habitaciones no se ven hasta volver a cargarla. El resultado orienta la
+          búsqueda; la reserva se asigna con asignar_habitacion, que decide en la base de datos.
+        - Las noches fuera de [inicio, inicio + dias) no se guardan: las búsquedas se
+          recortan a esa ventana.
+        - Es segura entre hilos: los cambios y las búsquedas se serializan con un lock.
+    """
+    def __init__(self, inicio: date, dias: int, ids_habitacion, ids_tipo, tipo_por_habitacion,
+                 a_la_venta, ocupacion):
+        self.inicio = inicio
+        self.dias = dias
+        self.ids_habitacion = ids_habitacion
+        self.ids_tipo = ids_tipo
+        self.tipo_por_habitacion = tipo_por_habitacion
+        self.a_la_venta = a_la_venta
+        self.ocupacion = ocupacion
+        self._fila = {id_habitacion: i for i, id_habitacion in enumerate(ids_habitacion)}
+        self._columna_tipo = {id_tipo: i for i, id_tipo in enumerate(ids_tipo)}
+        # tipos x habitaciones: 1 donde la habitación es del tipo; sumar por tipo es un producto de matrices
+        self._habitaciones_por_tipo = (
+            tipo_por_habitacion[None, :] == np.arange(len(ids_tipo))[:, None]
+        ).astype(np.float32)
+        self._lock = threading.Lock()
+        self._conectada = False
+
+    @classmethod
+    def cargar(cls, db: Session, inicio: date = None, dias: int = DIAS_MATRIZ, conectar: bool = True):
+        """
+        Lee las habitaciones (ordenadas por número) y las reservas activas que se
+        cruzan con [inicio, inicio + dias), en lotes, y construye la matriz.
+        Con `conectar=True` queda suscrita a los cambios de ReservaCRUD.
+        """
+        inicio = inicio or date.today()
+        if dias <= 0:
+            raise ValueError("La matriz debe cubrir al menos un día")
+        habitaciones = db.execute(
+            select(Habitacion.id_habitacion, Habitacion.id_tipo, Habitacion.disponible).order_by(Habitacion.numero)
+        ).all()
+        ids_habitacion = [h.id_habitacion for h in habitaciones]
+        ids_tipo = sorted({h.id_tipo for h in habitaciones}, key=str)
+        columna_tipo = {id_tipo: i for i, id_tipo in enumerate(ids_tipo)}
+        tipo_por_habitacion = np.array([columna_tipo[h.id_tipo] for h in habitaciones], dtype=np.int64)
+        a_la_venta = np.array([bool(h.disponible) for h in habitaciones], dtype=bool)
+        fila = {id_habitacion: i for i, id_habitacion in enumerate(ids_habitacion)}
+
+        # Diferencias por fila: +1 el día de entrada y -1 el de salida; la suma
+        # acumulada por días da las reservas activas de cada noche.
+        diferencias = np.zeros((len(ids_habitacion), dias + 1), dtype=np.int32)
+        consulta = (
+            select(Reserva.id_habitacion, Reserva.fecha_entrada, Reserva.fecha_salida)
+            .where(
+                Reserva.estado_reserva == ESTADO_RESERVA_ACTIVA,
+                Reserva.id_habitacion.is_not(None),
+                condicion_solapamiento(db, inicio, inicio + timedelta(days=dias)),
+            )
+            .execution_options(yield_per=TAMANO_LOTE_CARGA)
+        )
+        for lote in db.execute(consulta).partitions():
+            filas = np.array([fila.get(r.id_habitacion, -1) for r in lote], dtype=np.int64)
+            entradas = np.clip(dias_desde([r.fecha_entrada for r in lote], inicio), 0, dias)
+            salidas = np.clip(dias_desde([r.fecha_salida for r in lote], inicio), 0, dias)
+            conocidas = filas >= 0
+            np.add.at(diferencias, (filas[conocidas], entradas[conocidas]), 1)
+            np.add.at(diferencias, (filas[conocidas], salidas[conocidas]), -1)
+        ocupacion = np.cumsum(diferencias[:, :dias], axis=1).astype(np.int16)
+
+        matriz = cls(inicio, dias, ids_habitacion, ids_tipo, tipo_por_habitacion, a_la_venta, ocupacion)
+        if conectar:
+            matriz.conectar()
+        return matriz
+
+    def conectar(self) -> None:
+        if not self._conectada:
+            suscribir(self.aplicar_cambios)
+            self._conectada = True
+
+    def desconectar(self) -> None:
+        cancelar_suscripcion(self.aplicar_cambios)
+        self._conectada = False
+
+    def _columnas(self, fecha_entrada: date, fecha_salida: date) -> tuple:
+        return (
+            min(max((fecha_entrada - self.inicio).days, 0), self.dias),
+            min(max((fecha_salida - self.inicio).days, 0), self.dias),
+        )
+
+    def aplicar_cambios(self, cambios) -> None:
+        """Suma o resta cada CambioOcupacion en las noches de su habitación."""
+        with self._lock:
+            for cambio in cambios:
+                fila = self._fila.get(cambio.id_habitacion)
+                if fila is None:
+                    continue
+                desde, hasta = self._columnas(cambio.fecha_entrada, cambio.fecha_salida)
+                self.ocupacion[fila, desde:hasta] += cambio.signo
+
+    def _libres(self, desde: int, hasta: int) -> np.ndarray:
+        """Matriz booleana habitaciones x días de [desde, hasta): libre y a la venta."""
+        return (self.ocupacion[:, desde:hasta] == 0) & self.a_la_venta[:, None]
+
+    def _validar_rango(self, fecha_entrada: date, fecha_salida: date) -> tuple:
+        if fecha_entrada >= fecha_salida:
+            raise ValueError("La fecha de entrada debe ser anterior a la fecha de salida")
+        desde, hasta = self._columnas(fecha_entrada, fecha_salida)
+        if hasta - desde != (fecha_salida - fecha_entrada).days:
+            raise ValueError(
+                f"Las fechas deben estar entre {self.inicio} y {self.inicio + timedelta(days=self.dias)}"
+            )
+        return desde, hasta
+
+    def _sumar_por_tipo(self, por_habitacion: np.ndarray) -> np.ndarray:
+        """Suma las filas (habitaciones) de una matriz booleana por tipo: tipos x columnas."""
+        return (self._habitaciones_por_tipo @ por_habitacion.astype(np.float32)).astype(np.int64)
+
+    def habitaciones_libres(self, id_tipo: UUID, fecha_entrada: date, fecha_salida: date) -> list:
+        """Habitaciones del tipo libres todas las noches de [fecha_entrada, fecha_salida), por número."""
+        desde, hasta = self._validar_rango(fecha_entrada, fecha_salida)
+        columna = self._columna_tipo.get(id_tipo)
+        if columna is None:
+            return []
+        with self._lock:
+            libres = self._libres(desde, hasta).all(axis=1) & (self.tipo_por_habitacion == columna)
+        return [self.ids_habitacion[i] for i in np.flatnonzero(libres)]
+
+    def libres_por_tipo(self, fecha_entrada: date, fecha_salida: date) -> dict:
+        """Habitaciones libres todas las noches de [fecha_entrada, fecha_salida), por tipo."""
+        desde, hasta = self._validar_rango(fecha_entrada, fecha_salida)
+        with self._lock:
+            libres = self._libres(desde, hasta).all(axis=1)
+        cuentas = np.bincount(self.tipo_por_habitacion[libres], minlength=len(self.ids_tipo))
+        return {id_tipo: int(cuenta) for id_tipo, cuenta in zip(self.ids_tipo, cuentas)}
+
+    def buscar_estancias(self, noches: int, desde: date = None, hasta: date = None, id_tipo: UUID = None) -> list:
+        """
+        Todas las estancias de `noches` noches con entrada en [desde, hasta) para las
+        que algún tipo (o `id_tipo`) tiene habitaciones libres todas las noches.
+
+        Returns:
+            Lista de (fecha_entrada, id_tipo, habitaciones_libres), por fecha y tipo.
+        """
+        if noches <= 0:
+            raise ValueError("El número de noches debe ser mayor a cero")
+        desde, hasta = self._columnas(desde or self.inicio, hasta or self.inicio + timedelta(days=self.dias))
+        # La última noche de la última estancia debe caber en la matriz
+        fin = min(hasta + noches - 1, self.dias)
+        if fin - desde < noches:
+            return []
+        with self._lock:
+            libres = self._libres(desde, fin)
+        if id_tipo is not None:
+            if id_tipo not in self._columna_tipo:
+                return []
+            libres = libres & (self.tipo_por_habitacion == self._columna_tipo[id_tipo])[:, None]
+        # Noches libres consecutivas con sumas acumuladas: la ventana [d, d + noches)
+        # está libre si la suma de esas noches es `noches`.
+        acumuladas = np.zeros((libres.shape[0], libres.shape[1] + 1), dtype=np.int32)
+        np.cumsum(libres, axis=1, out=acumuladas[:, 1:])
+        ventanas = (acumuladas[:, noches:] - acumuladas[:, :-noches]) == noches
+        por_tipo = self._sumar_por_tipo(ventanas)
+        tipos, dias = np.nonzero(por_tipo)
+        orden = np.lexsort((tipos, dias))
+        return [
+            (self.inicio + timedelta(days=int(desde + dias[i])), self.ids_tipo[tipos[i]], int(por_tipo[tipos[i], dias[i]]))
+            for i in orden
+        ]
+
+    def calendario(self, desde: date = None, hasta: date = None) -> dict:
+        """Habitaciones libres de cada tipo por noche de [desde, hasta): id_tipo -> array de enteros."""
+        desde, hasta = self._columnas(desde or self.inicio, hasta or self.inicio + timedelta(days=self.dias))
+        with self._lock:
+            libres = self._libres(desde, hasta)
+        por_tipo = self._sumar_por_tipo(libres)
+        return {id_tipo: por_tipo[i] for i, id_tipo in enumerate(self.ids_tipo)}
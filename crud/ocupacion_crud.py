@@ -0,0 +1,350 @@
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from datetime import date, timedelta
+
+from sqlalchemy import Date, Integer, and_, case, cast, delete, func, insert, literal, literal_column, select
+from sqlalchemy.orm import Session
+from sqlalchemy.dialects.postgresql import UUID
+from entities.habitacion import Habitacion
+from entities.ocupacion_diaria import Ocupacion_Diaria
+from entities.reserva import Reserva
+from entities.reserva_servicios import Reserva_Servicios
+from crud.disponibilidad_crud import ESTADO_RESERVA_ACTIVA, ESTADOS_RESERVA_VENDIDA, condicion_solapamiento
+from crud.eventos_reserva import registrar_cambio
+from crud.insercion import INSERT_POR_DIALECTO
+
+# Columnas acumulables del resumen
+METRICAS = ("habitaciones_vendidas", "llegadas", "noches", "ingresos", "ingresos_servicios")
+# Días por bloque al reconstruir (cada bloque es una transacción)
+DIAS_POR_BLOQUE = 31
+
+
+def total_servicios():
+    """
+    Suma de los precios cobrados por los servicios de la reserva (subconsulta
+    correlacionada). Usa el precio guardado al contratarlos, no el del catálogo.
+    """
+    return (
+        select(func.coalesce(func.sum(Reserva_Servicios.precio), 0))
+        .where(Reserva_Servicios.id_reserva == Reserva.id_reserva)
+        .scalar_subquery()
+    )
+
+
+def noches_reserva(db: Session):
+    """Número de noches entre fecha_entrada y fecha_salida, calculado en SQL."""
+    if db.get_bind().dialect.name == "postgresql":
+        return cast(Reserva.fecha_salida - Reserva.fecha_entrada, Integer)
+    return cast(func.julianday(Reserva.fecha_salida) - func.julianday(Reserva.fecha_entrada), Integer)
+
+
+def tabla_dias(db: Session, desde: date, hasta: date):
+    """
+    Tabla `dias(fecha)` con un día por fila en [desde, hasta): generate_series en
+    PostgreSQL y una CTE recursiva en SQLite (usado como sustituto local).
+    """
+    ultimo = hasta - timedelta(days=1)
+    if db.get_bind().dialect.name == "postgresql":
+        serie = func.generate_series(desde, ultimo, literal_column("interval '1 day'"))
+        return select(cast(serie, Date).label("fecha")).subquery("dias")
+    dias = select(literal(desde, Date).label("fecha")).cte("dias", recursive=True, nesting=True)
+    return dias.union_all(select(func.date(dias.c.fecha, "+1 day")).where(dias.c.fecha < literal(ultimo, Date)))
+
+
+def sentencia_contribucion(id_reserva: UUID, estados=ESTADOS_RESERVA_VENDIDA):
+    """
+    Datos de la reserva que determinan su aporte al resumen, si su estado está en
+    `estados` (None para no filtrar por estado).
+    """
+    consulta = (
+        select(
+            Reserva.fecha_entrada,
+            Reserva.fecha_salida,
+            func.coalesce(Reserva.costo_total, 0).label("costo_total"),
+            Habitacion.id_tipo,
+            total_servicios().label("servicios"),
+            Reserva.id_habitacion,
+            Reserva.estado_reserva,
+        )
+        .join(Habitacion, Habitacion.id_habitacion == Reserva.id_habitacion)
+        .where(Reserva.id_reserva == id_reserva)
+    )
+    if estados is not None:
+        consulta = consulta.where(Reserva.estado_reserva.in_(estados))
+    return consulta
+
+
+def sentencia_aportes_habitacion(id_habitacion: UUID):
+    """Datos de las reservas vendidas de la habitación que determinan su aporte al resumen."""
+    return select(
+        Reserva.fecha_entrada,
+        Reserva.fecha_salida,
+        func.coalesce(Reserva.costo_total, 0).label("costo_total"),
+        total_servicios().label("servicios"),
+    ).where(Reserva.id_habitacion == id_habitacion, Reserva.estado_reserva.in_(ESTADOS_RESERVA_VENDIDA))
+
+
+def filas_contribucion(fecha_entrada: date, fecha_salida: date, id_tipo: UUID, costo_total: float,
+                       servicios: float, signo: int) -> list:
+    """
+    Filas del resumen que suma (signo=1) o resta (signo=-1) una reserva: una por
+    noche ocupada, con los ingresos por alojamiento prorrateados; las llegadas,
+    las noches y los servicios van en el día de entrada.
+    """
+    noches = (fecha_salida - fecha_entrada).days
+    por_noche = ((costo_total or 0) - servicios) / noches
+    return [
+        {
+            "fecha": fecha_entrada + timedelta(days=i),
+            "id_tipo": id_tipo,
+            "habitaciones_vendidas": signo,
+            "llegadas": signo if i == 0 else 0,
+            "noches": signo * noches if i == 0 else 0,
+            "ingresos": signo * por_noche,
+            "ingresos_servicios": signo * servicios if i == 0 else 0,
+        }
+        for i in range(noches)
+    ]
+
+
+def sentencia_acumular(db: Session, origen):
+    """
+    `INSERT ... ON CONFLICT (fecha, id_tipo) DO UPDATE SET m = m + excluded.m`:
+    suma las métricas de `origen` (lista de filas o SELECT) a las existentes.
+    """
+    insertar = INSERT_POR_DIALECTO[db.get_bind().dialect.name]
+    if isinstance(origen, list):
+        sentencia = insertar(Ocupacion_Diaria).values(origen)
+    else:
+        sentencia = insertar(Ocupacion_Diaria).from_select(["fecha", "id_tipo", *METRICAS], origen)
+    return sentencia.on_conflict_do_update(
+        index_elements=[Ocupacion_Diaria.fecha, Ocupacion_Diaria.id_tipo],
+        set_={m: getattr(Ocupacion_Diaria, m) + getattr(sentencia.excluded, m) for m in METRICAS},
+    )
+
+
+def sentencia_recalculo(db: Session, desde: date, hasta: date):
+    """SELECT que calcula desde las reservas las filas del resumen para [desde, hasta)."""
+    servicios = total_servicios()
+    reservas = (
+        select(
+            Reserva.fecha_entrada,
+            Reserva.fecha_salida,
+            Habitacion.id_tipo,
+            noches_reserva(db).label("noches"),
+            (func.coalesce(Reserva.costo_total, 0) - servicios).label("alojamiento"),
+            servicios.label("servicios"),
+        )
+        .join(Habitacion, Habitacion.id_habitacion == Reserva.id_habitacion)
+        .where(
+            Reserva.estado_reserva.in_(ESTADOS_RESERVA_VENDIDA),
+            condicion_solapamiento(db, desde, hasta),
+        )
+        .subquery("reservas")
+    )
+    dias = tabla_dias(db, desde, hasta)
+    llegada = reservas.c.fecha_entrada == dias.c.fecha
+    return (
+        select(
+            dias.c.fecha,
+            reservas.c.id_tipo,
+            func.count().label("habitaciones_vendidas"),
+            func.sum(case((llegada, 1), else_=0)).label("llegadas"),
+            func.sum(case((llegada, reservas.c.noches), else_=0)).label("noches"),
+            func.sum(reservas.c.alojamiento / reservas.c.noches).label("ingresos"),
+            func.sum(case((llegada, reservas.c.servicios), else_=0)).label("ingresos_servicios"),
+        )
+        .join_from(dias, reservas, and_(reservas.c.fecha_entrada <= dias.c.fecha, reservas.c.fecha_salida > dias.c.fecha))
+        .group_by(dias.c.fecha, reservas.c.id_tipo)
+    )
+
+
+def bloques(desde: date, hasta: date, dias: int):
+    inicio = desde
+    while inicio < hasta:
+        fin = min(inicio + timedelta(days=dias), hasta)
+        yield inicio, fin
+        inicio = fin
+
+
+class OcupacionCRUD:
+    """
+    Módulo del resumen diario de ocupación e ingresos por tipo de habitación
+    (tabla ocupacion_diaria).
+
+    ReservaCRUD (y ReservaCRUDAsync) lo mantiene al día de forma incremental: al crear, asignar,
+    actualizar, cancelar o eliminar una reserva, y al agregarle servicios, suma o
+    resta su aporte a las filas de sus noches en la misma transacción. Los
+    tableros leen unas pocas filas por día y tipo en lugar de recorrer las reservas.
+
+    Funciones principales:
+        - aplicar_reserva(db: Session, id_reserva: UUID, signo: int, estados=ESTADOS_RESERVA_VENDIDA) -> int
+        - leer_aporte(db: Session, id_reserva: UUID, estados=ESTADOS_RESERVA_VENDIDA) -> Row
+        - aplicar_aporte(db: Session, aporte: Row, signo: int) -> int
+        - mover_habitacion(db: Session, id_habitacion: UUID, tipo_anterior: UUID, tipo_nuevo: UUID) -> int
+        - sumar_reserva_nueva(db: Session, reserva: Reserva, id_tipo: UUID) -> int
+        - sumar_servicios(db: Session, id_reserva: UUID, monto) -> None
+        - obtener_resumen(db: Session, desde: date, hasta: date, id_tipo: UUID = None) -> List[Ocupacion_Diaria]
+        - recalcular_periodo(db: Session, desde: date, hasta: date) -> int
+        - reconstruir(fabrica_sesiones, desde: date, hasta: date, dias_por_bloque: int = 31, hilos: int = 4) -> Iterator[tuple]
+
+    Notas:
+        - Cuentan como vendidas las reservas activas y finalizadas; las canceladas no.
+        - Los servicios se valoran con el precio guardado en reserva_servicios al
+          contratarlos: restar una reserva quita exactamente lo que se sumó aunque
+          después cambie el precio del catálogo.
+        - El tipo de una reserva es el de su habitación. HabitacionCRUD llama a
+          mover_habitacion cuando cambia el tipo de una habitación, para que las
+          reservas ya sumadas se resten después de las filas del tipo correcto.
+        - Las filas se acumulan con `INSERT ... ON CONFLICT DO UPDATE SET m = m + excluded.m`,
+          en orden de fecha, así que dos reservas simultáneas no se pisan ni se bloquean en ciclo.
+        - ReservaCRUDAsync lo mantiene igual, con `AsyncSession.run_sync`. Las cargas
+          masivas (benchmarks, generador de datos) no lo actualizan: después hay que
+          reconstruir el periodo afectado.
+        - Al leer el aporte de una reserva activa también registra el cambio de
+          ocupación de su habitación en crud/eventos_reserva.py, que lo entrega a las
+          estructuras en memoria (MatrizDisponibilidad) tras el commit.
+        - reconstruir reemplaza cada bloque en su propia transacción y en paralelo;
+          conviene ejecutarlo con poca actividad de reservas.
+    """
+    def __init__(self, db):
+        self.db = db
+
+    @staticmethod
+    def aplicar_reserva(db: Session, id_reserva: UUID, signo: int, estados=ESTADOS_RESERVA_VENDIDA) -> int:
+        """
+        Suma (signo=1) o resta (signo=-1) al resumen el aporte actual de la reserva,
+        leído de la base de datos. No hace nada si la reserva no está en `estados`
+        o no tiene habitación. No hace commit. Devuelve las filas afectadas.
+        """
+        return OcupacionCRUD.aplicar_aporte(db, OcupacionCRUD.leer_aporte(db, id_reserva, estados), signo)
+
+    @staticmethod
+    def leer_aporte(db: Session, id_reserva: UUID, estados=ESTADOS_RESERVA_VENDIDA):
+        """Aporte actual de la reserva, sin aplicarlo; None si no cuenta en el resumen."""
+        return db.execute(sentencia_contribucion(id_reserva, estados)).first()
+
+    @staticmethod
+    def aplicar_aporte(db: Session, aporte, signo: int) -> int:
+        """Suma o resta un aporte leído con leer_aporte. No hace commit."""
+        if aporte is None:
+            return 0
+        if aporte.estado_reserva == ESTADO_RESERVA_ACTIVA:
+            registrar_cambio(db, aporte.id_habitacion, aporte.fecha_entrada, aporte.fecha_salida, signo)
+        return OcupacionCRUD._acumular(db, filas_contribucion(
+            aporte.fecha_entrada, aporte.fecha_salida, aporte.id_tipo, aporte.costo_total, aporte.servicios, signo
+        ))
+
+    @staticmethod
+    def sumar_reserva_nueva(db: Session, reserva: Reserva, id_tipo: UUID) -> int:
+        """
+        Suma al resumen una reserva recién creada (aún sin servicios) con los datos
+        en memoria, sin consultarla. No hace commit.
+        """
+        if reserva.estado_reserva not in ESTADOS_RESERVA_VENDIDA:
+            return 0
+        if reserva.estado_reserva == ESTADO_RESERVA_ACTIVA:
+            registrar_cambio(db, reserva.id_habitacion, reserva.fecha_entrada, reserva.fecha_salida, 1)
+        return OcupacionCRUD._acumular(db, filas_contribucion(
+            reserva.fecha_entrada, reserva.fecha_salida, id_tipo, reserva.costo_total, 0, 1
+        ))
+
+    @staticmethod
+    def mover_habitacion(db: Session, id_habitacion: UUID, tipo_anterior: UUID, tipo_nuevo: UUID) -> int:
+        """
+        Pasa el aporte de las reservas vendidas de la habitación de las filas de
+        `tipo_anterior` a las de `tipo_nuevo`, al cambiar el tipo de la habitación:
+        una lectura y dos upserts con las noches sumadas por fecha. No hace commit.
+        Devuelve los días afectados.
+        """
+        if tipo_anterior == tipo_nuevo:
+            return 0
+        por_fecha = {}
+        for reserva in db.execute(sentencia_aportes_habitacion(id_habitacion)):
+            for fila in filas_contribucion(reserva.fecha_entrada, reserva.fecha_salida, None,
+                                           reserva.costo_total, reserva.servicios, 1):
+                acumulada = por_fecha.setdefault(fila["fecha"], dict.fromkeys(METRICAS, 0))
+                for metrica in METRICAS:
+                    acumulada[metrica] += fila[metrica]
+        for signo, id_tipo in ((-1, tipo_anterior), (1, tipo_nuevo)):
+            OcupacionCRUD._acumular(db, [
+                {"fecha": fecha, "id_tipo": id_tipo, **{m: signo * v for m, v in metricas.items()}}
+                for fecha, metricas in sorted(por_fecha.items())
+            ])
+        return len(por_fecha)
+
+    @staticmethod
+    def _acumular(db: Session, filas: list) -> int:
+        if filas:
+            db.execute(sentencia_acumular(db, filas))
+        return len(filas)
+
+    @staticmethod
+    def sumar_servicios(db: Session, id_reserva: UUID, monto) -> None:
+        """
+        Suma `monto` (un valor o una expresión SQL) a los ingresos por servicios del
+        día de entrada de la reserva, con una sola sentencia. No hace commit.
+        """
+        origen = (
+            select(
+                Reserva.fecha_entrada,
+                Habitacion.id_tipo,
+                literal(0), literal(0), literal(0), literal(0.0),
+                monto,
+            )
+            .join(Habitacion, Habitacion.id_habitacion == Reserva.id_habitacion)
+            .where(Reserva.id_reserva == id_reserva, Reserva.estado_reserva.in_(ESTADOS_RESERVA_VENDIDA))
+        )
+        db.execute(sentencia_acumular(db, origen))
+
+    @staticmethod
+    def obtener_resumen(db: Session, desde: date, hasta: date, id_tipo: UUID = None):
+        consulta = (
+            select(Ocupacion_Diaria)
+            .where(Ocupacion_Diaria.fecha >= desde, Ocupacion_Diaria.fecha < hasta)
+            .order_by(Ocupacion_Diaria.fecha, Ocupacion_Diaria.id_tipo)
+        )
+        if id_tipo is not None:
+            consulta = consulta.where(Ocupacion_Diaria.id_tipo == id_tipo)
+        return db.execute(consulta).scalars().all()
+
+    @staticmethod
+    def recalcular_periodo(db: Session, desde: date, hasta: date) -> int:
+        """
+        Reemplaza las filas de [desde, hasta) por las calculadas desde las reservas,
+        con un DELETE y un INSERT ... SELECT agrupado. No hace commit.
+        """
+        if desde >= hasta:
+            raise ValueError("La fecha inicial debe ser anterior a la final")
+        db.execute(delete(Ocupacion_Diaria).where(Ocupacion_Diaria.fecha >= desde, Ocupacion_Diaria.fecha < hasta))
+        # La consulta va como subconsulta para que la CTE de días de SQLite quede dentro
+        # del SELECT y el driver informe de las filas insertadas
+        calculadas = sentencia_recalculo(db, desde, hasta).subquery("calculadas")
+        resultado = db.execute(
+            insert(Ocupacion_Diaria).from_select(["fecha", "id_tipo", *METRICAS], select(*calculadas.c))
+        )
+        return resultado.rowcount
+
+    @staticmethod
+    def reconstruir(fabrica_sesiones, desde: date, hasta: date, dias_por_bloque: int = DIAS_POR_BLOQUE, hilos: int = 4):
+        """
+        Recalcula [desde, hasta) en bloques de `dias_por_bloque` días, `hilos` a la
+        vez, cada uno con su propia sesión y su commit. Genera (inicio, fin, filas)
+        a medida que termina cada bloque.
+        """
+        if desde >= hasta:
+            raise ValueError("La fecha inicial debe ser anterior a la final")
+
+        def recalcular(inicio, fin):
+            with fabrica_sesiones() as db:
+                filas = OcupacionCRUD.recalcular_periodo(db, inicio, fin)
+                db.commit()
+            return inicio, fin, filas
+
+        with ThreadPoolExecutor(max_workers=hilos) as ejecutor:
+            pendientes = [ejecutor.submit(recalcular, inicio, fin) for inicio, fin in bloques(desde, hasta, dias_por_bloque)]
+            try:
+                for terminado in as_completed(pendientes):
+                    yield terminado.result()
+            finally:
+                for pendiente in pendientes:
+                    pendiente.cancel()
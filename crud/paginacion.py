@@ -0,0 +1,55 @@
+from sqlalchemy import Select, tuple_
+from sqlalchemy.orm import Session
+
+TAMANO_LOTE_STREAMING = 1000
+
+
+def _columnas(columnas_clave):
+    return columnas_clave if isinstance(columnas_clave, (tuple, list)) else (columnas_clave,)
+
+
+def consulta_paginada(consulta: Select, columnas_clave, despues_de=None, limite: int = None) -> Select:
+    """
+    Aplica paginación por clave (keyset) a una consulta.
+
+    La consulta se ordena por `columnas_clave`, que deben identificar cada fila de
+    forma única y estable; `despues_de` es la clave de la última fila de la página
+    anterior (un valor, o una tupla si la clave tiene varias columnas). A diferencia
+    de OFFSET, el costo no crece con la profundidad de la página.
+    """
+    columnas = _columnas(columnas_clave)
+    if despues_de is not None:
+        if len(columnas) == 1:
+            consulta = consulta.where(columnas[0] > despues_de)
+        else:
+            consulta = consulta.where(tuple_(*columnas) > tuple_(*despues_de))
+    consulta = consulta.order_by(*columnas)
+    if limite is not None:
+        consulta = consulta.limit(limite)
+    return consulta
+
+
+def consulta_streaming(consulta: Select, columnas_clave, tamano_lote: int = TAMANO_LOTE_STREAMING) -> Select:
+    """
+    Prepara una consulta para recorrerse por lotes con `yield_per`. En PostgreSQL
+    esto usa un cursor del lado del servidor, así que la memoria es constante y la
+    primera fila llega sin esperar a que se lea toda la tabla.
+    """
+    return consulta.order_by(*_columnas(columnas_clave)).execution_options(yield_per=tamano_lote)
+
+
+def paginar(db: Session, consulta: Select, columnas_clave, despues_de=None, limite: int = None):
+    return db.execute(consulta_paginada(consulta, columnas_clave, despues_de, limite)).scalars().all()
+
+
+def iterar(db: Session, consulta: Select, columnas_clave, tamano_lote: int = TAMANO_LOTE_STREAMING):
+    yield from db.execute(consulta_streaming(consulta, columnas_clave, tamano_lote)).scalars()
+
+
+def clave_de(objeto, columnas_clave):
+    """
+    Clave de paginación de un objeto, para pasarla como `despues_de` en la página siguiente.
+    """
+    columnas = _columnas(columnas_clave)
+    valores = tuple(getattr(objeto, columna.key) for columna in columnas)
+    return valores[0] if len(valores) == 1 else valores
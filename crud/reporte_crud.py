@@ -0,0 +1,296 @@
+import os
+from dataclasses import dataclass
+from datetime import date
+
+from sqlalchemy import case, func, select
+from sqlalchemy.orm import Session
+from sqlalchemy.dialects.postgresql import UUID
+from entities.habitacion import Habitacion
+from entities.ocupacion_diaria import Ocupacion_Diaria
+from entities.reserva import Reserva
+from entities.reserva_servicios import Reserva_Servicios
+from entities.servicios_adicionales import Servicios_Adicionales
+from entities.tipo_habitacion import Tipo_Habitacion
+from crud.cache_referencia import CacheReferencia
+from crud.disponibilidad_crud import ESTADO_RESERVA_CANCELADA, ESTADOS_RESERVA_VENDIDA, habitaciones_por_tipo
+from crud.ocupacion_crud import tabla_dias
+from database.instrumentacion import instrumentacion
+
+
+def _dividir(numerador, denominador) -> float:
+    return numerador / denominador if denominador else 0.0
+
+
+@dataclass(frozen=True)
+class IndicadoresTipo:
+    """Ocupación, ADR y RevPAR de un tipo de habitación (o del hotel, con id_tipo None) en un periodo."""
+    id_tipo: UUID
+    nombre_tipo: str
+    habitaciones: int
+    noches_disponibles: int
+    noches_vendidas: int
+    llegadas: int
+    ingresos: float
+    ingresos_servicios: float
+
+    @property
+    def ocupacion(self) -> float:
+        return _dividir(self.noches_vendidas, self.noches_disponibles)
+
+    @property
+    def adr(self) -> float:
+        """Tarifa media diaria: ingresos por alojamiento / noches vendidas."""
+        return _dividir(self.ingresos, self.noches_vendidas)
+
+    @property
+    def revpar(self) -> float:
+        """Ingresos por habitación disponible: ingresos por alojamiento / noches disponibles."""
+        return _dividir(self.ingresos, self.noches_disponibles)
+
+
+@dataclass(frozen=True)
+class OcupacionDia:
+    fecha: date
+    habitaciones: int
+    noches_vendidas: int
+    ingresos: float
+
+    @property
+    def ocupacion(self) -> float:
+        return _dividir(self.noches_vendidas, self.habitaciones)
+
+
+@dataclass(frozen=True)
+class ServicioVendido:
+    id_servicio: UUID
+    nombre_servicio: str
+    cantidad: int
+    ingresos: float
+    # Fracción de todos los servicios vendidos en el periodo
+    participacion: float
+    posicion: int
+
+
+@dataclass(frozen=True)
+class CancelacionesTipo:
+    id_tipo: UUID
+    nombre_tipo: str
+    reservas: int
+    canceladas: int
+
+    @property
+    def tasa(self) -> float:
+        return _dividir(self.canceladas, self.reservas)
+
+
+def sumar_indicadores(filas) -> IndicadoresTipo:
+    """Totales del hotel a partir de los indicadores por tipo (ya agregados en SQL)."""
+    return IndicadoresTipo(
+        id_tipo=None,
+        nombre_tipo="Total",
+        habitaciones=sum(f.habitaciones for f in filas),
+        noches_disponibles=sum(f.noches_disponibles for f in filas),
+        noches_vendidas=sum(f.noches_vendidas for f in filas),
+        llegadas=sum(f.llegadas for f in filas),
+        ingresos=sum(f.ingresos for f in filas),
+        ingresos_servicios=sum(f.ingresos_servicios for f in filas),
+    )
+
+
+def sumar_cancelaciones(filas) -> CancelacionesTipo:
+    return CancelacionesTipo(
+        id_tipo=None,
+        nombre_tipo="Total",
+        reservas=sum(f.reservas for f in filas),
+        canceladas=sum(f.canceladas for f in filas),
+    )
+
+
+def sentencia_indicadores(desde: date, hasta: date):
+    """Por tipo: habitaciones a la venta y sumas de ocupacion_diaria en [desde, hasta)."""
+    habitaciones = habitaciones_por_tipo()
+    ventas = (
+        select(
+            Ocupacion_Diaria.id_tipo,
+            func.sum(Ocupacion_Diaria.habitaciones_vendidas).label("noches_vendidas"),
+            func.sum(Ocupacion_Diaria.llegadas).label("llegadas"),
+            func.sum(Ocupacion_Diaria.ingresos).label("ingresos"),
+            func.sum(Ocupacion_Diaria.ingresos_servicios).label("ingresos_servicios"),
+        )
+        .where(Ocupacion_Diaria.fecha >= desde, Ocupacion_Diaria.fecha < hasta)
+        .group_by(Ocupacion_Diaria.id_tipo)
+        .subquery("ventas")
+    )
+    return (
+        select(
+            Tipo_Habitacion.id_tipo,
+            Tipo_Habitacion.nombre_tipo,
+            func.coalesce(habitaciones.c.habitaciones, 0),
+            func.coalesce(ventas.c.noches_vendidas, 0),
+            func.coalesce(ventas.c.llegadas, 0),
+            func.coalesce(ventas.c.ingresos, 0),
+            func.coalesce(ventas.c.ingresos_servicios, 0),
+        )
+        .outerjoin(habitaciones, habitaciones.c.id_tipo == Tipo_Habitacion.id_tipo)
+        .outerjoin(ventas, ventas.c.id_tipo == Tipo_Habitacion.id_tipo)
+        .order_by(Tipo_Habitacion.nombre_tipo)
+    )
+
+
+def sentencia_ocupacion_por_dia(db: Session, desde: date, hasta: date):
+    """Un día por fila de [desde, hasta), con las habitaciones a la venta y las ventas del día."""
+    dias = tabla_dias(db, desde, hasta)
+    total_habitaciones = select(func.count()).where(Habitacion.disponible.is_(True)).scalar_subquery()
+    return (
+        select(
+            dias.c.fecha,
+            total_habitaciones,
+            func.coalesce(func.sum(Ocupacion_Diaria.habitaciones_vendidas), 0),
+            func.coalesce(func.sum(Ocupacion_Diaria.ingresos), 0),
+        )
+        .join_from(dias, Ocupacion_Diaria, Ocupacion_Diaria.fecha == dias.c.fecha, isouter=True)
+        .group_by(dias.c.fecha)
+        .order_by(dias.c.fecha)
+    )
+
+
+def sentencia_servicios_mas_vendidos(desde: date, hasta: date, limite: int):
+    """
+    Servicios de las reservas vendidas con entrada en [desde, hasta): cantidad,
+    ingresos, participación (sum() over ()) y posición (rank() over (...)).
+    """
+    cantidad = func.count()
+    return (
+        select(
+            Servicios_Adicionales.id_servicio,
+            Servicios_Adicionales.nombre_servicio,
+            cantidad,
+            func.sum(Reserva_Servicios.precio),
+            cantidad * 1.0 / func.sum(cantidad).over(),
+            func.rank().over(order_by=cantidad.desc()),
+        )
+        .join_from(Reserva_Servicios, Servicios_Adicionales,
+                   Servicios_Adicionales.id_servicio == Reserva_Servicios.id_servicio)
+        .join(Reserva, Reserva.id_reserva == Reserva_Servicios.id_reserva)
+        .where(
+            Reserva.fecha_entrada >= desde,
+            Reserva.fecha_entrada < hasta,
+            Reserva.estado_reserva.in_(ESTADOS_RESERVA_VENDIDA),
+        )
+        .group_by(Servicios_Adicionales.id_servicio, Servicios_Adicionales.nombre_servicio)
+        .order_by(cantidad.desc(), Servicios_Adicionales.nombre_servicio)
+        .limit(limite)
+    )
+
+
+def sentencia_cancelaciones(desde: date, hasta: date):
+    """Por tipo: reservas con entrada en [desde, hasta) y cuántas de ellas están canceladas."""
+    return (
+        select(
+            Tipo_Habitacion.id_tipo,
+            Tipo_Habitacion.nombre_tipo,
+            func.count(),
+            func.sum(case((Reserva.estado_reserva == ESTADO_RESERVA_CANCELADA, 1), else_=0)),
+        )
+        .join_from(Reserva, Habitacion, Habitacion.id_habitacion == Reserva.id_habitacion)
+        .join(Tipo_Habitacion, Tipo_Habitacion.id_tipo == Habitacion.id_tipo)
+        .where(Reserva.fecha_entrada >= desde, Reserva.fecha_entrada < hasta)
+        .group_by(Tipo_Habitacion.id_tipo, Tipo_Habitacion.nombre_tipo)
+        .order_by(Tipo_Habitacion.nombre_tipo)
+    )
+
+
+def periodo_cerrado(hasta: date) -> bool:
+    """Un periodo [desde, hasta) está cerrado cuando todas sus noches ya pasaron."""
+    return hasta <= date.today()
+
+
+def _validar_periodo(desde: date, hasta: date) -> None:
+    if desde >= hasta:
+        raise ValueError("La fecha inicial debe ser anterior a la final")
+
+
+cache_reportes = CacheReferencia(
+    ttl_segundos=float(os.getenv("CACHE_REPORTES_TTL", "21600")),
+    max_entradas=int(os.getenv("CACHE_REPORTES_MAX_ENTRADAS", "256")),
+)
+instrumentacion.registrar_fuente("Caché de reportes", cache_reportes.estadisticas)
+
+
+class ReporteCRUD:
+    """
+    Módulo de reportes de ocupación, ingresos, servicios y cancelaciones.
+
+    Cada reporte es una única consulta agregada (GROUP BY o funciones de
+    ventana) que resuelve la base de datos; Python solo recibe las filas ya
+    agregadas, una por tipo, día o servicio.
+
+    Funciones principales:
+        - indicadores(db: Session, desde: date, hasta: date, usar_cache: bool = True) -> Tuple[IndicadoresTipo]
+        - ocupacion_por_dia(db: Session, desde: date, hasta: date, usar_cache: bool = True) -> Tuple[OcupacionDia]
+        - servicios_mas_vendidos(db: Session, desde: date, hasta: date, limite: int = 10, usar_cache: bool = True) -> Tuple[ServicioVendido]
+        - cancelaciones(db: Session, desde: date, hasta: date, usar_cache: bool = True) -> Tuple[CancelacionesTipo]
+
+    Notas:
+        - Ocupación, ADR y RevPAR se leen de ocupacion_diaria (ver OcupacionCRUD), no
+          de las reservas; ADR y RevPAR usan los ingresos por alojamiento, sin servicios.
+        - Las noches disponibles se calculan con las habitaciones habilitadas hoy: no
+          hay histórico de altas y bajas de habitaciones.
+        - Servicios y cancelaciones cuentan las reservas por fecha de entrada en [desde, hasta).
+        - Los periodos cerrados (hasta <= hoy) se guardan en `cache_reportes` durante
+          CACHE_REPORTES_TTL segundos (6 horas por defecto); los abiertos se consultan siempre.
+          Las correcciones de reservas pasadas se ven al expirar la entrada.
+        - Los resultados son tuplas de dataclasses inmutables, no objetos ORM.
+    """
+    def __init__(self, db):
+        self.db = db
+
+    @staticmethod
+    def _consultar(clave: tuple, hasta: date, cargar, usar_cache: bool):
+        # La sentencia se construye dentro de cargar(): un acierto no compila nada
+        if usar_cache and periodo_cerrado(hasta):
+            return cache_reportes.obtener(clave, cargar)
+        return cargar()
+
+    @staticmethod
+    def indicadores(db: Session, desde: date, hasta: date, usar_cache: bool = True):
+        """Ocupación, ADR y RevPAR de [desde, hasta) por tipo de habitación, en una consulta."""
+        _validar_periodo(desde, hasta)
+        dias = (hasta - desde).days
+
+        def cargar():
+            return tuple(
+                IndicadoresTipo(id_tipo, nombre, cuartos, cuartos * dias, vendidas, llegadas, ingresos, servicios)
+                for id_tipo, nombre, cuartos, vendidas, llegadas, ingresos, servicios
+                in db.execute(sentencia_indicadores(desde, hasta))
+            )
+        return ReporteCRUD._consultar(("indicadores", desde, hasta), hasta, cargar, usar_cache)
+
+    @staticmethod
+    def ocupacion_por_dia(db: Session, desde: date, hasta: date, usar_cache: bool = True):
+        """Ocupación e ingresos de cada día de [desde, hasta), incluidos los días sin ventas."""
+        _validar_periodo(desde, hasta)
+
+        def cargar():
+            return tuple(OcupacionDia(*fila) for fila in db.execute(sentencia_ocupacion_por_dia(db, desde, hasta)))
+        return ReporteCRUD._consultar(("ocupacion_por_dia", desde, hasta), hasta, cargar, usar_cache)
+
+    @staticmethod
+    def servicios_mas_vendidos(db: Session, desde: date, hasta: date, limite: int = 10, usar_cache: bool = True):
+        """Los `limite` servicios más contratados en las reservas vendidas con entrada en [desde, hasta)."""
+        _validar_periodo(desde, hasta)
+
+        def cargar():
+            return tuple(
+                ServicioVendido(*fila) for fila in db.execute(sentencia_servicios_mas_vendidos(desde, hasta, limite))
+            )
+        return ReporteCRUD._consultar(("servicios_mas_vendidos", desde, hasta, limite), hasta, cargar, usar_cache)
+
+    @staticmethod
+    def cancelaciones(db: Session, desde: date, hasta: date, usar_cache: bool = True):
+        """Reservas y cancelaciones por tipo de habitación, por fecha de entrada en [desde, hasta)."""
+        _validar_periodo(desde, hasta)
+
+        def cargar():
+            return tuple(CancelacionesTipo(*fila) for fila in db.execute(sentencia_cancelaciones(desde, hasta)))
+        return ReporteCRUD._consultar(("cancelaciones", desde, hasta), hasta, cargar, usar_cache)
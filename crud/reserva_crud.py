@@ -1,6 +1,46 @@
+from datetime import date
+
+from sqlalchemy import func, select, update
+from sqlalchemy.exc import IntegrityError
 from sqlalchemy.orm import Session
 from sqlalchemy.dialects.postgresql import UUID
+from entities.habitacion import Habitacion
 from entities.reserva import Reserva
+from entities.usuario import Usuario
+from crud.actualizacion import actualizar_por_id, sentencia_actualizacion, valores_actualizables
+from crud.disponibilidad_crud import (
+    ESTADO_RESERVA_ACTIVA,
+    ESTADO_RESERVA_CANCELADA,
+    ESTADO_RESERVA_FINALIZADA,
+    condicion_habitacion_libre,
+)
+from crud.eventos_reserva import registrar_cambio
+from crud.ocupacion_crud import OcupacionCRUD
+from crud.paginacion import TAMANO_LOTE_STREAMING, consulta_streaming, iterar, paginar
+from crud.unidad_trabajo import confirmar, en_lote, lote
+
+# Clave estable para la paginación por clave (keyset)
+CLAVE_RESERVA = (Reserva.fecha_creacion, Reserva.id_reserva)
+# Columnas que cambian el aporte de una reserva al resumen de ocupación
+CAMPOS_RESUMEN = frozenset({"fecha_entrada", "fecha_salida", "estado_reserva", "costo_total", "id_habitacion"})
+
+
+def _consulta_detallada(id_cliente: UUID = None, estado: str = None):
+    consulta = (
+        select(
+            Reserva,
+            Habitacion.numero.label("numero_habitacion"),
+            Usuario.nombre.label("nombre_cliente"),
+            Usuario.apellidos.label("apellidos_cliente"),
+        )
+        .outerjoin(Habitacion, Habitacion.id_habitacion == Reserva.id_habitacion)
+        .outerjoin(Usuario, Usuario.id_usuario == Reserva.id_cliente)
+    )
+    if id_cliente is not None:
+        consulta = consulta.where(Reserva.id_cliente == id_cliente)
+    if estado is not None:
+        consulta = consulta.where(Reserva.estado_reserva == estado)
+    return consulta
 
 class ReservaCRUD:
     """
@@ -10,22 +50,50 @@ class ReservaCRUD:
     y asociando correctamente a cliente y habitación.
 
     Funciones principales:
-        - crear_reserva(db: Session, reserva: Reserva) -> Reserva
+        - lote() -> ContextManager  (unidad de trabajo con un único commit)
+        - crear_reserva(db: Session, reserva: Reserva, refrescar: bool = False) -> Reserva
         - obtener_reserva(db: Session, id_reserva: UUID) -> Reserva
-        - obtener_reservas(db: Session) -> List[Reserva]
+        - obtener_reservas(db: Session, despues_de: tuple = None, limite: int = None) -> List[Reserva]
+        - iterar_reservas(db: Session, tamano_lote: int = 1000) -> Iterator[Reserva]
+        - obtener_reservas_detalladas(db: Session, id_cliente: UUID = None, estado: str = None) -> List[Row]
+        - iterar_reservas_detalladas(db: Session, estado: str = None, desde: date = None, hasta: date = None) -> Iterator[Row]
+        - contar_reservas_por_expirar(db: Session, hasta: date) -> int
+        - expirar_reservas(db: Session, hasta: date, limite: int = 5000, id_usuario_edita: UUID = None) -> int
         - actualizar_reserva(db: Session, id_reserva: UUID, **kwargs) -> Reserva
+        - cancelar_reserva(db: Session, id_reserva: UUID, id_usuario_edita: UUID = None) -> Reserva
         - eliminar_reserva(db: Session, id_reserva: UUID) -> bool
-        - obtener_reservas_activas(db: Session) -> List[Reserva]
+        - obtener_reservas_activas(db: Session, despues_de: tuple = None, limite: int = None) -> List[Reserva]
+        - iterar_reservas_activas(db: Session, tamano_lote: int = 1000) -> Iterator[Reserva]
         - actualizar_costo_total(db: Session, id_reserva: UUID, monto_extra: float) -> Reserva
+        - asignar_habitacion(db: Session, reserva: Reserva, id_tipo: UUID, max_intentos: int = 3, costo=None) -> Reserva
 
     Notas:
         - Se valida que la fecha de entrada sea menor a la de salida.
-        - Al cancelar una reserva se recomienda actualizar el estado de la habitación.
+        - Los listados se paginan por (fecha_creacion, id_reserva): `despues_de`
+          es esa tupla para la última reserva de la página anterior.
+        - La ocupación de una habitación se deriva de sus reservas activas
+          (ver DisponibilidadCRUD); no es necesario modificar `Habitacion.disponible`.
+        - asignar_habitacion bloquea la habitación elegida con
+          `SELECT ... FOR UPDATE SKIP LOCKED`, de modo que reservas concurrentes
+          obtienen habitaciones distintas sin esperarse entre sí. Como la habitación
+          asignada puede no ser la mostrada al cliente, `costo` permite calcular el
+          costo total con la habitación bloqueada antes de guardarla.
+        - expirar_reservas pasa a "Finalizada" las reservas activas ya terminadas,
+          por lotes de `limite` filas; dentro de un lote de la unidad de trabajo
+          todo se confirma al final.
+        - Las escrituras mantienen el resumen diario de ocupación (OcupacionCRUD)
+          en la misma transacción que la reserva, y tras el commit avisan de las
+          noches ocupadas o liberadas a los oyentes de crud/eventos_reserva.py.
+          expirar_reservas no avisa: con la fecha por defecto (hoy) solo cambia noches pasadas.
     """
     def __init__(self, db):
         self.db = db
+
+    def lote(self):
+        return lote(self.db)
+
     @staticmethod
-    def crear_reserva(db: Session, reserva: Reserva):
+    def crear_reserva(db: Session, reserva: Reserva, refrescar: bool = False):
         if not reserva.id_cliente or not reserva.id_habitacion:
             raise ValueError("La reserva debe estar asociada a un cliente y una habitación")
 
@@ -33,8 +101,9 @@ class ReservaCRUD:
             raise ValueError("La fecha de entrada debe ser anterior a la fecha de salida")
 
         db.add(reserva)
-        db.commit()
-        db.refresh(reserva)
+        db.flush()
+        OcupacionCRUD.aplicar_reserva(db, reserva.id_reserva, 1)
+        confirmar(db, reserva, refrescar=refrescar)
         return reserva
 
     @staticmethod
@@ -45,24 +114,125 @@ class ReservaCRUD:
         return reserva
 
     @staticmethod
-    def obtener_reservas(db: Session):
-        return db.query(Reserva).all()
+    def obtener_reservas(db: Session, despues_de: tuple = None, limite: int = None):
+        return paginar(db, select(Reserva), CLAVE_RESERVA, despues_de, limite)
+
+    @staticmethod
+    def iterar_reservas(db: Session, tamano_lote: int = TAMANO_LOTE_STREAMING):
+        return iterar(db, select(Reserva), CLAVE_RESERVA, tamano_lote)
+
+    @staticmethod
+    def obtener_reservas_detalladas(db: Session, id_cliente: UUID = None, estado: str = None):
+        """
+        Lista reservas junto con el número de habitación y el nombre del cliente
+        en una sola consulta, evitando una búsqueda por fila.
+
+        Returns:
+            Filas con los atributos `Reserva`, `numero_habitacion`,
+            `nombre_cliente` y `apellidos_cliente` (None si no hay habitación o cliente).
+        """
+        consulta = _consulta_detallada(id_cliente, estado).order_by(Reserva.fecha_entrada, Reserva.id_reserva)
+        return db.execute(consulta).all()
+
+    @staticmethod
+    def iterar_reservas_detalladas(db: Session, estado: str = None, desde: date = None, hasta: date = None,
+                                   tamano_lote: int = TAMANO_LOTE_STREAMING):
+        """
+        Recorre por lotes las mismas filas que obtener_reservas_detalladas, con
+        memoria constante, filtrando opcionalmente por fecha de entrada en [desde, hasta).
+        """
+        consulta = _consulta_detallada(estado=estado)
+        if desde is not None:
+            consulta = consulta.where(Reserva.fecha_entrada >= desde)
+        if hasta is not None:
+            consulta = consulta.where(Reserva.fecha_entrada < hasta)
+        yield from db.execute(consulta_streaming(consulta, CLAVE_RESERVA, tamano_lote))
+
+    @staticmethod
+    def contar_reservas_por_expirar(db: Session, hasta: date) -> int:
+        return db.execute(
+            select(func.count()).select_from(Reserva).where(
+                Reserva.estado_reserva == ESTADO_RESERVA_ACTIVA, Reserva.fecha_salida < hasta
+            )
+        ).scalar()
+
+    @staticmethod
+    def expirar_reservas(db: Session, hasta: date, limite: int = 5_000, id_usuario_edita: UUID = None) -> int:
+        """
+        Marca como finalizadas hasta `limite` reservas activas con fecha de salida
+        anterior a `hasta`, con un solo UPDATE, y devuelve cuántas cambió. Llamarla
+        hasta que devuelva 0 expira todas sin bloquear la tabla en una sola transacción.
+        """
+        pendientes = (
+            select(Reserva.id_reserva)
+            .where(Reserva.estado_reserva == ESTADO_RESERVA_ACTIVA, Reserva.fecha_salida < hasta)
+            .limit(limite)
+        )
+        resultado = db.execute(
+            update(Reserva)
+            .where(Reserva.id_reserva.in_(pendientes))
+            .values(
+                estado_reserva=ESTADO_RESERVA_FINALIZADA,
+                id_usuario_edita=id_usuario_edita,
+                fecha_edicion=func.now(),
+            )
+            .execution_options(synchronize_session=False)
+        )
+        confirmar(db)
+        return resultado.rowcount
 
     @staticmethod
     def actualizar_reserva(db: Session, id_reserva: UUID, **kwargs):
-        reserva = db.query(Reserva).filter(Reserva.id_reserva == id_reserva).first()
-        if not reserva:
-            raise ValueError("Reserva no encontrada")
+        valores = valores_actualizables(Reserva, kwargs)
+        if not valores:
+            return ReservaCRUD.obtener_reserva(db, id_reserva)
 
-        for key, value in kwargs.items():
-            if hasattr(reserva, key):
-                setattr(reserva, key, value)
+        # Si solo cambia una de las fechas, la validación contra la otra se hace
+        # en el WHERE del mismo UPDATE.
+        entrada, salida = valores.get("fecha_entrada"), valores.get("fecha_salida")
+        condiciones = []
+        if entrada and salida:
+            if entrada >= salida:
+                raise ValueError("La fecha de entrada debe ser anterior a la fecha de salida")
+        elif entrada:
+            condiciones.append(Reserva.fecha_salida > entrada)
+        elif salida:
+            condiciones.append(Reserva.fecha_entrada < salida)
 
-        if reserva.fecha_inicio and reserva.fecha_fin and reserva.fecha_inicio >= reserva.fecha_fin:
-            raise ValueError("La fecha de inicio debe ser anterior a la fecha de fin")
+        # El aporte anterior al resumen de ocupación se lee antes del UPDATE pero se
+        # resta solo si el UPDATE se aplica: un fallo (también dentro de un lote) no
+        # deja restas ni cambios de ocupación a medias.
+        afecta_resumen = not CAMPOS_RESUMEN.isdisjoint(valores)
+        anterior = OcupacionCRUD.leer_aporte(db, id_reserva) if afecta_resumen else None
+        reserva = actualizar_por_id(db, Reserva, Reserva.id_reserva, id_reserva, valores, *condiciones)
+        if not reserva:
+            if db.scalar(select(Reserva.id_reserva).where(Reserva.id_reserva == id_reserva)) is None:
+                raise ValueError("Reserva no encontrada")
+            raise ValueError("La fecha de entrada debe ser anterior a la fecha de salida")
+        if afecta_resumen:
+            OcupacionCRUD.aplicar_aporte(db, anterior, -1)
+            OcupacionCRUD.aplicar_reserva(db, id_reserva, 1)
+        confirmar(db)
+        return reserva
 
-        db.commit()
-        db.refresh(reserva)
+    @staticmethod
+    def cancelar_reserva(db: Session, id_reserva: UUID, id_usuario_edita: UUID = None):
+        """
+        Cancela una reserva activa con un UPDATE condicionado a su estado, de modo
+        que dos cancelaciones simultáneas no la restan dos veces del resumen.
+        """
+        reserva = actualizar_por_id(
+            db, Reserva, Reserva.id_reserva, id_reserva,
+            {"estado_reserva": ESTADO_RESERVA_CANCELADA, "id_usuario_edita": id_usuario_edita},
+            Reserva.estado_reserva == ESTADO_RESERVA_ACTIVA,
+        )
+        if not reserva:
+            ReservaCRUD.obtener_reserva(db, id_reserva)
+            raise ValueError("Solo se pueden cancelar reservas activas")
+        # El resumen ya la lee cancelada: la habitación se libera aquí
+        registrar_cambio(db, reserva.id_habitacion, reserva.fecha_entrada, reserva.fecha_salida, -1)
+        OcupacionCRUD.aplicar_reserva(db, id_reserva, -1, estados=None)
+        confirmar(db)
         return reserva
 
     @staticmethod
@@ -70,19 +240,86 @@ class ReservaCRUD:
         reserva = db.query(Reserva).filter(Reserva.id_reserva == id_reserva).first()
         if not reserva:
             raise ValueError("Reserva no encontrada")
+        OcupacionCRUD.aplicar_reserva(db, id_reserva, -1)
         db.delete(reserva)
-        db.commit()
+        confirmar(db)
         return True
     @staticmethod
-    def obtener_reservas_activas(db: Session):
-        return db.query(Reserva).filter(Reserva.estado_reserva == "Activa").all()
+    def obtener_reservas_activas(db: Session, despues_de: tuple = None, limite: int = None):
+        consulta = select(Reserva).where(Reserva.estado_reserva == "Activa")
+        return paginar(db, consulta, CLAVE_RESERVA, despues_de, limite)
+
+    @staticmethod
+    def iterar_reservas_activas(db: Session, tamano_lote: int = TAMANO_LOTE_STREAMING):
+        consulta = select(Reserva).where(Reserva.estado_reserva == "Activa")
+        return iterar(db, consulta, CLAVE_RESERVA, tamano_lote)
     
     @staticmethod
     def actualizar_costo_total(db: Session, id_reserva, monto_extra: float):
-        reserva = db.query(Reserva).filter_by(id_reserva=id_reserva).first()
+        """
+        Suma `monto_extra` al costo total en la base de datos
+        (`costo_total = costo_total + :monto`), de modo que dos incrementos
+        concurrentes no se pisan. No hace commit.
+        """
+        anterior = OcupacionCRUD.leer_aporte(db, id_reserva)
+        reserva = actualizar_por_id(
+            db, Reserva, Reserva.id_reserva, id_reserva, {"costo_total": Reserva.costo_total + monto_extra}
+        )
         if not reserva:
             raise ValueError("Reserva no encontrada")
-
-        reserva.costo_total += monto_extra
-        db.add(reserva)
+        OcupacionCRUD.aplicar_aporte(db, anterior, -1)
+        OcupacionCRUD.aplicar_reserva(db, id_reserva, 1)
         return reserva
+
+    @staticmethod
+    def asignar_habitacion(db: Session, reserva: Reserva, id_tipo: UUID, max_intentos: int = 3, costo=None):
+        """
+        Asigna de forma atómica una habitación libre del tipo indicado a la reserva
+        y la guarda. La habitación queda bloqueada hasta el commit; las habitaciones
+        bloqueadas por otras transacciones se saltan en lugar de esperar.
+        Si la restricción de exclusión detecta un solapamiento (otra transacción
+        confirmó primero la misma habitación), se reintenta con otra habitación.
+        Con `costo(habitacion) -> float` el costo total se calcula con la habitación
+        bloqueada, antes de guardar la reserva y de sumarla al resumen.
+        """
+        if not reserva.id_cliente:
+            raise ValueError("La reserva debe estar asociada a un cliente")
+        if reserva.fecha_entrada >= reserva.fecha_salida:
+            raise ValueError("La fecha de entrada debe ser anterior a la fecha de salida")
+
+        for _ in range(max_intentos):
+            consulta = (
+                select(Habitacion)
+                .where(
+                    Habitacion.id_tipo == id_tipo,
+                    Habitacion.disponible.is_(True),
+                    condicion_habitacion_libre(db, reserva.fecha_entrada, reserva.fecha_salida),
+                )
+                .order_by(Habitacion.numero)
+                .limit(1)
+                .with_for_update(skip_locked=True, of=Habitacion)
+            )
+            habitacion = db.execute(consulta).scalars().first()
+            if not habitacion:
+                raise ValueError("No hay habitaciones disponibles de ese tipo para esas fechas")
+
+            reserva.id_habitacion = habitacion.id_habitacion
+            if costo is not None:
+                reserva.costo_total = costo(habitacion)
+            db.add(reserva)
+            try:
+                if en_lote(db):
+                    # Dentro de un lote el solapamiento se comprueba con un savepoint
+                    # para no deshacer el resto de la unidad de trabajo.
+                    with db.begin_nested():
+                        db.flush()
+                else:
+                    db.flush()
+            except IntegrityError:
+                if not en_lote(db):
+                    db.rollback()
+                continue
+            OcupacionCRUD.sumar_reserva_nueva(db, reserva, habitacion.id_tipo)
+            confirmar(db)
+            return reserva
+        raise ValueError("No se pudo asignar una habitación, intente de nuevo")
@@ -1,6 +1,23 @@
+from sqlalchemy import literal, select
+from sqlalchemy.exc import IntegrityError
 from sqlalchemy.orm import Session
 from sqlalchemy.dialects.postgresql import UUID
+from entities.reserva import Reserva
 from entities.reserva_servicios import Reserva_Servicios
+from entities.servicios_adicionales import Servicios_Adicionales
+from crud.actualizacion import actualizar_por_id
+from crud.insercion import INSERT_POR_DIALECTO
+from crud.ocupacion_crud import OcupacionCRUD
+from crud.paginacion import paginar
+from crud.unidad_trabajo import confirmar, en_lote, lote
+
+# Clave estable para la paginación por clave (keyset)
+CLAVE_RESERVA_SERVICIO = (Reserva_Servicios.id_reserva, Reserva_Servicios.id_servicio)
+
+def precio_catalogo(id_servicio: UUID):
+    """Precio actual del servicio en el catálogo, como subconsulta para el INSERT que lo contrata."""
+    return select(Servicios_Adicionales.precio).where(Servicios_Adicionales.id_servicio == id_servicio).scalar_subquery()
+
 
 class ReservaServiciosCRUD:
     """
@@ -9,23 +26,77 @@ class ReservaServiciosCRUD:
     Administra la relación entre las reservas y los servicios adicionales contratados.
 
     Funciones principales:
-        - crear_reserva_servicio(db: Session, reserva_servicio: Reserva_Servicios) -> Reserva_Servicios
+        - lote() -> ContextManager  (unidad de trabajo con un único commit)
+        - crear_reserva_servicio(db: Session, reserva_servicio: Reserva_Servicios, refrescar: bool = False) -> Reserva_Servicios
+        - agregar_servicios(db: Session, id_reserva: UUID, ids_servicios: List[UUID]) -> Reserva
         - obtener_reserva_servicio(db: Session, id_reserva_servicio: UUID) -> Reserva_Servicios
-        - obtener_reservas_servicios(db: Session, skip: int = 0, limit: int = 100) -> List[Reserva_Servicios]
+        - obtener_reservas_servicios(db: Session, despues_de: tuple = None, limite: int = 100) -> List[Reserva_Servicios]
         - eliminar_reserva_servicio(db: Session, id_reserva_servicio: UUID) -> bool
+
+    Notas:
+        - agregar_servicios no bloquea la reserva: el costo se incrementa en SQL,
+          así que dos usuarios pueden agregar servicios a la vez sin perder montos.
+        - Cada servicio guarda el precio con que se contrató (reserva_servicios.precio);
+          los cambios posteriores del catálogo no alteran lo ya cobrado.
+        - El subtotal agregado se suma también a los ingresos por servicios del
+          resumen de ocupación, en el día de entrada de la reserva.
     """
     def __init__(self, db):
         self.db = db
+
+    def lote(self):
+        return lote(self.db)
+
     @staticmethod
-    def crear_reserva_servicio(db: Session, reserva_servicio: Reserva_Servicios):
+    def crear_reserva_servicio(db: Session, reserva_servicio: Reserva_Servicios, refrescar: bool = False):
         if not reserva_servicio.id_reserva or not reserva_servicio.id_servicio:
             raise ValueError("El registro debe estar asociado a una reserva y un servicio")
         
+        if reserva_servicio.precio is None:
+            reserva_servicio.precio = precio_catalogo(reserva_servicio.id_servicio)
         db.add(reserva_servicio)
-        db.commit()
-        db.refresh(reserva_servicio)
+        confirmar(db, reserva_servicio, refrescar=refrescar)
         return reserva_servicio
 
+    @staticmethod
+    def agregar_servicios(db: Session, id_reserva: UUID, ids_servicios):
+        """
+        Agrega varios servicios a una reserva con un único INSERT de varias filas
+        que guarda el precio actual de cada uno (los servicios que la reserva ya
+        tenía se ignoran) y suma al costo total, en un único UPDATE, el precio de
+        los servicios realmente agregados.
+        Devuelve la reserva actualizada.
+        """
+        ids_servicios = list(dict.fromkeys(ids_servicios))
+        if not ids_servicios:
+            raise ValueError("Debe seleccionar al menos un servicio")
+
+        insertar = INSERT_POR_DIALECTO[db.get_bind().dialect.name]
+        sentencia = (
+            insertar(Reserva_Servicios)
+            .values([
+                {"id_reserva": id_reserva, "id_servicio": id_servicio, "precio": precio_catalogo(id_servicio)}
+                for id_servicio in ids_servicios
+            ])
+            .on_conflict_do_nothing(index_elements=[Reserva_Servicios.id_reserva, Reserva_Servicios.id_servicio])
+            .returning(Reserva_Servicios.precio)
+        )
+        try:
+            precios = db.execute(sentencia).scalars().all()
+        except IntegrityError:
+            if not en_lote(db):
+                db.rollback()
+            raise ValueError("La reserva o alguno de los servicios no existe")
+
+        subtotal = sum(precios)
+        reserva = actualizar_por_id(
+            db, Reserva, Reserva.id_reserva, id_reserva, {"costo_total": Reserva.costo_total + subtotal}
+        )
+        if precios:
+            OcupacionCRUD.sumar_servicios(db, id_reserva, literal(subtotal))
+        confirmar(db)
+        return reserva
+
     @staticmethod
     def obtener_reserva_servicio(db: Session, id_reserva_servicio: UUID):
         rs = db.query(Reserva_Servicios).filter(Reserva_Servicios.id_reserva_servicio == id_reserva_servicio).first()
@@ -34,8 +105,8 @@ class ReservaServiciosCRUD:
         return rs
 
     @staticmethod
-    def obtener_reservas_servicios(db: Session, skip: int = 0, limit: int = 100):
-        return db.query(Reserva_Servicios).offset(skip).limit(limit).all()
+    def obtener_reservas_servicios(db: Session, despues_de: tuple = None, limite: int = 100):
+        return paginar(db, select(Reserva_Servicios), CLAVE_RESERVA_SERVICIO, despues_de, limite)
 
     @staticmethod
     def eliminar_reserva_servicio(db: Session, id_reserva_servicio: UUID) -> bool:
@@ -43,5 +114,5 @@ class ReservaServiciosCRUD:
         if not rs:
             raise ValueError("Reserva-Servicio no encontrado")
         db.delete(rs)
-        db.commit()
+        confirmar(db)
         return True
@@ -1,7 +1,18 @@
+from sqlalchemy import select
 from sqlalchemy.orm import Session
 from sqlalchemy.dialects.postgresql import UUID
 from entities.servicios_adicionales import Servicios_Adicionales
 from datetime import date
+from crud.paginacion import TAMANO_LOTE_STREAMING, iterar, paginar
+from crud.cache_referencia import ServicioRef, cache_referencia, invalidar_tras_escritura
+from crud.insercion import insertar_si_no_existe
+from crud.masivo import duplicados, filas_de, insertar_filas, valores_existentes
+from crud.unidad_trabajo import confirmar, lote
+
+# Clave estable para la paginación por clave (keyset)
+CLAVE_SERVICIO = (Servicios_Adicionales.nombre_servicio, Servicios_Adicionales.id_servicio)
+# Entrada de la caché de referencia con el catálogo de servicios
+CACHE_SERVICIOS = "servicios_adicionales"
 
 class ServiciosAdicionalesCRUD:
     """
@@ -11,17 +22,27 @@ class ServiciosAdicionalesCRUD:
     transporte, restaurante, entre otros.
 
     Funciones principales:
+        - lote() -> ContextManager  (unidad de trabajo con un único commit)
         - crear_servicio(db: Session, servicio: Servicios_Adicionales) -> Servicios_Adicionales
+        - bulk_crear_servicios(db: Session, servicios: List[Servicios_Adicionales]) -> int
         - obtener_servicio(db: Session, id_servicio: UUID) -> Servicios_Adicionales
-        - obtener_servicios(db: Session) -> List[Servicios_Adicionales]
-        - actualizar_servicio(db: Session, servicio: Servicios_Adicionales, id_usuario_edita: int, fecha_edita: date) -> Servicios_Adicionales
+        - obtener_servicios(db: Session, despues_de: tuple = None, limite: int = None) -> List[Servicios_Adicionales]
+        - iterar_servicios(db: Session, tamano_lote: int = 1000) -> Iterator[Servicios_Adicionales]
+        - obtener_servicios_referencia(db: Session) -> List[ServicioRef]
+        - actualizar_servicio(db: Session, servicio: Servicios_Adicionales, id_usuario_edita: int, fecha_edita: date, refrescar: bool = False) -> Servicios_Adicionales
         - eliminar_servicio(db: Session, id_servicio: UUID) -> bool
 
     Notas:
         - Se valida nombre no vacío, precio mayor a 0 y unicidad del servicio.
+        - Los listados se paginan por (nombre_servicio, id_servicio).
+        - obtener_servicios_referencia usa la caché de referencia; toda escritura la invalida.
     """
     def __init__(self, db):
         self.db = db
+
+    def lote(self):
+        return lote(self.db)
+
     @staticmethod
     def crear_servicio(db: Session, servicio: Servicios_Adicionales):
         if not servicio.nombre_servicio or not servicio.nombre_servicio.strip():
@@ -29,14 +50,33 @@ class ServiciosAdicionalesCRUD:
         if servicio.precio <= 0:
             raise ValueError("El precio del servicio debe ser mayor a 0")
         
-        existente = db.query(Servicios_Adicionales).filter(Servicios_Adicionales.nombre_servicio == servicio.nombre_servicio).first()
-        if existente:
+        creado = insertar_si_no_existe(db, servicio, Servicios_Adicionales.nombre_servicio)
+        if not creado:
             raise ValueError("El servicio adicional ya existe")
+        confirmar(db)
+        invalidar_tras_escritura(db, CACHE_SERVICIOS)
+        return creado
 
-        db.add(servicio)
-        db.commit()
-        db.refresh(servicio)
-        return servicio
+    @staticmethod
+    def bulk_crear_servicios(db: Session, servicios):
+        """
+        Crea muchos servicios con una sola consulta de unicidad y una inserción
+        por lotes. Valida el lote completo antes de insertar.
+        """
+        for servicio in servicios:
+            if not servicio.nombre_servicio or not servicio.nombre_servicio.strip():
+                raise ValueError("El nombre del servicio no puede estar vacío")
+            if servicio.precio is None or servicio.precio <= 0:
+                raise ValueError("El precio del servicio debe ser mayor a 0")
+        nombres = [s.nombre_servicio for s in servicios]
+        repetidos = duplicados(nombres) | valores_existentes(db, Servicios_Adicionales.nombre_servicio, nombres)
+        if repetidos:
+            raise ValueError(f"Los servicios adicionales ya existen: {sorted(repetidos)[:10]}")
+
+        insertados = insertar_filas(db, Servicios_Adicionales, filas_de(Servicios_Adicionales, servicios))
+        confirmar(db)
+        invalidar_tras_escritura(db, CACHE_SERVICIOS)
+        return insertados
 
     @staticmethod
     def obtener_servicio(db: Session, id_servicio: UUID):
@@ -46,15 +86,28 @@ class ServiciosAdicionalesCRUD:
         return servicio
 
     @staticmethod
-    def obtener_servicios(db: Session):
-        return db.query(Servicios_Adicionales).all()
+    def obtener_servicios(db: Session, despues_de: tuple = None, limite: int = None):
+        return paginar(db, select(Servicios_Adicionales), CLAVE_SERVICIO, despues_de, limite)
+
+    @staticmethod
+    def iterar_servicios(db: Session, tamano_lote: int = TAMANO_LOTE_STREAMING):
+        return iterar(db, select(Servicios_Adicionales), CLAVE_SERVICIO, tamano_lote)
     
     @staticmethod
-    def actualizar_servicio(db, servicio: Servicios_Adicionales, id_usuario_edita: int, fecha_edita: date):
+    def obtener_servicios_referencia(db: Session):
+        def cargar():
+            return tuple(
+                ServicioRef(s.id_servicio, s.nombre_servicio, s.precio, s.descripcion)
+                for s in ServiciosAdicionalesCRUD.obtener_servicios(db)
+            )
+        return cache_referencia.obtener(CACHE_SERVICIOS, cargar)
+
+    @staticmethod
+    def actualizar_servicio(db, servicio: Servicios_Adicionales, id_usuario_edita: int, fecha_edita: date, refrescar: bool = False):
         servicio.id_usuario_edita = id_usuario_edita
         servicio.fecha_edita = fecha_edita
-        db.commit()
-        db.refresh(servicio)
+        confirmar(db, servicio, refrescar=refrescar)
+        invalidar_tras_escritura(db, CACHE_SERVICIOS)
         return servicio
 
     @staticmethod
@@ -63,5 +116,6 @@ class ServiciosAdicionalesCRUD:
         if not servicio:
             raise ValueError("Servicio no encontrado")
         db.delete(servicio)
-        db.commit()
+        confirmar(db)
+        invalidar_tras_escritura(db, CACHE_SERVICIOS)
         return True
@@ -0,0 +1,108 @@
+from datetime import date, timedelta
+
+from sqlalchemy import delete, func, select
+from sqlalchemy.orm import Session
+from sqlalchemy.dialects.postgresql import UUID
+from entities.tarifa_diaria import Tarifa_Diaria
+from crud.insercion import INSERT_POR_DIALECTO
+from crud.unidad_trabajo import confirmar, lote
+
+
+def _validar_periodo(desde: date, hasta: date) -> None:
+    if desde >= hasta:
+        raise ValueError("La fecha inicial debe ser anterior a la final")
+
+
+def sentencia_fijar(db: Session, filas: list):
+    """`INSERT ... ON CONFLICT (id_tipo, fecha) DO UPDATE SET precio = excluded.precio`."""
+    insertar = INSERT_POR_DIALECTO[db.get_bind().dialect.name]
+    sentencia = insertar(Tarifa_Diaria).values(filas)
+    return sentencia.on_conflict_do_update(
+        index_elements=[Tarifa_Diaria.id_tipo, Tarifa_Diaria.fecha],
+        set_={"precio": sentencia.excluded.precio},
+    )
+
+
+def sentencia_tarifas_estancia(id_tipo: UUID, fecha_entrada: date, fecha_salida: date):
+    """Suma de las tarifas de la estancia y número de noches que tienen tarifa."""
+    return select(func.coalesce(func.sum(Tarifa_Diaria.precio), 0.0), func.count()).where(
+        Tarifa_Diaria.id_tipo == id_tipo,
+        Tarifa_Diaria.fecha >= fecha_entrada,
+        Tarifa_Diaria.fecha < fecha_salida,
+    )
+
+
+class TarifaCRUD:
+    """
+    Módulo CRUD del calendario de tarifas (tabla tarifa_diaria): el precio por
+    noche de cada tipo de habitación en cada fecha, para temporadas altas,
+    fines de semana o eventos.
+
+    Funciones principales:
+        - lote() -> ContextManager  (unidad de trabajo con un único commit)
+        - fijar_tarifas(db: Session, id_tipo: UUID, desde: date, hasta: date, precio: float, dias_semana=None) -> int
+        - eliminar_tarifas(db: Session, id_tipo: UUID, desde: date, hasta: date) -> int
+        - obtener_tarifas(db: Session, id_tipo: UUID, desde: date, hasta: date) -> List[Tarifa_Diaria]
+        - cotizar_estancia(db: Session, id_tipo: UUID, precio_base: float, fecha_entrada: date, fecha_salida: date) -> float
+
+    Notas:
+        - Las noches sin tarifa se cobran a `precio_base` (el precio de la habitación),
+          así que sin tarifas cargadas el total es precio x noches, como antes.
+        - cotizar_estancia es una sola consulta SUM. Para cotizar muchas estancias a la
+          vez (p. ej. el resultado de una búsqueda de disponibilidad) se usa
+          CalendarioTarifas (crud/calendario_tarifas.py).
+        - fijar_tarifas reemplaza las tarifas existentes de esas fechas con un upsert.
+    """
+    def __init__(self, db):
+        self.db = db
+
+    def lote(self):
+        return lote(self.db)
+
+    @staticmethod
+    def fijar_tarifas(db: Session, id_tipo: UUID, desde: date, hasta: date, precio: float, dias_semana=None) -> int:
+        """
+        Fija `precio` en las noches de [desde, hasta); con `dias_semana` (0 = lunes
+        ... 6 = domingo) solo en esos días. Devuelve las noches fijadas.
+        """
+        _validar_periodo(desde, hasta)
+        if precio is None or precio <= 0:
+            raise ValueError("El precio debe ser mayor a cero")
+        dias_semana = set(range(7)) if dias_semana is None else set(dias_semana)
+        if not dias_semana <= set(range(7)):
+            raise ValueError("Los días de la semana van de 0 (lunes) a 6 (domingo)")
+        filas = [
+            {"id_tipo": id_tipo, "fecha": fecha, "precio": precio}
+            for fecha in (desde + timedelta(days=i) for i in range((hasta - desde).days))
+            if fecha.weekday() in dias_semana
+        ]
+        if filas:
+            db.execute(sentencia_fijar(db, filas))
+        confirmar(db)
+        return len(filas)
+
+    @staticmethod
+    def eliminar_tarifas(db: Session, id_tipo: UUID, desde: date, hasta: date) -> int:
+        _validar_periodo(desde, hasta)
+        resultado = db.execute(
+            delete(Tarifa_Diaria).where(
+                Tarifa_Diaria.id_tipo == id_tipo, Tarifa_Diaria.fecha >= desde, Tarifa_Diaria.fecha < hasta
+            )
+        )
+        confirmar(db)
+        return resultado.rowcount
+
+    @staticmethod
+    def obtener_tarifas(db: Session, id_tipo: UUID, desde: date, hasta: date):
+        return db.execute(
+            select(Tarifa_Diaria)
+            .where(Tarifa_Diaria.id_tipo == id_tipo, Tarifa_Diaria.fecha >= desde, Tarifa_Diaria.fecha < hasta)
+            .order_by(Tarifa_Diaria.fecha)
+        ).scalars().all()
+
+    @staticmethod
+    def cotizar_estancia(db: Session, id_tipo: UUID, precio_base: float, fecha_entrada: date, fecha_salida: date) -> float:
+        """Total de la estancia: tarifas del calendario más `precio_base` por cada noche sin tarifa."""
+        _validar_periodo(fecha_entrada, fecha_salida)
+        suma, con_tarifa = db.execute(sentencia_tarifas_estancia(id_tipo, fecha_entrada, fecha_salida)).one()
+        return suma + precio_base * ((fecha_salida - fecha_entrada).days - con_tarifa)
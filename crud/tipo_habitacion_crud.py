@@ -1,6 +1,16 @@
+from sqlalchemy import select
 from sqlalchemy.orm import Session
 from sqlalchemy.dialects.postgresql import UUID
 from entities.tipo_habitacion import Tipo_Habitacion
+from crud.cache_referencia import TipoHabitacionRef, cache_referencia, invalidar_tras_escritura
+from crud.insercion import insertar_si_no_existe
+from crud.paginacion import paginar
+from crud.unidad_trabajo import confirmar, lote
+
+# Clave estable para la paginación por clave (keyset)
+CLAVE_TIPO = (Tipo_Habitacion.nombre_tipo, Tipo_Habitacion.id_tipo)
+# Entrada de la caché de referencia con el catálogo de tipos
+CACHE_TIPOS = "tipos_habitacion"
 
 class TipoHabitacionCRUD:
     """
@@ -10,29 +20,34 @@ class TipoHabitacionCRUD:
     (sencilla, doble, suite, etc.).
 
     Funciones principales:
+        - lote() -> ContextManager  (unidad de trabajo con un único commit)
         - crear_tipo_habitacion(db: Session, tipo: Tipo_Habitacion) -> Tipo_Habitacion
         - obtener_tipo_habitacion(db: Session, id_tipo: UUID) -> Tipo_Habitacion
-        - obtener_tipos_habitacion(db: Session) -> List[Tipo_Habitacion]
+        - obtener_tipos_habitacion(db: Session, despues_de: tuple = None, limite: int = None) -> List[Tipo_Habitacion]
+        - obtener_tipos_referencia(db: Session) -> List[TipoHabitacionRef]
         - eliminar_tipo_habitacion(db: Session, id_tipo: UUID) -> bool
 
     Notas:
         - Se valida que no se repitan tipos de habitación con el mismo nombre.
+        - obtener_tipos_referencia usa la caché de referencia; toda escritura la invalida.
     """
     def __init__(self, db):
         self.db = db
+
+    def lote(self):
+        return lote(self.db)
+
     @staticmethod
     def crear_tipo_habitacion(db: Session, tipo: Tipo_Habitacion):
-        if not tipo.nombre or not tipo.nombre.strip():
+        if not tipo.nombre_tipo or not tipo.nombre_tipo.strip():
             raise ValueError("El nombre del tipo de habitación no puede estar vacío")
-        
-        existente = db.query(Tipo_Habitacion).filter(Tipo_Habitacion.nombre == tipo.nombre).first()
-        if existente:
-            raise ValueError("El tipo de habitación ya existe")
 
-        db.add(tipo)
-        db.commit()
-        db.refresh(tipo)
-        return tipo
+        creado = insertar_si_no_existe(db, tipo, Tipo_Habitacion.nombre_tipo)
+        if not creado:
+            raise ValueError("El tipo de habitación ya existe")
+        confirmar(db)
+        invalidar_tras_escritura(db, CACHE_TIPOS)
+        return creado
 
     @staticmethod
     def obtener_tipo_habitacion(db: Session, id_tipo: UUID):
@@ -42,8 +57,17 @@ class TipoHabitacionCRUD:
         return tipo
 
     @staticmethod
-    def obtener_tipos_habitacion(db: Session):
-        return db.query(Tipo_Habitacion).all()
+    def obtener_tipos_habitacion(db: Session, despues_de: tuple = None, limite: int = None):
+        return paginar(db, select(Tipo_Habitacion), CLAVE_TIPO, despues_de, limite)
+
+    @staticmethod
+    def obtener_tipos_referencia(db: Session):
+        def cargar():
+            return tuple(
+                TipoHabitacionRef(t.id_tipo, t.nombre_tipo, t.descripcion)
+                for t in TipoHabitacionCRUD.obtener_tipos_habitacion(db)
+            )
+        return cache_referencia.obtener(CACHE_TIPOS, cargar)
 
     @staticmethod
     def eliminar_tipo_habitacion(db: Session, id_tipo: UUID) -> bool:
@@ -51,5 +75,6 @@ class TipoHabitacionCRUD:
         if not tipo:
             raise ValueError("Tipo de habitación no encontrado")
         db.delete(tipo)
-        db.commit()
+        confirmar(db)
+        invalidar_tras_escritura(db, CACHE_TIPOS)
         return True
@@ -0,0 +1,51 @@
+from contextlib import contextmanager
+
+from sqlalchemy.orm import Session
+
+_CLAVE_LOTE = "lote"
+
+
+def en_lote(db: Session) -> bool:
+    return bool(db.info.get(_CLAVE_LOTE))
+
+
+@contextmanager
+def lote(db: Session):
+    """
+    Unidad de trabajo: dentro del bloque los métodos CRUD no confirman; todas las
+    operaciones se envían y confirman en un único commit al salir del bloque, o se
+    deshacen juntas si ocurre una excepción. Los bloques anidados se integran en
+    el exterior.
+
+    Ejemplo:
+        with habitacion_crud.lote():
+            for habitacion in nuevas:
+                habitacion_crud.crear_habitacion(db, habitacion)
+    """
+    if en_lote(db):
+        yield db
+        return
+    db.info[_CLAVE_LOTE] = True
+    try:
+        yield db
+        db.commit()
+    except Exception:
+        db.rollback()
+        raise
+    finally:
+        db.info.pop(_CLAVE_LOTE, None)
+
+
+def confirmar(db: Session, *objetos, refrescar: bool = False) -> None:
+    """
+    Confirma la transacción, salvo dentro de un lote, donde el commit se hace al
+    cerrar el bloque. Con `refrescar=True` se envían los cambios y se recargan los
+    objetos para leer los valores generados por el servidor (p. ej. fecha_creacion);
+    por defecto no se hace ese SELECT adicional.
+    """
+    if not en_lote(db):
+        db.commit()
+    if refrescar:
+        db.flush()
+        for objeto in objetos:
+            db.refresh(objeto)
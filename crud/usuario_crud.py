@@ -1,6 +1,53 @@
+from dataclasses import dataclass
+from typing import Optional
+from uuid import UUID as UUIDPy
+
+from sqlalchemy import select
 from sqlalchemy.orm import Session
 from entities.usuario import Usuario
 from sqlalchemy.dialects.postgresql import UUID
+from crud.paginacion import TAMANO_LOTE_STREAMING, iterar, paginar
+from crud.actualizacion import actualizar_por_id, valores_actualizables
+from crud.insercion import insertar_si_no_existe
+from crud.masivo import duplicados, filas_de, insertar_filas, valores_existentes
+from crud.unidad_trabajo import confirmar, lote
+
+# Clave estable para la paginación por clave (keyset)
+CLAVE_USUARIO = Usuario.nombre_usuario
+
+
+def _normalizar_nombre_usuario(nombre_usuario: str) -> str:
+    nombre_usuario = nombre_usuario.strip()
+    if len(nombre_usuario) > 50:
+        raise ValueError("El nombre de usuario no puede exceder 50 caracteres")
+    return nombre_usuario
+
+
+@dataclass(frozen=True)
+class UsuarioSesion:
+    """
+    Copia inmutable del usuario autenticado. No depende de ninguna sesión, así que
+    no se expira tras un commit ni vuelve a consultar la base de datos al leerla.
+    """
+    id_usuario: UUIDPy
+    nombre: str
+    apellidos: str
+    telefono: Optional[str]
+    tipo_usuario: str
+    nombre_usuario: str
+
+    @classmethod
+    def desde_usuario(cls, usuario: Usuario) -> "UsuarioSesion":
+        return cls(
+            id_usuario=usuario.id_usuario,
+            nombre=usuario.nombre,
+            apellidos=usuario.apellidos,
+            telefono=usuario.telefono,
+            tipo_usuario=usuario.tipo_usuario,
+            nombre_usuario=usuario.nombre_usuario,
+        )
+
+
 class UsuarioCRUD:
     """
     Módulo CRUD para la entidad Usuario.
@@ -9,32 +56,62 @@ class UsuarioCRUD:
     de los usuarios que acceden al sistema.
 
     Funciones principales:
+        - lote() -> ContextManager  (unidad de trabajo con un único commit)
         - crear_usuario(db: Session, nuevo_usuario: Usuario) -> Usuario
+        - bulk_crear_usuarios(db: Session, usuarios: List[Usuario]) -> int
         - obtener_usuario(db: Session, id_usuario: UUID) -> Usuario
         - obtener_usuario_por_nombre(db: Session, nombre_usuario: str) -> Usuario
-        - obtener_usuarios(db: Session, skip: int = 0, limit: int = 100) -> List[Usuario]
-        - actualizar_usuario(db: Session, id_usuario: UUID, id_usuario_edita: UUID, **kwargs) -> Usuario
+        - obtener_usuarios(db: Session, despues_de: str = None, limite: int = 100) -> List[Usuario]
+        - iterar_usuarios(db: Session, tamano_lote: int = 1000) -> Iterator[Usuario]
+        - actualizar_usuario(db: Session, id_usuario: UUID, id_usuario_edita: UUID = None, **kwargs) -> Usuario
         - eliminar_usuario(db: Session, id_usuario: UUID) -> bool
         - autenticar_usuario(self, nombre_usuario: str, contrasena: str) -> Optional[Usuario]
 
     Notas:
         - Valida que el nombre de usuario sea único y no exceda 50 caracteres.
         - La contraseña no debe exceder 10 caracteres.
+        - La tabla usuario no tiene columna id_usuario_edita: actualizar_usuario
+          acepta el parámetro por compatibilidad pero no lo guarda.
+        - Los listados se paginan por nombre de usuario: `despues_de` es el
+          nombre de usuario de la última fila de la página anterior.
+        - `UsuarioSesion.desde_usuario` toma una copia desligada de la sesión del
+          usuario autenticado para guardarla mientras dure su sesión de trabajo.
     """
     def __init__(self, db):
         self.db = db
+
+    def lote(self):
+        return lote(self.db)
+
     @staticmethod
     def crear_usuario(db: Session, nuevo_usuario: Usuario):
-        existente = (
-            db.query(Usuario).filter(Usuario.nombre_usuario == nuevo_usuario.nombre_usuario).first()
-        )
-        if existente:
-            raise ValueError(f"El nombre de usuario '{Usuario.nombre_usuario}' ya está en uso.")
+        creado = insertar_si_no_existe(db, nuevo_usuario, Usuario.nombre_usuario)
+        if not creado:
+            raise ValueError(f"El nombre de usuario '{nuevo_usuario.nombre_usuario}' ya está en uso.")
+        confirmar(db)
+        return creado
 
-        db.add(nuevo_usuario)
-        db.commit()
-        db.refresh(nuevo_usuario)
-        return nuevo_usuario
+    @staticmethod
+    def bulk_crear_usuarios(db: Session, usuarios):
+        """
+        Crea muchos usuarios con una sola consulta de unicidad y una inserción
+        por lotes (COPY en PostgreSQL para lotes muy grandes). Valida el lote
+        completo antes de insertar: si un usuario no es válido no se inserta ninguno.
+        """
+        for usuario in usuarios:
+            if not usuario.nombre_usuario or not usuario.nombre_usuario.strip():
+                raise ValueError("El nombre de usuario no puede estar vacío")
+            usuario.nombre_usuario = _normalizar_nombre_usuario(usuario.nombre_usuario)
+            if not usuario.clave or len(usuario.clave) > 10:
+                raise ValueError(f"La clave de '{usuario.nombre_usuario}' debe tener entre 1 y 10 caracteres")
+        nombres = [u.nombre_usuario for u in usuarios]
+        repetidos = duplicados(nombres) | valores_existentes(db, Usuario.nombre_usuario, nombres)
+        if repetidos:
+            raise ValueError(f"Los nombres de usuario ya están en uso: {sorted(repetidos)[:10]}")
+
+        insertados = insertar_filas(db, Usuario, filas_de(Usuario, usuarios))
+        confirmar(db)
+        return insertados
 
     @staticmethod
     def obtener_usuario(db: Session, id_usuario: UUID):
@@ -45,34 +122,33 @@ class UsuarioCRUD:
         return db.query(Usuario).filter(Usuario.nombre_usuario == nombre_usuario.strip()).first()
 
     @staticmethod
-    def obtener_usuarios(db: Session, skip: int = 0, limit: int = 100):
-        return db.query(Usuario).offset(skip).limit(limit).all()
+    def obtener_usuarios(db: Session, despues_de: str = None, limite: int = 100):
+        return paginar(db, select(Usuario), CLAVE_USUARIO, despues_de, limite)
+
+    @staticmethod
+    def iterar_usuarios(db: Session, tamano_lote: int = TAMANO_LOTE_STREAMING):
+        return iterar(db, select(Usuario), CLAVE_USUARIO, tamano_lote)
 
     @staticmethod
     def actualizar_usuario(db: Session, id_usuario: UUID, id_usuario_edita: UUID = None, **kwargs):
-        usuario = db.query(Usuario).filter(Usuario.id_usuario == id_usuario).first()
-        if not usuario:
-            return None
+        valores = valores_actualizables(Usuario, kwargs)
+        if not valores:
+            return UsuarioCRUD.obtener_usuario(db, id_usuario)
 
-        if "nombre_usuario" in kwargs:
-            nuevo_nombre = kwargs["nombre_usuario"].strip()
-            if len(nuevo_nombre) > 50:
-                raise ValueError("El nombre de usuario no puede exceder 50 caracteres")
+        if "nombre_usuario" in valores:
+            nuevo_nombre = _normalizar_nombre_usuario(valores["nombre_usuario"])
             existente = db.query(Usuario).filter(Usuario.nombre_usuario == nuevo_nombre).first()
             if existente and existente.id_usuario != id_usuario:
                 raise ValueError("Ya existe un usuario con ese nombre")
-            kwargs["nombre_usuario"] = nuevo_nombre
+            valores["nombre_usuario"] = nuevo_nombre
 
-        if "clave" in kwargs and len(kwargs["clave"]) > 10:
-            raise ValueError(status_code=400, detail="La clave no puede exceder 10 caracteres")
+        if "clave" in valores and len(valores["clave"]) > 10:
+            raise ValueError("La clave no puede exceder 10 caracteres")
 
-        usuario.id_usuario_edita = id_usuario_edita
-        for key, value in kwargs.items():
-            if hasattr(usuario, key):
-                setattr(usuario, key, value)
-
-        db.commit()
-        db.refresh(usuario)
+        usuario = actualizar_por_id(db, Usuario, Usuario.id_usuario, id_usuario, valores)
+        if not usuario:
+            return None
+        confirmar(db)
         return usuario
 
     @staticmethod
@@ -80,7 +156,7 @@ class UsuarioCRUD:
         usuario = db.query(Usuario).filter(Usuario.id_usuario == id_usuario).first()
         if usuario:
             db.delete(usuario)
-            db.commit()
+            confirmar(db)
             return True
         return False
 
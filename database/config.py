@@ -3,12 +3,17 @@ Configuración de la base de datos PostgreSQL con Neon
 """
 
 import os
+import threading
 
 from dotenv import load_dotenv
-from sqlalchemy import create_engine
+from sqlalchemy import create_engine, event
+from sqlalchemy.engine import make_url
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
 
+from database.instrumentacion import instrumentacion
+from database.pool import AsyncQueuePoolMedido, EstadisticasPool, QueuePoolMedido
+
 # Cargar variables de entorno
 load_dotenv()
 
@@ -33,17 +38,193 @@ if not DATABASE_URL:
             "Se requiere DATABASE_URL o las credenciales individuales de la base de datos"
         )
 
+# Perfiles de motor: valores por defecto según el tipo de proceso
+PERFILES_MOTOR = {
+    # Terminal de recepción: pocas conexiones, consultas cortas
+    "interactive": {
+        "pool_size": 2,
+        "max_overflow": 3,
+        "pool_timeout": 10,
+        "pool_recycle": 300,
+        "statement_timeout_ms": 15000,
+        "echo": False,
+        "isolation_level": "READ COMMITTED",
+    },
+    # Cargas masivas y tareas nocturnas: una conexión, sin límite de duración
+    "batch": {
+        "pool_size": 1,
+        "max_overflow": 1,
+        "pool_timeout": 60,
+        "pool_recycle": 1800,
+        "statement_timeout_ms": 0,
+        "echo": False,
+        "isolation_level": "READ COMMITTED",
+    },
+    # Servicio con muchas peticiones concurrentes
+    "server": {
+        "pool_size": 20,
+        "max_overflow": 30,
+        "pool_timeout": 5,
+        "pool_recycle": 300,
+        "statement_timeout_ms": 5000,
+        "echo": False,
+        "isolation_level": "READ COMMITTED",
+    },
+}
+
+def leer_booleano(valor: str) -> bool:
+    return valor.strip().lower() in ("1", "true", "si", "sí", "yes")
+
+
+# Variables de entorno que sobrescriben cada opción del perfil
+VARIABLES_PERFIL = {
+    "pool_size": ("DB_POOL_SIZE", int),
+    "max_overflow": ("DB_MAX_OVERFLOW", int),
+    "pool_timeout": ("DB_POOL_TIMEOUT", float),
+    "pool_recycle": ("DB_POOL_RECYCLE", int),
+    "statement_timeout_ms": ("DB_STATEMENT_TIMEOUT_MS", int),
+    "echo": ("DB_ECHO", leer_booleano),
+    "isolation_level": ("DB_ISOLATION_LEVEL", lambda valor: valor.strip().upper()),
+}
+
+
+def cargar_perfil_motor(nombre: str = None) -> dict:
+    """
+    Obtener la configuración del perfil indicado (o de DB_PERFIL, por defecto
+    "interactive") aplicando las variables de entorno que la sobrescriben.
+    """
+    nombre = (nombre or os.getenv("DB_PERFIL", "interactive")).strip().lower()
+    if nombre not in PERFILES_MOTOR:
+        raise ValueError(
+            f"Perfil de motor desconocido '{nombre}'. Opciones: {', '.join(PERFILES_MOTOR)}"
+        )
+    perfil = dict(PERFILES_MOTOR[nombre], nombre=nombre)
+    for opcion, (variable, convertir) in VARIABLES_PERFIL.items():
+        valor = os.getenv(variable)
+        if valor not in (None, ""):
+            perfil[opcion] = convertir(valor)
+    return perfil
+
+
+def aplicar_statement_timeout(motor, statement_timeout_ms: int) -> None:
+    """
+    Fijar statement_timeout en cada conexión nueva de PostgreSQL.
+    Se usa SET en lugar de opciones de arranque porque el pooler de Neon no las acepta.
+    """
+    if not statement_timeout_ms or motor.dialect.name != "postgresql":
+        return
+
+    @event.listens_for(motor, "connect")
+    def _fijar_statement_timeout(dbapi_connection, connection_record):
+        cursor = dbapi_connection.cursor()
+        cursor.execute(f"SET statement_timeout = {int(statement_timeout_ms)}")
+        cursor.close()
+        dbapi_connection.commit()
+
+
+PERFIL_MOTOR = cargar_perfil_motor()
+
+
+def opciones_motor(perfil: dict, poolclass) -> dict:
+    """
+    Argumentos de create_engine/create_async_engine para un perfil
+    """
+    opciones = {
+        "echo": perfil["echo"],  # Mostrar las consultas SQL en consola (desactivado por defecto)
+        "pool_pre_ping": True,  # Verificar conexión antes de usar
+        "pool_recycle": perfil["pool_recycle"],
+    }
+    # SQLite (usado como sustituto local) no admite estos niveles de aislamiento ni tamaños de pool
+    if make_url(DATABASE_URL).get_backend_name() != "sqlite":
+        opciones.update(
+            poolclass=poolclass,
+            pool_size=perfil["pool_size"],
+            max_overflow=perfil["max_overflow"],
+            pool_timeout=perfil["pool_timeout"],
+            isolation_level=perfil["isolation_level"],
+        )
+    return opciones
+
+
 # Crear el motor de SQLAlchemy
-engine = create_engine(
-    DATABASE_URL,
-    echo=True,  # Mostrar las consultas SQL en consola
-    pool_pre_ping=True,  # Verificar conexión antes de usar
-    pool_recycle=300,  # Reciclar conexiones cada 5 minutos
-)
+engine = create_engine(DATABASE_URL, **opciones_motor(PERFIL_MOTOR, QueuePoolMedido))
+engine.pool.estadisticas = EstadisticasPool(float(os.getenv("DB_POOL_ESPERA_ALERTA_MS", "100")))
+aplicar_statement_timeout(engine, PERFIL_MOTOR["statement_timeout_ms"])
 
 # Crear la sesión
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
+# Drivers asíncronos equivalentes a cada motor
+DRIVERS_ASINCRONOS = {
+    "postgresql": "postgresql+asyncpg",
+    "sqlite": "sqlite+aiosqlite",
+}
+
+
+def construir_url_asincrona(url: str):
+    """
+    Convertir la URL síncrona en una URL para el driver asíncrono.
+    asyncpg no acepta `sslmode` ni `channel_binding` en la URL (Neon los incluye),
+    así que el modo SSL se traslada a los argumentos de conexión.
+
+    Returns:
+        Tupla (url, connect_args)
+    """
+    url_asincrona = make_url(url)
+    backend = url_asincrona.get_backend_name()
+    url_asincrona = url_asincrona.set(drivername=DRIVERS_ASINCRONOS.get(backend, url_asincrona.drivername))
+    connect_args = {}
+    if backend == "postgresql":
+        query = dict(url_asincrona.query)
+        sslmode = query.pop("sslmode", None)
+        query.pop("channel_binding", None)
+        url_asincrona = url_asincrona.set(query=query)
+        if sslmode:
+            connect_args["ssl"] = sslmode
+    return url_asincrona, connect_args
+
+
+# El motor asíncrono se crea la primera vez que se pide: los programas síncronos
+# (main.py, hotel.py, benchmarks) no importan ni configuran asyncpg/aiosqlite.
+_lock_asincrono = threading.Lock()
+_motor_asincrono = None
+_sesiones_asincronas = None
+
+
+def motor_asincrono():
+    """
+    Motor asíncrono para atender muchas peticiones concurrentes sin un hilo por
+    conexión, con el mismo perfil que el síncrono. Se crea una sola vez.
+    """
+    global _motor_asincrono, _sesiones_asincronas
+    with _lock_asincrono:
+        if _motor_asincrono is None:
+            from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+
+            url, connect_args = construir_url_asincrona(DATABASE_URL)
+            motor = create_async_engine(
+                url, connect_args=connect_args, **opciones_motor(PERFIL_MOTOR, AsyncQueuePoolMedido)
+            )
+            motor.sync_engine.pool.estadisticas = EstadisticasPool(float(os.getenv("DB_POOL_ESPERA_ALERTA_MS", "100")))
+            aplicar_statement_timeout(motor.sync_engine, PERFIL_MOTOR["statement_timeout_ms"])
+            if leer_booleano(os.getenv("DB_INSTRUMENTAR", "")):
+                instrumentacion.instalar(motor.sync_engine)
+            # expire_on_commit=False evita recargas implícitas (E/S) al acceder a atributos tras el commit
+            _sesiones_asincronas = async_sessionmaker(motor, class_=AsyncSession, autoflush=False, expire_on_commit=False)
+            _motor_asincrono = motor
+        return _motor_asincrono
+
+
+def sesiones_asincronas():
+    """Fábrica de AsyncSession sobre motor_asincrono()."""
+    motor_asincrono()
+    return _sesiones_asincronas
+
+
+# Instrumentación de SQL opcional: latencia, huellas y detección de N+1
+if leer_booleano(os.getenv("DB_INSTRUMENTAR", "")):
+    instrumentacion.instalar(engine)
+
 # Base para los modelos
 Base = declarative_base()
 
@@ -59,6 +240,31 @@ def get_db():
         db.close()
 
 
+async def get_async_db():
+    """
+    Generador asíncrono de sesiones de base de datos
+    """
+    async with sesiones_asincronas()() as db:
+        yield db
+
+
+def estadisticas_pool() -> dict:
+    """
+    Tiempos de espera al obtener conexiones y estado actual de los pools
+    (el asíncrono solo si ya se creó)
+    """
+    estadisticas = {
+        "perfil": PERFIL_MOTOR["nombre"],
+        "sincrono": dict(engine.pool.estadisticas.resumen(), estado=engine.pool.status()),
+    }
+    if _motor_asincrono is not None:
+        estadisticas["asincrono"] = dict(
+            _motor_asincrono.sync_engine.pool.estadisticas.resumen(),
+            estado=_motor_asincrono.sync_engine.pool.status(),
+        )
+    return estadisticas
+
+
 def create_tables():
     """
     Crear todas las tablas definidas en los modelos
@@ -0,0 +1,117 @@
+"""
+Verificación rápida del esquema al arrancar: compara la revisión head de
+Alembic (leída de migrations/versions) con la de la tabla `alembic_version`
+de la base de datos en una sola consulta, sin DDL.
+
+El resultado correcto se guarda en un archivo local durante
+ESQUEMA_CACHE_TTL segundos (86400 por defecto), de modo que los arranques
+siguientes no hacen ningún viaje a la base de datos antes del login. El
+archivo se indica con ESQUEMA_CACHE_ARCHIVO (por defecto `.esquema_cache.json`
+en la raíz del proyecto). El esquema se crea y actualiza con `alembic upgrade head`.
+"""
+
+import hashlib
+import json
+import os
+import re
+import time
+from pathlib import Path
+
+from sqlalchemy import text
+from sqlalchemy.engine import make_url
+from sqlalchemy.exc import DBAPIError
+
+RAIZ_PROYECTO = Path(__file__).resolve().parent.parent
+DIRECTORIO_MIGRACIONES = RAIZ_PROYECTO / "migrations" / "versions"
+ARCHIVO_CACHE = Path(os.getenv("ESQUEMA_CACHE_ARCHIVO", RAIZ_PROYECTO / ".esquema_cache.json"))
+TTL_CACHE = float(os.getenv("ESQUEMA_CACHE_TTL", "86400"))
+
+
+class EsquemaDesactualizado(ValueError):
+    """La base de datos no está en la revisión head de las migraciones."""
+
+
+def revision_head(directorio: Path = DIRECTORIO_MIGRACIONES) -> str:
+    """Revisión head de Alembic: la única que ninguna otra revisión tiene como anterior."""
+    revisiones, anteriores = set(), set()
+    for archivo in directorio.glob("*.py"):
+        contenido = archivo.read_text(encoding="utf-8")
+        revision = re.search(r"^revision\s*=\s*['\"](\w+)['\"]", contenido, re.M)
+        anterior = re.search(r"^down_revision\s*=\s*['\"](\w+)['\"]", contenido, re.M)
+        if revision:
+            revisiones.add(revision.group(1))
+        if anterior:
+            anteriores.add(anterior.group(1))
+    heads = revisiones - anteriores
+    if len(heads) != 1:
+        raise ValueError(f"Se esperaba una única revisión head y hay {len(heads)}: {sorted(heads)}")
+    return heads.pop()
+
+
+def revision_base_datos(motor) -> str:
+    """Revisión registrada en `alembic_version`, con una sola consulta."""
+    try:
+        with motor.connect() as conexion:
+            return conexion.execute(text("SELECT version_num FROM alembic_version")).scalar()
+    except DBAPIError as e:
+        if e.connection_invalidated or "alembic_version" not in str(e.orig):
+            raise
+        raise EsquemaDesactualizado(
+            "La base de datos no tiene la tabla alembic_version. Ejecute `alembic upgrade head`."
+        ) from None
+
+
+def _clave_motor(motor) -> str:
+    # La contraseña no forma parte de la clave ni llega al archivo
+    url = make_url(str(motor.url)).render_as_string(hide_password=True)
+    return hashlib.sha256(url.encode("utf-8")).hexdigest()[:16]
+
+
+def _leer_cache(archivo: Path) -> dict:
+    try:
+        return json.loads(archivo.read_text(encoding="utf-8"))
+    except (OSError, ValueError):
+        return {}
+
+
+def _guardar_cache(archivo: Path, cache: dict) -> None:
+    try:
+        temporal = archivo.with_suffix(".tmp")
+        temporal.write_text(json.dumps(cache, indent=2), encoding="utf-8")
+        temporal.replace(archivo)
+    except OSError:
+        # Sin caché el arranque sigue funcionando; solo hace la consulta cada vez
+        pass
+
+
+def verificar_esquema(motor, archivo: Path = ARCHIVO_CACHE, ttl: float = TTL_CACHE) -> bool:
+    """
+    Comprueba que la base de datos está en la revisión head. Devuelve True si
+    el resultado salió de la caché local y False si se consultó la base de datos.
+
+    Raises:
+        EsquemaDesactualizado: Si la revisión de la base de datos no es la head.
+    """
+    head = revision_head()
+    clave = _clave_motor(motor)
+    cache = _leer_cache(archivo)
+    entrada = cache.get(clave)
+    if entrada and entrada.get("revision") == head and time.time() - entrada.get("verificado", 0) < ttl:
+        return True
+
+    actual = revision_base_datos(motor)
+    if actual != head:
+        raise EsquemaDesactualizado(
+            f"La base de datos está en la revisión {actual or 'vacía'} y las migraciones en {head}. "
+            "Ejecute `alembic upgrade head`."
+        )
+    cache[clave] = {"revision": head, "verificado": time.time()}
+    _guardar_cache(archivo, cache)
+    return False
+
+
+def invalidar_cache(archivo: Path = ARCHIVO_CACHE) -> None:
+    try:
+        archivo.unlink()
+    except FileNotFoundError:
+        pass
@@ -0,0 +1,325 @@
+"""
+Instrumentación de SQL: latencia, filas y huellas normalizadas por sentencia,
+con detección de consultas N+1 dentro de cada acción de SistemaGestion.
+
+Se activa con la variable de entorno DB_INSTRUMENTAR=1 (ver database/config.py)
+o llamando a `instrumentacion.instalar(engine)`.
+
+Para pruebas, `presupuesto_consultas` falla si un bloque supera un número de
+sentencias y `sin_carga_perezosa` hace que las relaciones no cargadas lancen
+una excepción en lugar de consultarse una por una.
+"""
+
+import functools
+import re
+import threading
+import time
+from collections import Counter
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from sqlalchemy import event
+from sqlalchemy.orm import Session, raiseload
+
+# Acción de SistemaGestion en curso (funciona con hilos y con asyncio)
+_accion_actual: ContextVar = ContextVar("accion_sql", default=None)
+
+_PATRONES_HUELLA = [
+    (re.compile(r"'(?:[^']|'')*'"), "?"),  # literales de texto
+    (re.compile(r"%\(\w+\)s|\$\d+|:\w+|\?"), "?"),  # parámetros de los distintos drivers
+    (re.compile(r"__\[POSTCOMPILE_\w+\]"), "?"),  # parámetros expandidos de IN
+    (re.compile(r"\b\d+(?:\.\d+)?\b"), "?"),  # números
+    (re.compile(r"\(\s*\?(?:\s*,\s*\?)+\s*\)"), "(?, ...)"),  # listas IN / VALUES
+    (re.compile(r"(?:\(\?, \.\.\.\)|\(\?\))(?:\s*,\s*(?:\(\?, \.\.\.\)|\(\?\)))+"), "(?, ...), ..."),  # VALUES múltiples
+    (re.compile(r"\s+"), " "),
+]
+
+
+def huella_sentencia(sentencia: str) -> str:
+    """
+    Normalizar una sentencia SQL quitando literales y parámetros, para que
+    todas las ejecuciones con la misma forma compartan huella.
+    """
+    for patron, reemplazo in _PATRONES_HUELLA:
+        sentencia = patron.sub(reemplazo, sentencia)
+    return sentencia.strip()
+
+
+def _abreviar(huella: str, ancho: int) -> str:
+    """Acorta la lista de columnas de los SELECT para que el reporte muestre FROM/WHERE."""
+    huella = re.sub(r"^SELECT .*? FROM ", "SELECT … FROM ", huella)
+    return huella if len(huella) <= ancho else huella[:ancho - 1] + "…"
+
+
+class _EstadisticaSentencia:
+    __slots__ = ("ejecuciones", "tiempo_total_ms", "tiempo_max_ms", "filas")
+
+    def __init__(self):
+        self.ejecuciones = 0
+        self.tiempo_total_ms = 0.0
+        self.tiempo_max_ms = 0.0
+        self.filas = 0
+
+
+class _RegistroAccion:
+    __slots__ = ("nombre", "huellas", "consultas", "tiempo_ms")
+
+    def __init__(self, nombre: str):
+        self.nombre = nombre
+        self.huellas = Counter()
+        self.consultas = 0
+        self.tiempo_ms = 0.0
+
+
+class InstrumentacionSQL:
+    """
+    Registra cada sentencia ejecutada por los motores instalados.
+
+    - Por huella: ejecuciones, latencia total y máxima, y filas afectadas/devueltas.
+    - Por acción (`accion()`): cuántas veces se repite cada huella; si una huella
+      se repite `umbral_n_mas_1` veces o más se marca como probable N+1.
+    """
+
+    def __init__(self, umbral_n_mas_1: int = 3):
+        self.umbral_n_mas_1 = umbral_n_mas_1
+        self._lock = threading.Lock()
+        self._motores = []
+        self._fuentes = {}
+        self.reiniciar()
+
+    @property
+    def activa(self) -> bool:
+        return bool(self._motores)
+
+    def reiniciar(self) -> None:
+        with self._lock:
+            self.sentencias = {}
+            self.acciones = Counter()
+            self.sospechas_n_mas_1 = {}
+
+    def registrar_fuente(self, nombre: str, estadisticas) -> None:
+        """
+        Agrega al reporte las estadísticas de otro componente (p. ej. una caché);
+        `estadisticas` es una función sin argumentos que devuelve un dict.
+        """
+        self._fuentes[nombre] = estadisticas
+
+    def instalar(self, motor) -> None:
+        if motor in self._motores:
+            return
+        event.listen(motor, "before_cursor_execute", self._antes_de_ejecutar)
+        event.listen(motor, "after_cursor_execute", self._despues_de_ejecutar)
+        event.listen(motor, "handle_error", self._tras_error)
+        self._motores.append(motor)
+
+    def desinstalar(self, motor) -> None:
+        if motor not in self._motores:
+            return
+        event.remove(motor, "before_cursor_execute", self._antes_de_ejecutar)
+        event.remove(motor, "after_cursor_execute", self._despues_de_ejecutar)
+        event.remove(motor, "handle_error", self._tras_error)
+        self._motores.remove(motor)
+
+    def _antes_de_ejecutar(self, conn, cursor, statement, parameters, context, executemany):
+        conn.info.setdefault("instrumentacion_inicio", []).append((context, time.perf_counter()))
+
+    def _tras_error(self, contexto) -> None:
+        """
+        Descarta el inicio de la sentencia que falló (IntegrityError, violaciones de
+        exclusión...): after_cursor_execute no se llama y, si quedara en la pila de
+        la conexión, las siguientes mediciones se emparejarían con el inicio equivocado.
+        """
+        if contexto.connection is None:
+            return
+        inicios = contexto.connection.info.get("instrumentacion_inicio")
+        if inicios and inicios[-1][0] is contexto.execution_context:
+            inicios.pop()
+
+    def _despues_de_ejecutar(self, conn, cursor, statement, parameters, context, executemany):
+        _, inicio = conn.info["instrumentacion_inicio"].pop()
+        duracion_ms = (time.perf_counter() - inicio) * 1000
+        filas = cursor.rowcount if cursor.rowcount and cursor.rowcount > 0 else 0
+        huella = huella_sentencia(statement)
+        with self._lock:
+            estadistica = self.sentencias.get(huella)
+            if estadistica is None:
+                estadistica = self.sentencias[huella] = _EstadisticaSentencia()
+            estadistica.ejecuciones += 1
+            estadistica.tiempo_total_ms += duracion_ms
+            estadistica.tiempo_max_ms = max(estadistica.tiempo_max_ms, duracion_ms)
+            estadistica.filas += filas
+        registro = _accion_actual.get()
+        if registro is not None:
+            registro.huellas[huella] += 1
+            registro.consultas += 1
+            registro.tiempo_ms += duracion_ms
+
+    @contextmanager
+    def accion(self, nombre: str):
+        """
+        Agrupa las sentencias ejecutadas dentro del bloque bajo una acción.
+        Las acciones anidadas se cuentan dentro de la acción exterior.
+        """
+        if _accion_actual.get() is not None:
+            yield _accion_actual.get()
+            return
+        registro = _RegistroAccion(nombre)
+        token = _accion_actual.set(registro)
+        try:
+            yield registro
+        finally:
+            _accion_actual.reset(token)
+            self._cerrar_accion(registro)
+
+    def _cerrar_accion(self, registro: _RegistroAccion) -> None:
+        with self._lock:
+            self.acciones[registro.nombre] += 1
+            for huella, repeticiones in registro.huellas.items():
+                if repeticiones >= self.umbral_n_mas_1:
+                    clave = (registro.nombre, huella)
+                    self.sospechas_n_mas_1[clave] = max(self.sospechas_n_mas_1.get(clave, 0), repeticiones)
+
+    def resumen(self) -> dict:
+        with self._lock:
+            sentencias = [
+                {
+                    "huella": huella,
+                    "ejecuciones": e.ejecuciones,
+                    "tiempo_total_ms": round(e.tiempo_total_ms, 3),
+                    "tiempo_medio_ms": round(e.tiempo_total_ms / e.ejecuciones, 3),
+                    "tiempo_max_ms": round(e.tiempo_max_ms, 3),
+                    "filas": e.filas,
+                }
+                for huella, e in self.sentencias.items()
+            ]
+            sospechas = [
+                {"accion": accion, "huella": huella, "repeticiones": repeticiones}
+                for (accion, huella), repeticiones in self.sospechas_n_mas_1.items()
+            ]
+            acciones = dict(self.acciones)
+        sentencias.sort(key=lambda s: s["tiempo_total_ms"], reverse=True)
+        sospechas.sort(key=lambda s: s["repeticiones"], reverse=True)
+        return {"sentencias": sentencias, "n_mas_1": sospechas, "acciones": acciones}
+
+    def reporte(self, limite: int = 15) -> str:
+        """
+        Reporte de texto con las sentencias más costosas y las sospechas de N+1.
+        """
+        datos = self.resumen()
+        total = sum(s["ejecuciones"] for s in datos["sentencias"])
+        tiempo = sum(s["tiempo_total_ms"] for s in datos["sentencias"])
+        lineas = [
+            "=" * 70,
+            "REPORTE DE SQL",
+            "=" * 70,
+            f"Sentencias: {total} | Formas distintas: {len(datos['sentencias'])} | Tiempo total: {tiempo:.1f} ms",
+            "",
+            f"Top {limite} por tiempo total:",
+        ]
+        for s in datos["sentencias"][:limite]:
+            lineas.append(
+                f"  {s['tiempo_total_ms']:>10.1f} ms | x{s['ejecuciones']:<6} | medio {s['tiempo_medio_ms']:.2f} ms"
+                f" | máx {s['tiempo_max_ms']:.2f} ms | filas {s['filas']}"
+            )
+            lineas.append(f"      {_abreviar(s['huella'], 160)}")
+        lineas.append("")
+        if datos["n_mas_1"]:
+            lineas.append("Posibles N+1 (misma forma repetida dentro de una acción):")
+            for s in datos["n_mas_1"]:
+                lineas.append(f"  {s['accion']}: x{s['repeticiones']} -> {_abreviar(s['huella'], 140)}")
+        else:
+            lineas.append("No se detectaron patrones N+1.")
+        for nombre, estadisticas in self._fuentes.items():
+            valores = " | ".join(f"{clave}: {valor}" for clave, valor in estadisticas().items())
+            lineas.extend(["", f"{nombre}: {valores}"])
+        return "\n".join(lineas)
+
+    def volcar_reporte(self, destino: str = None) -> None:
+        """
+        Imprime el reporte o lo agrega al archivo `destino`.
+        """
+        texto = self.reporte()
+        if destino:
+            with open(destino, "a", encoding="utf-8") as archivo:
+                archivo.write(texto + "\n")
+        else:
+            print(texto)
+
+
+instrumentacion = InstrumentacionSQL()
+
+
+class PresupuestoConsultasExcedido(AssertionError):
+    """Un bloque ejecutó más sentencias SQL que las declaradas en su presupuesto."""
+
+
+class ContadorConsultas:
+    """Cuenta las sentencias ejecutadas por un motor, agrupadas por huella."""
+
+    def __init__(self):
+        self.huellas = Counter()
+
+    @property
+    def total(self) -> int:
+        return sum(self.huellas.values())
+
+    def registrar(self, conn, cursor, statement, parameters, context, executemany):
+        self.huellas[huella_sentencia(statement)] += 1
+
+
+@contextmanager
+def presupuesto_consultas(maximo: int, motor=None, nombre: str = "bloque"):
+    """
+    Cuenta las sentencias SQL ejecutadas dentro del bloque y lanza
+    PresupuestoConsultasExcedido si superan `maximo`. Si el bloque lanza una
+    excepción, esa excepción se propaga sin comprobar el presupuesto.
+
+    Uso:
+        with presupuesto_consultas(2, nombre="cancelar_reserva"):
+            sistema.cancelar_reserva()
+    """
+    if motor is None:
+        from database.config import engine as motor
+    contador = ContadorConsultas()
+    event.listen(motor, "before_cursor_execute", contador.registrar)
+    try:
+        yield contador
+    finally:
+        event.remove(motor, "before_cursor_execute", contador.registrar)
+    if contador.total > maximo:
+        detalle = "\n".join(
+            f"  x{repeticiones} {_abreviar(huella, 140)}" for huella, repeticiones in contador.huellas.most_common()
+        )
+        raise PresupuestoConsultasExcedido(
+            f"{nombre}: {contador.total} sentencias SQL, presupuesto {maximo}\n{detalle}"
+        )
+
+
+def _agregar_raiseload(estado) -> None:
+    if estado.is_select and not estado.is_column_load and not estado.is_relationship_load:
+        estado.statement = estado.statement.options(raiseload("*"))
+
+
+@contextmanager
+def sin_carga_perezosa():
+    """
+    Dentro del bloque, las consultas ORM de todas las sesiones cargan sus
+    relaciones como `lazy="raise"`: acceder a una relación que no se cargó
+    explícitamente lanza una excepción en lugar de emitir un SELECT por fila.
+    """
+    event.listen(Session, "do_orm_execute", _agregar_raiseload)
+    try:
+        yield
+    finally:
+        event.remove(Session, "do_orm_execute", _agregar_raiseload)
+
+
+def accion_instrumentada(funcion):
+    """
+    Decorador que registra las sentencias del método como una acción con su nombre.
+    """
+    @functools.wraps(funcion)
+    def envoltura(*args, **kwargs):
+        with instrumentacion.accion(funcion.__name__):
+            return funcion(*args, **kwargs)
+    return envoltura
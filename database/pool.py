@@ -0,0 +1,125 @@
+"""
+Pools de conexiones que miden el tiempo de espera al obtener una conexión,
+separado del tiempo de abrir conexiones nuevas
+"""
+
+import logging
+import threading
+import time
+
+from sqlalchemy import exc
+from sqlalchemy.pool import AsyncAdaptedQueuePool, QueuePool
+
+logger = logging.getLogger(__name__)
+
+# Clave de `info` del registro de conexión con la duración de su apertura, hasta el checkout
+_CLAVE_CONEXION_MS = "pool_conexion_ms"
+
+
+class EstadisticasPool:
+    """
+    Acumula los tiempos de espera del checkout de conexiones de un pool.
+
+    Un checkout que espera más de `umbral_alerta_ms` se registra como advertencia,
+    lo que indica que el pool se queda corto para la concurrencia actual. Abrir
+    una conexión nueva no cuenta como espera: se acumula aparte, y un fallo al
+    conectar cuenta como error de conexión, no como timeout del pool.
+    """
+
+    def __init__(self, umbral_alerta_ms: float = 100.0):
+        self.umbral_alerta_ms = umbral_alerta_ms
+        self._lock = threading.Lock()
+        self.reiniciar()
+
+    def reiniciar(self) -> None:
+        with self._lock:
+            self.checkouts = 0
+            self.esperas_lentas = 0
+            self.timeouts = 0
+            self.espera_total_ms = 0.0
+            self.espera_max_ms = 0.0
+            self.conexiones_nuevas = 0
+            self.errores_conexion = 0
+            self.conexion_total_ms = 0.0
+
+    def registrar(self, espera_ms: float, timeout: bool = False) -> None:
+        with self._lock:
+            self.checkouts += 1
+            self.espera_total_ms += espera_ms
+            self.espera_max_ms = max(self.espera_max_ms, espera_ms)
+            if timeout:
+                self.timeouts += 1
+            if espera_ms >= self.umbral_alerta_ms:
+                self.esperas_lentas += 1
+        if espera_ms >= self.umbral_alerta_ms:
+            logger.warning("Espera de %.1f ms para obtener una conexión del pool", espera_ms)
+
+    def registrar_conexion(self, duracion_ms: float, error: bool = False) -> None:
+        with self._lock:
+            if error:
+                self.errores_conexion += 1
+            else:
+                self.conexiones_nuevas += 1
+                self.conexion_total_ms += duracion_ms
+
+    def resumen(self) -> dict:
+        with self._lock:
+            return {
+                "checkouts": self.checkouts,
+                "esperas_lentas": self.esperas_lentas,
+                "timeouts": self.timeouts,
+                "espera_total_ms": round(self.espera_total_ms, 3),
+                "espera_media_ms": round(self.espera_total_ms / self.checkouts, 3) if self.checkouts else 0.0,
+                "espera_max_ms": round(self.espera_max_ms, 3),
+                "conexiones_nuevas": self.conexiones_nuevas,
+                "errores_conexion": self.errores_conexion,
+                "conexion_media_ms": (
+                    round(self.conexion_total_ms / self.conexiones_nuevas, 3) if self.conexiones_nuevas else 0.0
+                ),
+            }
+
+
+class _MedicionCheckout:
+    """
+    Mezcla que cronometra `_do_get`, el punto donde el pool entrega una
+    conexión libre, abre una nueva o espera a que se libere una. La apertura
+    (`_create_connection`) se cronometra aparte y se descuenta de la espera.
+    """
+
+    estadisticas: EstadisticasPool = None
+
+    def _do_get(self):
+        inicio = time.perf_counter()
+        try:
+            registro = super()._do_get()
+        except exc.TimeoutError:
+            self.estadisticas.registrar((time.perf_counter() - inicio) * 1000, timeout=True)
+            raise
+        conexion_ms = registro.info.pop(_CLAVE_CONEXION_MS, 0.0)
+        self.estadisticas.registrar((time.perf_counter() - inicio) * 1000 - conexion_ms)
+        return registro
+
+    def _create_connection(self):
+        inicio = time.perf_counter()
+        try:
+            registro = super()._create_connection()
+        except Exception:
+            self.estadisticas.registrar_conexion((time.perf_counter() - inicio) * 1000, error=True)
+            raise
+        duracion_ms = (time.perf_counter() - inicio) * 1000
+        self.estadisticas.registrar_conexion(duracion_ms)
+        registro.info[_CLAVE_CONEXION_MS] = duracion_ms
+        return registro
+
+    def recreate(self):
+        nuevo = super().recreate()
+        nuevo.estadisticas = self.estadisticas
+        return nuevo
+
+
+class QueuePoolMedido(_MedicionCheckout, QueuePool):
+    """QueuePool que registra los tiempos de espera en `estadisticas`."""
+
+
+class AsyncQueuePoolMedido(_MedicionCheckout, AsyncAdaptedQueuePool):
+    """AsyncAdaptedQueuePool que registra los tiempos de espera en `estadisticas`."""
@@ -6,3 +6,5 @@ from .habitacion import Habitacion
 from .reserva import Reserva
 from .reserva_servicios import Reserva_Servicios
 from .servicios_adicionales import Servicios_Adicionales
+from .ocupacion_diaria import Ocupacion_Diaria
+from .tarifa_diaria import Tarifa_Diaria
@@ -0,0 +1,23 @@
+from sqlalchemy import UUID, Column, Date, Float, ForeignKey, Integer
+from database.config import Base
+
+class Ocupacion_Diaria(Base):
+    """
+    Resumen diario por tipo de habitación, mantenido por OcupacionCRUD.
+    Cada fila acumula las reservas vendidas (no canceladas) que ocupan la noche `fecha`:
+    habitaciones vendidas e ingresos por alojamiento prorrateados por noche; las
+    llegadas, las noches de esas estancias y los servicios se cuentan el día de entrada.
+    """
+    __tablename__ = 'ocupacion_diaria'
+
+    fecha = Column(Date, primary_key=True)
+    id_tipo = Column(UUID(as_uuid=True), ForeignKey('tipo_habitacion.id_tipo', ondelete='CASCADE'), primary_key=True)
+    habitaciones_vendidas = Column(Integer, nullable=False, default=0)
+    llegadas = Column(Integer, nullable=False, default=0)
+    noches = Column(Integer, nullable=False, default=0)
+    ingresos = Column(Float, nullable=False, default=0)
+    ingresos_servicios = Column(Float, nullable=False, default=0)
+
+    def __repr__(self):
+        return (f"<Ocupacion_Diaria(fecha={self.fecha}, id_tipo={self.id_tipo}, "
+            f"vendidas={self.habitaciones_vendidas}, ingresos={self.ingresos})>")
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, UUID, ForeignKey
+from sqlalchemy import Column, UUID, Float, ForeignKey
 from sqlalchemy.orm import relationship
 from database.config import Base
 
@@ -6,12 +6,15 @@ class Reserva_Servicios(Base):
     """
     Representa la tabla de asociación entre las entidades Reserva y Servicios_Adicionales.
     Esta clase define una relación de varios a varios entre reservas y servicios adicionales.
-    Cada instancia vincula una reserva (`id_reserva`) con un servicio adicional (`id_servicio`).
+    Cada instancia vincula una reserva (`id_reserva`) con un servicio adicional (`id_servicio`)
+    y guarda el precio del servicio al contratarlo, que es lo que se cobró aunque el
+    precio del catálogo cambie después.
     """
     __tablename__ = 'reserva_servicios'
 
     id_reserva = Column(UUID(as_uuid=True), ForeignKey('reserva.id_reserva'), primary_key=True)
     id_servicio = Column(UUID(as_uuid=True), ForeignKey('servicios_adicionales.id_servicio'), primary_key=True)
+    precio = Column(Float, nullable=False)
 
 
     reserva = relationship("Reserva", back_populates="servicios")
@@ -19,4 +22,4 @@ class Reserva_Servicios(Base):
     
 
     def __repr__(self):
-        return f"<Reserva_Servicios(id_reserva={self.id_reserva}, id_servicio={self.id_servicio})>"
+        return f"<Reserva_Servicios(id_reserva={self.id_reserva}, id_servicio={self.id_servicio}, precio={self.precio})>"
@@ -10,7 +10,7 @@ class Servicios_Adicionales(Base):
     __tablename__ = 'servicios_adicionales'
 
     id_servicio = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
-    nombre_servicio = Column(String, nullable=False)
+    nombre_servicio = Column(String, nullable=False, unique=True)
     precio = Column(Float, nullable=False)
     descripcion = Column(String, nullable=False)
     id_usuario_crea = Column(UUID(as_uuid=True), ForeignKey("usuario.id_usuario"), nullable=False)
@@ -0,0 +1,17 @@
+from sqlalchemy import UUID, Column, Date, Float, ForeignKey
+from database.config import Base
+
+class Tarifa_Diaria(Base):
+    """
+    Precio por noche de un tipo de habitación en una fecha concreta (temporada,
+    fines de semana, eventos). Las noches sin tarifa se cobran al precio de la
+    habitación.
+    """
+    __tablename__ = 'tarifa_diaria'
+
+    id_tipo = Column(UUID(as_uuid=True), ForeignKey('tipo_habitacion.id_tipo', ondelete='CASCADE'), primary_key=True)
+    fecha = Column(Date, primary_key=True)
+    precio = Column(Float, nullable=False)
+
+    def __repr__(self):
+        return f"<Tarifa_Diaria(id_tipo={self.id_tipo}, fecha={self.fecha}, precio={self.precio})>"
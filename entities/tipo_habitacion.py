@@ -10,7 +10,7 @@ class Tipo_Habitacion(Base):
     __tablename__ = 'tipo_habitacion'
 
     id_tipo = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
-    nombre_tipo = Column(String)
+    nombre_tipo = Column(String, unique=True)
     descripcion = Column(Text)
     id_usuario_crea = Column(UUID(as_uuid=True), ForeignKey("usuario.id_usuario"), nullable=False)
     id_usuario_edita = Column(UUID(as_uuid=True), ForeignKey("usuario.id_usuario"), nullable=True)
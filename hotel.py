@@ -0,0 +1,322 @@
+"""
+Interfaz de línea de comandos no interactiva para tareas programadas y
+operaciones masivas. Llama directamente a los CRUD, sin menús ni input().
+
+Uso:
+    python hotel.py habitaciones importar habitaciones.csv --usuario admin
+    python hotel.py reservas exportar --salida reservas.csv --estado Activa
+    python hotel.py reservas expirar --usuario admin
+    python hotel.py ocupacion reconstruir --desde 2020-01-01 --hasta 2026-01-01 --hilos 4
+    python hotel.py disponibilidad buscar --noches 3 --dias 60 --tipo Suite
+    python hotel.py tarifas fijar --tipo Suite --desde 2025-12-15 --hasta 2026-01-15 --precio 450000
+
+El arranque es rápido: los módulos de base de datos se importan y la sesión
+se abre solo cuando el comando los necesita (`--help` no toca la base de
+datos), y nunca se ejecuta create_tables(). Usa el perfil de motor "batch"
+salvo que DB_PERFIL indique otro. El progreso se escribe en stderr.
+"""
+
+import argparse
+import csv
+import os
+import sys
+import time
+from datetime import date, timedelta
+
+# Filas por lote de lectura, inserción o actualización
+TAMANO_LOTE = 20_000
+COLUMNAS_IMPORTACION = ("numero", "tipo", "precio")
+COLUMNAS_EXPORTACION = (
+    "id_reserva", "numero_habitacion", "nombre_cliente", "apellidos_cliente", "fecha_entrada",
+    "fecha_salida", "estado_reserva", "numero_de_personas", "noches", "costo_total", "fecha_creacion",
+)
+
+
+class Progreso:
+    """Escribe en stderr cuántas filas se han procesado y a qué ritmo."""
+
+    def __init__(self, accion: str):
+        self.accion = accion
+        self.filas = 0
+        self.inicio = time.perf_counter()
+
+    def avanzar(self, filas: int) -> None:
+        self.filas += filas
+        segundos = time.perf_counter() - self.inicio
+        print(f"{self.accion}: {self.filas:,} filas ({self.filas / segundos if segundos else 0:,.0f}/s)",
+              file=sys.stderr)
+
+    def terminar(self) -> None:
+        print(f"{self.accion}: {self.filas:,} filas en {time.perf_counter() - self.inicio:.1f} s", file=sys.stderr)
+
+
+def fabrica_sesiones():
+    os.environ.setdefault("DB_PERFIL", "batch")
+    from database.config import SessionLocal
+    import entities  # noqa: F401  registra todos los modelos y sus relaciones
+
+    return SessionLocal
+
+
+def abrir_sesion():
+    return fabrica_sesiones()()
+
+
+def buscar_usuario(db, nombre_usuario: str):
+    from crud.usuario_crud import UsuarioCRUD
+
+    usuario = UsuarioCRUD.obtener_usuario_por_nombre(db, nombre_usuario)
+    if usuario is None:
+        raise ValueError(f"No existe el usuario '{nombre_usuario}'")
+    return usuario
+
+
+def leer_bloques(lector, tamano: int):
+    bloque = []
+    for fila in lector:
+        bloque.append(fila)
+        if len(bloque) == tamano:
+            yield bloque
+            bloque = []
+    if bloque:
+        yield bloque
+
+
+def importar_habitaciones(args) -> None:
+    """
+    Importa habitaciones desde un CSV con columnas numero,tipo,precio (y
+    disponible, opcional). El archivo completo se importa en una transacción:
+    si una fila no es válida no se guarda ninguna.
+    """
+    from crud.habitacion_crud import HabitacionCRUD
+    from crud.tipo_habitacion_crud import TipoHabitacionCRUD
+    from database.config import leer_booleano
+    from entities.habitacion import Habitacion
+
+    with abrir_sesion() as db, open(args.archivo, newline="", encoding="utf-8") as archivo:
+        usuario = buscar_usuario(db, args.usuario)
+        tipos = {t.nombre_tipo.lower(): t for t in TipoHabitacionCRUD.obtener_tipos_referencia(db)}
+        lector = csv.DictReader(archivo)
+        faltantes = [c for c in COLUMNAS_IMPORTACION if c not in (lector.fieldnames or ())]
+        if faltantes:
+            raise ValueError(f"Faltan columnas en {args.archivo}: {', '.join(faltantes)}")
+
+        progreso = Progreso("Importar habitaciones")
+        with HabitacionCRUD(db).lote():
+            for n_bloque, bloque in enumerate(leer_bloques(lector, args.lote)):
+                habitaciones = []
+                for i, fila in enumerate(bloque, start=n_bloque * args.lote + 2):
+                    tipo = tipos.get(fila["tipo"].strip().lower())
+                    if tipo is None:
+                        raise ValueError(f"Línea {i}: tipo de habitación desconocido '{fila['tipo']}'")
+                    try:
+                        numero, precio = int(fila["numero"]), float(fila["precio"])
+                    except ValueError:
+                        raise ValueError(f"Línea {i}: número o precio no válido") from None
+                    habitaciones.append(Habitacion(
+                        numero=numero,
+                        id_tipo=tipo.id_tipo,
+                        tipo=tipo.nombre_tipo[:20],
+                        precio=precio,
+                        disponible=leer_booleano(fila.get("disponible") or "1"),
+                        id_usuario_crea=usuario.id_usuario,
+                    ))
+                progreso.avanzar(HabitacionCRUD.bulk_crear_habitaciones(db, habitaciones))
+        progreso.terminar()
+
+
+def exportar_reservas(args) -> None:
+    """Exporta las reservas a CSV recorriéndolas por lotes, sin cargarlas todas en memoria."""
+    from crud.reserva_crud import ReservaCRUD
+
+    salida = sys.stdout if args.salida == "-" else open(args.salida, "w", newline="", encoding="utf-8")
+    try:
+        with abrir_sesion() as db:
+            escritor = csv.writer(salida)
+            escritor.writerow(COLUMNAS_EXPORTACION)
+            progreso = Progreso("Exportar reservas")
+            filas = ReservaCRUD.iterar_reservas_detalladas(
+                db, estado=args.estado, desde=args.desde, hasta=args.hasta, tamano_lote=args.lote
+            )
+            for bloque in leer_bloques(filas, args.lote):
+                escritor.writerows(
+                    (
+                        r.id_reserva, numero, nombre, apellidos, r.fecha_entrada, r.fecha_salida,
+                        r.estado_reserva, r.numero_de_personas, r.noches, r.costo_total, r.fecha_creacion,
+                    )
+                    for r, numero, nombre, apellidos in bloque
+                )
+                progreso.avanzar(len(bloque))
+            progreso.terminar()
+    finally:
+        if salida is not sys.stdout:
+            salida.close()
+
+
+def expirar_reservas(args) -> None:
+    """Pasa a "Finalizada" las reservas activas cuya fecha de salida es anterior a --hasta."""
+    from crud.reserva_crud import ReservaCRUD
+
+    with abrir_sesion() as db:
+        if args.simular:
+            print(f"Reservas por expirar: {ReservaCRUD.contar_reservas_por_expirar(db, args.hasta):,}")
+            return
+        id_usuario = buscar_usuario(db, args.usuario).id_usuario if args.usuario else None
+        progreso = Progreso("Expirar reservas")
+        while True:
+            expiradas = ReservaCRUD.expirar_reservas(db, args.hasta, args.lote, id_usuario_edita=id_usuario)
+            if not expiradas:
+                break
+            progreso.avanzar(expiradas)
+        progreso.terminar()
+
+
+def reconstruir_ocupacion(args) -> None:
+    """Recalcula el resumen diario de ocupación de [--desde, --hasta) en bloques paralelos."""
+    # Una conexión por hilo en el pool del perfil batch
+    os.environ.setdefault("DB_POOL_SIZE", str(args.hilos))
+    fabrica = fabrica_sesiones()
+    from crud.ocupacion_crud import OcupacionCRUD
+
+    progreso = Progreso("Reconstruir ocupación")
+    for inicio, fin, filas in OcupacionCRUD.reconstruir(fabrica, args.desde, args.hasta, args.dias_por_bloque, args.hilos):
+        print(f"  {inicio} .. {fin}: {filas} filas", file=sys.stderr)
+        progreso.avanzar(filas)
+    progreso.terminar()
+
+
+def buscar_tipo(db, nombre_tipo: str):
+    from crud.tipo_habitacion_crud import TipoHabitacionCRUD
+
+    tipo = next(
+        (t for t in TipoHabitacionCRUD.obtener_tipos_referencia(db) if t.nombre_tipo.lower() == nombre_tipo.strip().lower()),
+        None,
+    )
+    if tipo is None:
+        raise ValueError(f"Tipo de habitación desconocido '{nombre_tipo}'")
+    return tipo
+
+
+def buscar_disponibilidad(args) -> None:
+    """
+    Escribe en CSV las estancias de --noches noches con entrada en los próximos
+    --dias días que tienen habitaciones libres, por tipo, con su precio desde,
+    usando la matriz de disponibilidad y el calendario de tarifas en memoria
+    (una carga de cada uno, una búsqueda y una cotización vectorizadas).
+    """
+    from crud.calendario_tarifas import CalendarioTarifas
+    from crud.matriz_disponibilidad import MatrizDisponibilidad
+    from crud.tipo_habitacion_crud import TipoHabitacionCRUD
+
+    with abrir_sesion() as db:
+        nombres = {t.id_tipo: t.nombre_tipo for t in TipoHabitacionCRUD.obtener_tipos_referencia(db)}
+        id_tipo = buscar_tipo(db, args.tipo).id_tipo if args.tipo else None
+        matriz = MatrizDisponibilidad.cargar(db, args.desde, args.dias + args.noches, conectar=False)
+        calendario = CalendarioTarifas.cargar(db, args.desde, args.dias + args.noches)
+    estancias = matriz.buscar_estancias(args.noches, hasta=args.desde + timedelta(days=args.dias), id_tipo=id_tipo)
+    escritor = csv.writer(sys.stdout)
+    escritor.writerow(("fecha_entrada", "fecha_salida", "tipo", "habitaciones_libres", "total_desde"))
+    escritor.writerows(
+        (entrada, entrada + timedelta(days=args.noches), nombres.get(tipo, tipo), libres, f"{total:.2f}")
+        for entrada, tipo, libres, total in calendario.cotizar_estancias(estancias, args.noches)
+    )
+    print(f"{len(estancias):,} estancias con disponibilidad", file=sys.stderr)
+
+
+def fijar_tarifas(args) -> None:
+    """Fija el precio por noche de un tipo en [--desde, --hasta), opcionalmente solo en --dias-semana."""
+    from crud.tarifa_crud import TarifaCRUD
+
+    with abrir_sesion() as db:
+        tipo = buscar_tipo(db, args.tipo)
+        noches = TarifaCRUD.fijar_tarifas(db, tipo.id_tipo, args.desde, args.hasta, args.precio, args.dias_semana)
+    print(f"{noches:,} noches de {tipo.nombre_tipo} a ${args.precio:,}", file=sys.stderr)
+
+
+def leer_dias_semana(texto: str) -> list:
+    try:
+        return [int(dia) for dia in texto.split(",")]
+    except ValueError:
+        raise argparse.ArgumentTypeError("lista de días separados por comas, 0 = lunes ... 6 = domingo") from None
+
+
+def crear_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(
+        prog="hotel", description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter
+    )
+    recursos = parser.add_subparsers(dest="recurso", required=True)
+
+    habitaciones = recursos.add_parser("habitaciones", help="operaciones sobre habitaciones")
+    comandos = habitaciones.add_subparsers(dest="comando", required=True)
+    importar = comandos.add_parser("importar", help="importar habitaciones desde un CSV (numero,tipo,precio[,disponible])")
+    importar.add_argument("archivo")
+    importar.add_argument("--usuario", required=True, help="nombre de usuario que figura como creador")
+    importar.add_argument("--lote", type=int, default=TAMANO_LOTE)
+    importar.set_defaults(funcion=importar_habitaciones)
+
+    reservas = recursos.add_parser("reservas", help="operaciones sobre reservas")
+    comandos = reservas.add_subparsers(dest="comando", required=True)
+    exportar = comandos.add_parser("exportar", help="exportar reservas a CSV")
+    exportar.add_argument("--salida", default="-", help="archivo CSV de salida (por defecto, stdout)")
+    exportar.add_argument("--estado", help="exportar solo las reservas en este estado")
+    exportar.add_argument("--desde", type=date.fromisoformat, help="fecha de entrada mínima (AAAA-MM-DD)")
+    exportar.add_argument("--hasta", type=date.fromisoformat, help="fecha de entrada máxima, excluida (AAAA-MM-DD)")
+    exportar.add_argument("--lote", type=int, default=TAMANO_LOTE)
+    exportar.set_defaults(funcion=exportar_reservas)
+
+    expirar = comandos.add_parser("expirar", help="finalizar las reservas activas cuya salida ya pasó")
+    expirar.add_argument("--hasta", type=date.fromisoformat, default=date.today(),
+                         help="expirar las reservas con salida anterior a esta fecha (por defecto, hoy)")
+    expirar.add_argument("--usuario", help="nombre de usuario que figura como editor")
+    expirar.add_argument("--lote", type=int, default=TAMANO_LOTE)
+    expirar.add_argument("--simular", action="store_true", help="solo contar las reservas que se expirarían")
+    expirar.set_defaults(funcion=expirar_reservas)
+
+    ocupacion = recursos.add_parser("ocupacion", help="resumen diario de ocupación e ingresos")
+    comandos = ocupacion.add_subparsers(dest="comando", required=True)
+    reconstruir = comandos.add_parser("reconstruir", help="recalcular el resumen de un periodo desde las reservas")
+    reconstruir.add_argument("--desde", type=date.fromisoformat, required=True, help="primer día (AAAA-MM-DD)")
+    reconstruir.add_argument("--hasta", type=date.fromisoformat, required=True, help="día final, excluido (AAAA-MM-DD)")
+    reconstruir.add_argument("--dias-por-bloque", type=int, default=31, help="días por transacción")
+    reconstruir.add_argument("--hilos", type=int, default=4, help="bloques que se recalculan a la vez")
+    reconstruir.set_defaults(funcion=reconstruir_ocupacion)
+
+    disponibilidad = recursos.add_parser("disponibilidad", help="búsqueda de habitaciones libres")
+    comandos = disponibilidad.add_subparsers(dest="comando", required=True)
+    buscar = comandos.add_parser("buscar", help="estancias con habitaciones libres en un rango de fechas de entrada")
+    buscar.add_argument("--noches", type=int, required=True)
+    buscar.add_argument("--desde", type=date.fromisoformat, default=date.today(),
+                        help="primera fecha de entrada (por defecto, hoy)")
+    buscar.add_argument("--dias", type=int, default=60, help="días de fechas de entrada a considerar")
+    buscar.add_argument("--tipo", help="solo este tipo de habitación (por nombre)")
+    buscar.set_defaults(funcion=buscar_disponibilidad)
+
+    tarifas = recursos.add_parser("tarifas", help="calendario de tarifas por tipo de habitación")
+    comandos = tarifas.add_subparsers(dest="comando", required=True)
+    fijar = comandos.add_parser("fijar", help="fijar el precio por noche de un tipo en un rango de fechas")
+    fijar.add_argument("--tipo", required=True, help="tipo de habitación (por nombre)")
+    fijar.add_argument("--desde", type=date.fromisoformat, required=True, help="primera noche (AAAA-MM-DD)")
+    fijar.add_argument("--hasta", type=date.fromisoformat, required=True, help="noche final, excluida (AAAA-MM-DD)")
+    fijar.add_argument("--precio", type=float, required=True)
+    fijar.add_argument("--dias-semana", type=leer_dias_semana,
+                       help="solo estos días, p. ej. 4,5 para viernes y sábado (0 = lunes)")
+    fijar.set_defaults(funcion=fijar_tarifas)
+    return parser
+
+
+def main(argv=None) -> int:
+    args = crear_parser().parse_args(argv)
+    try:
+        args.funcion(args)
+    except BrokenPipeError:
+        # La salida se cerró antes de tiempo (p. ej. `| head`): no es un error del comando
+        os.dup2(os.open(os.devnull, os.O_WRONLY), sys.stdout.fileno())
+        return 1
+    except (ValueError, OSError) as e:
+        print(f"Error: {e}", file=sys.stderr)
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,27 +1,70 @@
-from database.config import SessionLocal, create_tables
+from database.config import SessionLocal, engine
+from database.esquema import verificar_esquema
+from database.instrumentacion import accion_instrumentada, instrumentacion
 from crud.reserva_crud import ReservaCRUD
 from crud.tipo_habitacion_crud import TipoHabitacionCRUD
-from crud.usuario_crud import UsuarioCRUD
+from crud.usuario_crud import UsuarioCRUD, UsuarioSesion
 from crud.habitacion_crud import HabitacionCRUD
 from crud.servicios_adicioneles_crud import ServiciosAdicionalesCRUD
+from crud.reserva_servicios_crud import ReservaServiciosCRUD
+from crud.disponibilidad_crud import DisponibilidadCRUD
+from crud.reporte_crud import ReporteCRUD, sumar_cancelaciones, sumar_indicadores
+from crud.tarifa_crud import TarifaCRUD
 from entities.servicios_adicionales import Servicios_Adicionales
 from entities.reserva_servicios import Reserva_Servicios
 from entities.usuario import Usuario
 from entities.reserva import Reserva
 from entities.habitacion import Habitacion
+import functools
 import getpass
+import os
 from typing import Optional
 from datetime import date, timedelta, datetime
+
+
+def sesion_por_accion(funcion):
+    """
+    Decorador que abre una sesión de base de datos solo durante la acción del menú
+    y la cierra al terminar, para que el mapa de identidad no crezca con el tiempo.
+    Las acciones llamadas desde otra acción reutilizan la sesión abierta.
+    """
+    @functools.wraps(funcion)
+    def envoltura(self, *args, **kwargs):
+        if self.db is not None:
+            return funcion(self, *args, **kwargs)
+        self._abrir_sesion()
+        try:
+            return funcion(self, *args, **kwargs)
+        finally:
+            self._cerrar_sesion()
+    return envoltura
+
+
 class SistemaGestion:
-    def __init__(self):
+    def __init__(self, fabrica_sesiones=SessionLocal):
         """Inicializar el sistema"""
-        self.db = SessionLocal()
+        self.fabrica_sesiones = fabrica_sesiones
+        self.db = None
+        self.usuario_actual: Optional[UsuarioSesion] = None
+
+    def _abrir_sesion(self) -> None:
+        """Abrir la sesión de la acción actual y enlazar los CRUD a ella"""
+        self.db = self.fabrica_sesiones()
         self.usuario_crud = UsuarioCRUD(self.db)
         self.habitacion_crud = HabitacionCRUD(self.db)
         self.reserva_crud = ReservaCRUD(self.db)
         self.servicios_adicionales_crud = ServiciosAdicionalesCRUD(self.db)
         self.tipo_habitacion_crud = TipoHabitacionCRUD(self.db)
-        self.usuario_actual: Optional[Usuario] = None
+        self.disponibilidad_crud = DisponibilidadCRUD(self.db)
+        self.reserva_servicios_crud = ReservaServiciosCRUD(self.db)
+        self.reporte_crud = ReporteCRUD(self.db)
+        self.tarifa_crud = TarifaCRUD(self.db)
+
+    def _cerrar_sesion(self) -> None:
+        """Cerrar la sesión de la acción actual, si hay una abierta"""
+        if self.db is not None:
+            self.db.close()
+            self.db = None
 
     def __enter__(self):
         """Context manager entry"""
@@ -29,8 +72,10 @@ class SistemaGestion:
 
     def __exit__(self, exc_type, exc_val, exc_tb):
         """Context manager exit"""
-        self.db.close()
+        self._cerrar_sesion()
 
+    @accion_instrumentada
+    @sesion_por_accion
     def mostrar_pantalla_login(self) -> bool:
         """Mostrar pantalla de login y autenticar usuario"""
         print("\n" + "=" * 50)
@@ -58,7 +103,7 @@ class SistemaGestion:
                     nombre_usuario, contrasena
                 )
                 if usuario:
-                    self.usuario_actual = usuario
+                    self.usuario_actual = UsuarioSesion.desde_usuario(usuario)
                     print(f"\nÉXITO: ¡Bienvenido, {usuario.nombre}!")
                     if usuario.tipo_usuario == "Administrador":
                         print("INFO: Tienes privilegios de administrador")
@@ -170,30 +215,33 @@ class SistemaGestion:
             print("ERROR: Rol no reconocido. Contacte al administrador.")
         print("=" * 50)
              
+    @accion_instrumentada
+    @sesion_por_accion
     def reservar_habitacion(self):
         """
         Permite a un usuario autenticado (cliente) reservar una habitación en el sistema.
         El método guía al usuario a través del proceso de reserva, solicitando el número de noches,
-        número de personas, tipo de habitación, y la fecha de entrada. Calcula el costo total,
-        muestra un resumen de la reserva y solicita confirmación antes de crear la reserva en la base de datos.
-        Si la reserva es confirmada, marca la habitación como no disponible y ofrece la opción de agregar servicios adicionales.
+        número de personas, la fecha de entrada y el tipo de habitación. Busca una habitación de ese tipo
+        libre en el rango de fechas, calcula el costo total con las tarifas de temporada del tipo, muestra un
+        resumen de la reserva y solicita confirmación antes de crear la reserva en la base de datos.
+        Si la reserva es confirmada, ofrece la opción de agregar servicios adicionales.
         Requiere:
             - El usuario debe haber iniciado sesión como cliente.
             - Deben existir tipos de habitación y habitaciones disponibles en la base de datos.
         Entradas del usuario:
             - Número de noches (entero > 0)
             - Número de personas (entero > 0)
-            - Selección de tipo de habitación
             - Fecha de entrada (formato AAAA-MM-DD, no anterior a hoy)
+            - Selección de tipo de habitación (el menú muestra cuántas quedan de cada tipo en esas fechas)
             - Confirmación de reserva (1 para sí, 2 para no)
             - Opción de agregar servicios adicionales (1 para sí, 2 para no)
         Efectos secundarios:
             - Crea una nueva reserva en la base de datos si es confirmada.
-            - Marca la habitación reservada como no disponible.
+            - La habitación queda ocupada solo en el rango de fechas reservado.
             - Puede invocar la reserva de servicios adicionales.
         Mensajes de error:
             - Si el usuario no ha iniciado sesión como cliente.
-            - Si no hay habitaciones disponibles del tipo seleccionado.
+            - Si no hay habitaciones disponibles del tipo seleccionado en esas fechas.
             - Si las entradas del usuario no son válidas.
         """
         if not self.usuario_actual:
@@ -220,10 +268,25 @@ class SistemaGestion:
                     print("Debe ser mayor a cero.")
             else:
                 print("Debes ingresar un número válido.")
-        tipos_disponibles = self.tipo_habitacion_crud.obtener_tipos_habitacion(self.db)
+        while True:
+            fecha_entrada_str = input("Ingrese la fecha de entrada (AAAA-MM-DD): ").strip()
+            try:
+                fecha_entrada = datetime.strptime(fecha_entrada_str, "%Y-%m-%d").date()
+                if fecha_entrada < date.today():
+                    print("La fecha de entrada no puede ser anterior a hoy.")
+                else:
+                    break
+            except ValueError:
+                print("Formato inválido. Usa AAAA-MM-DD.")
+        fecha_salida = fecha_entrada + timedelta(days=noches)
+        tipos_disponibles = self.tipo_habitacion_crud.obtener_tipos_referencia(self.db)
+        # Cifra aproximada, solo para mostrar: el resumen puede estar desfasado, y
+        # la búsqueda por habitación de más abajo es la que decide.
+        disponibles_por_tipo = self.disponibilidad_crud.contar_disponibles_por_tipo(self.db, fecha_entrada, fecha_salida)
         print("Tipos de habitación disponibles:")
         for idx, t in enumerate(tipos_disponibles, start=1):
-            print(f"{idx}. {t.nombre_tipo}")
+            disponibles = disponibles_por_tipo.get(t.id_tipo, 0)
+            print(f"{idx}. {t.nombre_tipo} (~{disponibles} disponibles)" if disponibles > 0 else f"{idx}. {t.nombre_tipo} (posiblemente agotado)")
         while True:
             tipo_input = input(f"Selecciona el tipo de habitación (1-{len(tipos_disponibles)}): ")
             if tipo_input.isdigit():
@@ -234,28 +297,25 @@ class SistemaGestion:
             else:
                 print("Debes ingresar un número válido.")
         tipo_seleccionado = tipos_disponibles[tipo_input - 1]  
-        nombre_tipo = tipo_seleccionado.nombre_tipo  
-        habitacion = self.db.query(Habitacion).filter_by(tipo=nombre_tipo, disponible=True).first()
-        if not habitacion:
-            print("No hay habitaciones disponibles de ese tipo.")
+        habitaciones_libres = self.disponibilidad_crud.obtener_habitaciones_disponibles(
+            self.db, tipo_seleccionado.id_tipo, fecha_entrada, fecha_salida, limite=1
+        )
+        if not habitaciones_libres:
+            print("No hay habitaciones disponibles de ese tipo para esas fechas.")
             return
+        habitacion = habitaciones_libres[0]
         precio_noche = habitacion.precio
-        total = precio_noche * noches
-        while True:
-            fecha_entrada_str = input("Ingrese la fecha de entrada (AAAA-MM-DD): ").strip()
-            try:
-                fecha_entrada = datetime.strptime(fecha_entrada_str, "%Y-%m-%d").date()
-                if fecha_entrada < date.today():
-                    print("La fecha de entrada no puede ser anterior a hoy.")
-                else:
-                    break
-            except ValueError:
-                print("Formato inválido. Usa AAAA-MM-DD.")
-        fecha_salida = fecha_entrada + timedelta(days=noches)
+        # Tarifas de temporada del tipo; las noches sin tarifa van al precio de la habitación
+        total = self.tarifa_crud.cotizar_estancia(
+            self.db, tipo_seleccionado.id_tipo, precio_noche, fecha_entrada, fecha_salida
+        )
         fecha_creacion = date.today()
         print(f"\nFecha entrada: {fecha_entrada}")
         print(f"Fecha salida: {fecha_salida}")
-        print(f"Total: {noches} noches x ${precio_noche:,} = ${total:,}")
+        if total == precio_noche * noches:
+            print(f"Total: {noches} noches x ${precio_noche:,} = ${total:,}")
+        else:
+            print(f"Total: {noches} noches con tarifa de temporada = ${total:,}")
         while True:
             confirmar = input("¿Desea confirmar la reserva? (1. Sí / 2. No): ")
             if confirmar.isdigit():
@@ -269,10 +329,8 @@ class SistemaGestion:
         if confirmar == 2:
             print("Reserva cancelada")
             return
-        id_habitacion = habitacion.id_habitacion
         reserva = Reserva(
             id_cliente=self.usuario_actual.id_usuario,
-            id_habitacion=id_habitacion,
             fecha_entrada=fecha_entrada,
             fecha_salida=fecha_salida,
             estado_reserva="Activa",
@@ -282,11 +340,20 @@ class SistemaGestion:
             id_usuario_crea=self.usuario_actual.id_usuario,
             fecha_creacion=fecha_creacion
         )
-        self.reserva_crud.crear_reserva(self.db, reserva)
-        habitacion.disponible = False
-        self.db.commit()
+        def costo(asignada):
+            # La habitación bloqueada puede ser otra y tener otro precio: se cotiza con la suya
+            if asignada.precio == precio_noche:
+                return total
+            return self.tarifa_crud.cotizar_estancia(
+                self.db, tipo_seleccionado.id_tipo, asignada.precio, fecha_entrada, fecha_salida
+            )
+        try:
+            self.reserva_crud.asignar_habitacion(self.db, reserva, tipo_seleccionado.id_tipo, costo=costo)
+        except ValueError as e:
+            print(e)
+            return
         print(f"\nReserva creada para {self.usuario_actual.nombre} {self.usuario_actual.apellidos}")
-        print(f"Habitación {habitacion.numero} - Total: ${total:,}")
+        print(f"Habitación {reserva.habitacion.numero} - Total: ${reserva.costo_total:,}")
         print(f"Del {fecha_entrada} al {fecha_salida}")
         while True:
             opcion_servicio = input("¿Deseas servicios adicionales? (1. Sí / 2. No): ").strip()
@@ -304,12 +371,14 @@ class SistemaGestion:
             else:
                 print("Opción inválida. Solo puedes elegir 1 o 2.")
                 
+    @accion_instrumentada
+    @sesion_por_accion
     def cancelar_reserva(self):
         """
         Cancela una reserva activa del usuario actual.
         Este método muestra todas las reservas activas del usuario actual, permitiéndole seleccionar una para cancelar.
         Solicita confirmación antes de proceder con la cancelación. Si se confirma, actualiza el estado de la reserva a "Cancelada",
-        marca la habitación como disponible y registra la fecha y el usuario que realizó la edición.
+        lo que libera la habitación para esas fechas, y registra la fecha y el usuario que realizó la edición.
         Entradas:
             - Solicita al usuario seleccionar el número de la reserva a cancelar.
             - Solicita confirmación para proceder con la cancelación.
@@ -317,17 +386,16 @@ class SistemaGestion:
             - Mensajes informativos sobre el estado de la operación (éxito, error o cancelación abortada).
             - Actualización en la base de datos de la reserva y la habitación correspondiente.
         """
-        reservas = self.db.query(Reserva).filter_by(
-            id_cliente=self.usuario_actual.id_usuario, estado_reserva="Activa"
-        ).all()
+        reservas = self.reserva_crud.obtener_reservas_detalladas(
+            self.db, id_cliente=self.usuario_actual.id_usuario, estado="Activa"
+        )
         if not reservas:
             print("No tienes reservas activas.")
             return
         print("Tus reservas activas:")
-        for i, reserva in enumerate(reservas, 1):
-            habitacion = self.db.query(Habitacion).filter_by(id_habitacion=reserva.id_habitacion).first()
-            if habitacion: 
-                print(f"{i}. Habitación {habitacion.numero} del {reserva.fecha_entrada} al {reserva.fecha_salida} - Total: ${reserva.costo_total:,.0f}")
+        for i, (reserva, numero_habitacion, _, _) in enumerate(reservas, 1):
+            if numero_habitacion is not None: 
+                print(f"{i}. Habitación {numero_habitacion} del {reserva.fecha_entrada} al {reserva.fecha_salida} - Total: ${reserva.costo_total:,.0f}")
             else:
                 print(f"{i}. Habitación no encontrada para la reserva del {reserva.fecha_entrada} al {reserva.fecha_salida}")
         opcion = input("Selecciona el número de la reserva que deseas cancelar: ")
@@ -339,7 +407,7 @@ class SistemaGestion:
         except ValueError:
             print("Debes ingresar un número.")
             return
-        reserva = reservas[opcion - 1]
+        reserva = reservas[opcion - 1].Reserva
         while True:
             confirmar = input("¿Desea confirmar la reserva? (1. Sí / 2. No): ")
             if confirmar.isdigit():
@@ -351,17 +419,17 @@ class SistemaGestion:
             else:
                 print("Debes ingresar un número válido.")   
         if confirmar == 1:
-            habitacion = self.db.get(Habitacion, reserva.id_habitacion)
-            if habitacion:
-                habitacion.disponible = True
-            reserva.estado_reserva = "Cancelada"
-            reserva.fecha_edicion = date.today()
-            reserva.id_usuario_edita = self.usuario_actual.id_usuario
-            self.db.commit()
+            try:
+                self.reserva_crud.cancelar_reserva(self.db, reserva.id_reserva, self.usuario_actual.id_usuario)
+            except ValueError as e:
+                print(f"Error: {e}")
+                return
             print("Reserva cancelada con éxito.")
         else:
             print("Cancelación abortada.")
     
+    @accion_instrumentada
+    @sesion_por_accion
     def mostrar_reservas(self):
         """
         Muestra todas las reservas registradas por el usuario actual.
@@ -370,14 +438,16 @@ class SistemaGestion:
         de las reservas mostrando el número de habitación, la cantidad de noches y el estado
         de cada reserva.
         """
-        reservas = self.db.query(Reserva).filter_by(id_cliente=self.usuario_actual.id_usuario).all()
+        reservas = self.reserva_crud.obtener_reservas_detalladas(self.db, id_cliente=self.usuario_actual.id_usuario)
         if not reservas:
             print("No tienes reservas registradas.")
             return
         print("\nTus reservas:")
-        for r in reservas:
-            print(f"Habitación {r.habitacion.numero} - {r.noches} noches - Estado: {r.estado_reserva}")
+        for r, numero_habitacion, _, _ in reservas:
+            print(f"Habitación {numero_habitacion} - {r.noches} noches - Estado: {r.estado_reserva}")
             
+    @accion_instrumentada
+    @sesion_por_accion
     def reservar_servicios(self):
         """
         Permite al usuario agregar servicios adicionales a una de sus reservas activas.
@@ -391,16 +461,16 @@ class SistemaGestion:
         Raises:
             Exception: Si ocurre un error al agregar los servicios a la reserva.
         """
-        reservas = self.db.query(Reserva).filter_by(id_cliente=self.usuario_actual.id_usuario).all()
+        reservas = self.reserva_crud.obtener_reservas_detalladas(self.db, id_cliente=self.usuario_actual.id_usuario)
         if not reservas:
             print("No tienes reservas activas.")
             return
         print("\nTus reservas activas:")
-        for i, r in enumerate(reservas, start=1):
-            print(f"{i}. Habitación {r.habitacion.numero} del {r.fecha_entrada} al {r.fecha_salida}")
+        for i, (r, numero_habitacion, _, _) in enumerate(reservas, start=1):
+            print(f"{i}. Habitación {numero_habitacion} del {r.fecha_entrada} al {r.fecha_salida}")
         idx = int(input("Selecciona la reserva a la que agregar servicios: ")) - 1
-        reserva_seleccionada = reservas[idx]
-        servicios = self.db.query(Servicios_Adicionales).all()
+        reserva_seleccionada = reservas[idx].Reserva
+        servicios = self.servicios_adicionales_crud.obtener_servicios_referencia(self.db)
         if not servicios:
             print("No hay servicios adicionales disponibles.")
             return
@@ -410,16 +480,11 @@ class SistemaGestion:
         seleccion = input("Selecciona los servicios separados por coma (ej: 1,3): ")
         seleccion_indices = [int(x.strip())-1 for x in seleccion.split(",")]
         try:
-            for i in seleccion_indices:
-                servicio = servicios[i]
-                subtotal = servicio.precio
-                reserva_servicio = Reserva_Servicios(
-                    id_reserva=reserva_seleccionada.id_reserva,
-                    id_servicio=servicio.id_servicio,
-                )
-                self.db.add(reserva_servicio)
-                reserva_seleccionada.costo_total += subtotal
-            self.db.commit()
+            self.reserva_servicios_crud.agregar_servicios(
+                self.db,
+                reserva_seleccionada.id_reserva,
+                [servicios[i].id_servicio for i in seleccion_indices],
+            )
             print("Servicios agregados correctamente a tu reserva.")
         except Exception as e:
             self.db.rollback()
@@ -429,8 +494,8 @@ class SistemaGestion:
         """Ejecutar el sistema principal con autenticación"""
         try:
             print("Iniciando Sistema de Gestión del Hotel...")
-            print("Configurando base de datos...")
-            create_tables()
+            print("Verificando esquema de la base de datos...")
+            verificar_esquema(engine)
             print("Sistema listo para usar.")
             while True:
                 if not self.usuario_actual:
@@ -442,7 +507,9 @@ class SistemaGestion:
         except Exception as e:
             print(f"\nError crítico: {e}")
         finally:
-            self.db.close()
+            self._cerrar_sesion()
+            if instrumentacion.activa:
+                instrumentacion.volcar_reporte(os.getenv("DB_INSTRUMENTAR_REPORTE"))
             
     def mostrar_menu_habitaciones(self) -> None:
         """
@@ -492,16 +559,17 @@ class SistemaGestion:
         print("1. Listar reservas")
         print("2. Consultar reservas activas")
         print("3. Eliminar reserva")
-        print("4. Volver al menú principal")
+        print("4. Reportes de ocupación e ingresos")
+        print("5. Volver al menú principal")
         while True:
-            opcion = input("Elige una opción (1-4): ")
+            opcion = input("Elige una opción (1-5): ")
             if opcion.isdigit():  
                 opcion = int(opcion)  
-                if 1 <= opcion <= 4:
+                if 1 <= opcion <= 5:
                     print("Opción válida:", opcion)                         
                     break  
                 else:
-                    print("El número debe estar entre 1 y 4.")
+                    print("El número debe estar entre 1 y 5.")
             else:
                 print("Debes ingresar un número válido.")
         if opcion == 1:
@@ -511,6 +579,8 @@ class SistemaGestion:
         elif opcion == 3:
             self.eliminar_reserva()
         elif opcion == 4:
+            self.mostrar_reportes()
+        elif opcion == 5:
             print("Volviendo al menu principal...")
             self.mostrar_menu_principal_autenticado()
 
@@ -582,6 +652,8 @@ class SistemaGestion:
             print("Volviendo al menú principal...")
             self.mostrar_menu_principal_autenticado()
 
+    @accion_instrumentada
+    @sesion_por_accion
     def mostrar_perfil(self):
         """
         Muestra en consola la información del perfil del usuario actual.
@@ -592,6 +664,8 @@ class SistemaGestion:
         print(f"Usuario: {self.usuario_actual.telefono}")
         print(f"Rol: {self.usuario_actual.tipo_usuario}")
         
+    @accion_instrumentada
+    @sesion_por_accion
     def agregar_habitacion(self):
         """
         Agrega una nueva habitación al sistema solicitando al usuario el tipo de habitación y el precio por noche.
@@ -651,6 +725,8 @@ class SistemaGestion:
         except Exception as e:
             print(f"Error al agregar habitación: {e}")
 
+    @accion_instrumentada
+    @sesion_por_accion
     def listar_habitaciones(self):
         """
         Lista todas las habitaciones registradas obteniéndolas de la base de datos y mostrando sus detalles.
@@ -680,6 +756,8 @@ class SistemaGestion:
         except Exception as e:
             print(f"Error al listar habitaciones: {e}")
 
+    @accion_instrumentada
+    @sesion_por_accion
     def actualizar_habitacion(self): 
         """
         Actualiza el precio de una habitación seleccionada por el usuario.
@@ -715,6 +793,8 @@ class SistemaGestion:
             print(f"Error al actualizar habitación: {e}")
             self.db.rollback()
 
+    @accion_instrumentada
+    @sesion_por_accion
     def eliminar_habitacion(self):
         """
         Elimina una habitación seleccionada por el usuario de la base de datos.
@@ -743,10 +823,12 @@ class SistemaGestion:
             print(f"Error al eliminar la habitación: {e}")
             self.db.rollback()
     
+    @accion_instrumentada
+    @sesion_por_accion
     def listar_reservas(self):
         """
         Lista todas las reservas obtenidas de la base de datos.
-        Este método intenta obtener todas las reservas usando el objeto reserva_crud.
+        Este método recorre las reservas por lotes (streaming) usando el objeto reserva_crud.
         Si no se encuentran reservas, imprime un mensaje indicando que no hay reservas registradas.
         De lo contrario, imprime los detalles de cada reserva, incluyendo estado, fechas de entrada y salida,
         costo total, número de personas y número de noches.
@@ -755,34 +837,86 @@ class SistemaGestion:
             Exception: Si ocurre un error al obtener o listar las reservas.
         """
         try:
-            reservas = self.reserva_crud.obtener_reservas(self.db)
-            if not reservas:
+            hay_reservas = False
+            for h in self.reserva_crud.iterar_reservas(self.db):
+                hay_reservas = True
+                print(f"¨{h} º {h.estado_reserva} | {h.fecha_entrada} | {h.fecha_salida} | {h.costo_total} | {h.numero_de_personas} | {h.noches} ")
+            if not hay_reservas:
                 print("No hay habitaciones registradas.")
-            else:
-                for h in reservas:
-                    print(f"¨{h} º {h.estado_reserva} | {h.fecha_entrada} | {h.fecha_salida} | {h.costo_total} | {h.numero_de_personas} | {h.noches} ")
         except Exception as e:
             print(f"Error al listar habitaciones: {e}")
             
+    @accion_instrumentada
+    @sesion_por_accion
     def listar_reservas_activas(self):
         """
         Lista todas las reservas activas obtenidas de la base de datos y muestra sus detalles.
-        Este método intenta obtener todas las reservas activas usando el método `obtener_reservas_activas`
+        Este método recorre las reservas activas por lotes usando el método `iterar_reservas_activas`
         del objeto `reserva_crud`. Si no hay reservas activas, notifica al usuario.
         De lo contrario, imprime los detalles de cada reserva activa, incluyendo ID de reserva, ID de cliente,
         ID de habitación, fechas de entrada y salida, y estado de la reserva.
         Maneja excepciones mostrando un mensaje de error si ocurre algún problema al obtener los datos.
         """
         try:
-            reservas = self.reserva_crud.obtener_reservas_activas(self.db)
-            if not reservas:
+            hay_reservas = False
+            for r in self.reserva_crud.iterar_reservas_activas(self.db):
+                hay_reservas = True
+                print(f"Reserva {r.id_reserva} | Cliente: {r.id_cliente} | Habitación: {r.id_habitacion} | {r.fecha_entrada} → {r.fecha_salida} | Estado: {r.estado_reserva}")
+            if not hay_reservas:
                 print("No hay reservas activas.")
-            else:
-                for r in reservas:
-                    print(f"Reserva {r.id_reserva} | Cliente: {r.id_cliente} | Habitación: {r.id_habitacion} | {r.fecha_entrada} → {r.fecha_salida} | Estado: {r.estado_reserva}")
         except Exception as e:
             print(f"Error al obtener reservas activas: {e}")
             
+    @staticmethod
+    def _pedir_fecha(mensaje: str, por_defecto: date) -> date:
+        """Pide una fecha AAAA-MM-DD; con Enter devuelve `por_defecto`."""
+        while True:
+            texto = input(f"{mensaje} (AAAA-MM-DD, Enter = {por_defecto}): ").strip()
+            if not texto:
+                return por_defecto
+            try:
+                return datetime.strptime(texto, "%Y-%m-%d").date()
+            except ValueError:
+                print("Formato inválido. Usa AAAA-MM-DD.")
+
+    @accion_instrumentada
+    @sesion_por_accion
+    def mostrar_reportes(self):
+        """
+        Muestra los reportes de un periodo [fecha inicial, fecha final): ocupación, ADR y
+        RevPAR por tipo de habitación, servicios más vendidos y tasa de cancelación.
+        Cada reporte es una sola consulta agregada en la base de datos (ver ReporteCRUD);
+        los periodos ya cerrados se sirven de caché.
+        Por defecto muestra los últimos 30 días, sin incluir hoy.
+        """
+        hoy = date.today()
+        desde = self._pedir_fecha("Fecha inicial", hoy - timedelta(days=30))
+        hasta = self._pedir_fecha("Fecha final, excluida", hoy)
+        try:
+            indicadores = self.reporte_crud.indicadores(self.db, desde, hasta)
+            servicios = self.reporte_crud.servicios_mas_vendidos(self.db, desde, hasta)
+            cancelaciones = self.reporte_crud.cancelaciones(self.db, desde, hasta)
+        except ValueError as e:
+            print(f"Error: {e}")
+            return
+
+        print(f"\n--- OCUPACIÓN E INGRESOS {desde} → {hasta} ---")
+        print(f"{'Tipo':<25} {'Ocupación':>9} {'ADR':>12} {'RevPAR':>12} {'Ingresos':>14}")
+        for i in (*indicadores, sumar_indicadores(indicadores)):
+            print(f"{i.nombre_tipo:<25} {i.ocupacion:>9.1%} {i.adr:>12,.0f} {i.revpar:>12,.0f} {i.ingresos:>14,.0f}")
+
+        print("\n--- SERVICIOS MÁS VENDIDOS ---")
+        if not servicios:
+            print("No se vendieron servicios en el periodo.")
+        for s in servicios:
+            print(f"{s.posicion:>2}. {s.nombre_servicio:<25} {s.cantidad:>6} ({s.participacion:.1%}) | {s.ingresos:,.0f}")
+
+        print("\n--- CANCELACIONES ---")
+        for c in (*cancelaciones, sumar_cancelaciones(cancelaciones)):
+            print(f"{c.nombre_tipo:<25} {c.canceladas:>6} de {c.reservas:<6} ({c.tasa:.1%})")
+
+    @accion_instrumentada
+    @sesion_por_accion
     def actualizar_perfil(self):
         """
         Permite al usuario actualizar su perfil interactuando por consola.
@@ -822,13 +956,15 @@ class SistemaGestion:
                     return
                 cambios["clave"] = nueva_clave
             if cambios:
-                self.usuario_crud.actualizar_usuario(
+                usuario = self.usuario_crud.actualizar_usuario(
                     self.db,
                     id_usuario=self.usuario_actual.id_usuario,
                     id_usuario_edita=self.usuario_actual.id_usuario,
                     fecha_edicion = fecha_edita,
                     **cambios
                 )
+                if usuario:
+                    self.usuario_actual = UsuarioSesion.desde_usuario(usuario)
                 print("Perfil actualizado correctamente.")
             else:
                 print("No se realizaron cambios.")
@@ -836,6 +972,8 @@ class SistemaGestion:
             print(f"Error al actualizar perfil: {e}")
             self.db.rollback()
             
+    @accion_instrumentada
+    @sesion_por_accion
     def crear_usuario(self):
         """
         Crea un nuevo usuario solicitando los datos necesarios por consola.
@@ -880,6 +1018,8 @@ class SistemaGestion:
             print(f"Error al crear usuario: {e}")
             self.db.rollback()
             
+    @accion_instrumentada
+    @sesion_por_accion
     def listar_usuarios(self):
         """
         Muestra una lista de usuarios registrados en el sistema.
@@ -901,6 +1041,8 @@ class SistemaGestion:
         except Exception as e:
             print(f"Error al listar usuarios: {e}")
             
+    @accion_instrumentada
+    @sesion_por_accion
     def eliminar_usuario(self):
         """
         Elimina un usuario del sistema.
@@ -929,6 +1071,8 @@ class SistemaGestion:
             print(f"Error al eliminar usuario: {e}")
             self.db.rollback()
             
+    @accion_instrumentada
+    @sesion_por_accion
     def agregar_servicio(self):
         """
         Permite agregar un nuevo servicio adicional al sistema.
@@ -961,6 +1105,8 @@ class SistemaGestion:
             print(f"Error al agregar servicio: {e}")
             self.db.rollback()
 
+    @accion_instrumentada
+    @sesion_por_accion
     def listar_servicios(self):
         """
         Muestra todos los servicios adicionales registrados en el sistema.
@@ -976,6 +1122,8 @@ class SistemaGestion:
         except Exception as e:
             print(f"Error al listar servicios: {e}")
 
+    @accion_instrumentada
+    @sesion_por_accion
     def actualizar_servicio(self):
         """
         Permite actualizar un servicio adicional existente.
@@ -1013,6 +1161,8 @@ class SistemaGestion:
             print(f"Error al actualizar servicio: {e}")
             self.db.rollback()
 
+    @accion_instrumentada
+    @sesion_por_accion
     def eliminar_servicio(self):
         """
         Elimina un servicio adicional seleccionado por el usuario.
@@ -1041,47 +1191,42 @@ class SistemaGestion:
             print(f"Error al eliminar servicio: {e}")
             self.db.rollback()
             
+    @accion_instrumentada
+    @sesion_por_accion
     def eliminar_reserva(self):
         """
         Elimina una reserva seleccionada por el usuario.
         Este método muestra todas las reservas registradas, permite al usuario seleccionar una para eliminarla,
-        solicita confirmación y, si se confirma, elimina la reserva de la base de datos. Si la reserva está asociada
-        a una habitación, marca la habitación como disponible nuevamente.
+        solicita confirmación y, si se confirma, elimina la reserva de la base de datos, liberando la habitación
+        para esas fechas.
         Pasos:
             1. Muestra la lista de reservas existentes.
             2. Solicita al usuario seleccionar una reserva por número.
             3. Solicita confirmación antes de eliminar.
-            4. Marca la habitación como disponible si corresponde.
-            5. Elimina la reserva de la base de datos.
+            4. Elimina la reserva de la base de datos.
         Maneja errores como selección inválida o problemas al eliminar la reserva.
         Raises:
             ValueError: Si ocurre un error al eliminar la reserva.
         """
-        reservas = self.db.query(Reserva).all()
+        reservas = self.reserva_crud.obtener_reservas_detalladas(self.db)
         if not reservas:
             print("No hay reservas registradas.")
             return
         print("=== Reservas registradas ===")
-        for i, reserva in enumerate(reservas, 1):
-            habitacion = self.db.get(Habitacion, reserva.id_habitacion)
-            habitacion_num = habitacion.numero if habitacion else "No asignada"
-            cliente = self.db.get(Usuario, reserva.id_cliente)
-            cliente_nombre = f"{cliente.nombre} {cliente.apellidos}" if cliente else "Desconocido"
+        for i, (reserva, numero_habitacion, nombre_cliente, apellidos_cliente) in enumerate(reservas, 1):
+            habitacion_num = numero_habitacion if numero_habitacion is not None else "No asignada"
+            cliente_nombre = f"{nombre_cliente} {apellidos_cliente}" if nombre_cliente else "Desconocido"
             print(f"{i}. Cliente: {cliente_nombre} | Habitación: {habitacion_num} | "
                 f"Del {reserva.fecha_entrada} al {reserva.fecha_salida} - Total: ${reserva.costo_total:,.0f}")
         opcion = input("Selecciona el número de la reserva que deseas eliminar: ").strip()
         if not opcion.isdigit() or not (1 <= int(opcion) <= len(reservas)):
             print("Opción inválida.")
             return
-        reserva_seleccionada = reservas[int(opcion) - 1]
+        reserva_seleccionada = reservas[int(opcion) - 1].Reserva
         confirmar = input("¿Deseas confirmar la eliminación? (1. Sí / 2. No): ").strip()
         if confirmar != "1":
             print("Eliminación cancelada.")
             return
-        if reserva_seleccionada.id_habitacion:
-            habitacion = self.db.get(Habitacion, reserva_seleccionada.id_habitacion)
-            if habitacion:
-                habitacion.disponible = True
         try:
             self.reserva_crud.eliminar_reserva(self.db, reserva_seleccionada.id_reserva)
             print("Reserva eliminada exitosamente.")
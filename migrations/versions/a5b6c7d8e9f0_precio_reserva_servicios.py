@@ -0,0 +1,32 @@
+"""Precio cobrado por cada servicio de una reserva
+
+Revision ID: a5b6c7d8e9f0
+Revises: f4d5e6a7b8c9
+Create Date: 2025-10-16 10:12:47.391204
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'a5b6c7d8e9f0'
+down_revision = 'f4d5e6a7b8c9'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.add_column('reserva_servicios', sa.Column('precio', sa.Float(), nullable=True))
+    # Los servicios ya contratados toman el precio actual del catálogo, el mismo con
+    # el que los valoraba hasta ahora ocupacion_diaria
+    op.execute(
+        "UPDATE reserva_servicios SET precio = ("
+        "SELECT precio FROM servicios_adicionales "
+        "WHERE servicios_adicionales.id_servicio = reserva_servicios.id_servicio)"
+    )
+    op.alter_column('reserva_servicios', 'precio', nullable=False)
+
+
+def downgrade() -> None:
+    op.drop_column('reserva_servicios', 'precio')
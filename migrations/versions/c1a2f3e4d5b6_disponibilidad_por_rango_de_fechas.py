@@ -0,0 +1,36 @@
+"""Disponibilidad por rango de fechas
+
+Revision ID: c1a2f3e4d5b6
+Revises: 4b525cd73666
+Create Date: 2025-10-02 10:12:08.417530
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'c1a2f3e4d5b6'
+down_revision = '4b525cd73666'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # btree_gist permite combinar la igualdad sobre UUID con el operador && de daterange
+    op.execute("CREATE EXTENSION IF NOT EXISTS btree_gist")
+    # La ocupación ahora se deriva de las reservas; disponible solo indica si la
+    # habitación está habilitada para la venta.
+    op.execute("UPDATE habitacion SET disponible = true")
+    op.create_exclude_constraint(
+        'reserva_habitacion_sin_solapamiento',
+        'reserva',
+        ('id_habitacion', '='),
+        (sa.text("daterange(fecha_entrada, fecha_salida, '[)')"), '&&'),
+        where=sa.text("estado_reserva = 'Activa'"),
+        using='gist',
+    )
+
+
+def downgrade() -> None:
+    op.drop_constraint('reserva_habitacion_sin_solapamiento', 'reserva', type_='exclude')
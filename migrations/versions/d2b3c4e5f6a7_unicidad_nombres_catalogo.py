@@ -0,0 +1,28 @@
+"""Unicidad de nombres de tipos de habitación y servicios
+
+Revision ID: d2b3c4e5f6a7
+Revises: c1a2f3e4d5b6
+Create Date: 2025-10-06 09:41:27.118204
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'd2b3c4e5f6a7'
+down_revision = 'c1a2f3e4d5b6'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # Necesarias para INSERT ... ON CONFLICT (nombre) DO NOTHING en los CRUD.
+    # Si ya hay nombres repetidos la migración falla: deben unificarse antes.
+    op.create_unique_constraint('uq_tipo_habitacion_nombre_tipo', 'tipo_habitacion', ['nombre_tipo'])
+    op.create_unique_constraint('uq_servicios_adicionales_nombre_servicio', 'servicios_adicionales', ['nombre_servicio'])
+
+
+def downgrade() -> None:
+    op.drop_constraint('uq_servicios_adicionales_nombre_servicio', 'servicios_adicionales', type_='unique')
+    op.drop_constraint('uq_tipo_habitacion_nombre_tipo', 'tipo_habitacion', type_='unique')
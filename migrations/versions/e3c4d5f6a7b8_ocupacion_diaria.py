@@ -0,0 +1,35 @@
+"""Resumen diario de ocupación e ingresos por tipo de habitación
+
+Revision ID: e3c4d5f6a7b8
+Revises: d2b3c4e5f6a7
+Create Date: 2025-10-09 11:05:43.271940
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'e3c4d5f6a7b8'
+down_revision = 'd2b3c4e5f6a7'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # La tabla queda vacía: llenarla con `python hotel.py ocupacion reconstruir`.
+    op.create_table('ocupacion_diaria',
+    sa.Column('fecha', sa.Date(), nullable=False),
+    sa.Column('id_tipo', sa.UUID(), nullable=False),
+    sa.Column('habitaciones_vendidas', sa.Integer(), nullable=False),
+    sa.Column('llegadas', sa.Integer(), nullable=False),
+    sa.Column('noches', sa.Integer(), nullable=False),
+    sa.Column('ingresos', sa.Float(), nullable=False),
+    sa.Column('ingresos_servicios', sa.Float(), nullable=False),
+    sa.ForeignKeyConstraint(['id_tipo'], ['tipo_habitacion.id_tipo'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('fecha', 'id_tipo')
+    )
+
+
+def downgrade() -> None:
+    op.drop_table('ocupacion_diaria')
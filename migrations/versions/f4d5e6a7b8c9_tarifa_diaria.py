@@ -0,0 +1,31 @@
+"""Calendario de tarifas por noche y tipo de habitación
+
+Revision ID: f4d5e6a7b8c9
+Revises: e3c4d5f6a7b8
+Create Date: 2025-10-14 09:32:18.604127
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'f4d5e6a7b8c9'
+down_revision = 'e3c4d5f6a7b8'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # Sin filas todas las noches se cobran al precio de la habitación, como antes.
+    op.create_table('tarifa_diaria',
+    sa.Column('id_tipo', sa.UUID(), nullable=False),
+    sa.Column('fecha', sa.Date(), nullable=False),
+    sa.Column('precio', sa.Float(), nullable=False),
+    sa.ForeignKeyConstraint(['id_tipo'], ['tipo_habitacion.id_tipo'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('id_tipo', 'fecha')
+    )
+
+
+def downgrade() -> None:
+    op.drop_table('tarifa_diaria')